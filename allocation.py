@@ -0,0 +1,174 @@
+"""Budget allocation over the filtered roster, maximizing expected revenue.
+
+Booking an influencer again for ``spend`` is expected to return
+``spend * roas`` revenue, reach ``spend / cpm * 1000`` people and convert
+``conversion_rate`` percent of them, from their historical metrics. The budget
+is filled in descending ROAS order, subject to a per-influencer cap (a multiple
+of the historical payout), per-platform/category shares of the budget and the
+number of influencers booked. Rather than looping over candidates, each pass
+books the longest prefix that fits every constraint (group-wise cumulative
+sums) and gives the next candidate the binding remainder, which saturates the
+budget or a group; passes are bounded by the number of groups, not the roster
+size. Without group caps this is the exact fractional-knapsack optimum; with
+crossing platform and category caps it is a greedy heuristic.
+"""
+import numpy as np
+import pandas as pd
+
+from metrics import safe_divide
+
+BASES = ['All', 'post', 'order']
+CANDIDATE_COLUMNS = ['id', 'name', 'platform', 'category', 'basis', 'follower_count', 'total_payout', 'roas', 'cpm',
+                     'conversion_rate']
+# Spend left below this fraction of the budget counts as exhausted
+TOLERANCE = 1e-9
+
+
+def candidate_frame(filtered_df, payouts_df, basis='All', min_roas=0.0):
+    """Filtered influencers with a payout and positive ROAS, with their payout basis, best ROAS first"""
+    bases = payouts_df.drop_duplicates('influencer_id').set_index('influencer_id')['basis']
+    candidates = filtered_df.join(bases, on='id')
+    keep = (candidates['total_payout'] > 0) & (candidates['roas'] > 0) & (candidates['roas'] >= min_roas)
+    if basis != 'All':
+        keep &= candidates['basis'] == basis
+    candidates = candidates.loc[keep.to_numpy(), CANDIDATE_COLUMNS]
+    order = np.argsort(-candidates['roas'].to_numpy(np.float64), kind='stable')
+    return candidates.iloc[order].reset_index(drop=True)
+
+
+def group_limits(values, caps, budget):
+    """Integer code per candidate and spend limit per code, from a share of the budget per group
+
+    ``caps`` is None (no cap), one share for every group, or a mapping of
+    group value to share; values missing from the mapping are uncapped.
+    """
+    codes, groups = pd.factorize(values)
+    if caps is None:
+        shares = np.full(len(groups), np.inf)
+    elif isinstance(caps, dict):
+        shares = np.array([caps.get(group, np.inf) for group in groups], dtype=np.float64)
+    else:
+        shares = np.full(len(groups), float(caps))
+    return codes, shares * budget
+
+
+def _group_cumsum(values, codes):
+    """Running sum of values within each group code, in positional order"""
+    return pd.Series(values).groupby(codes).cumsum().to_numpy()
+
+
+def greedy_fill(roas, caps, budget, group_codes, group_remaining, max_count=None):
+    """Spend per candidate (ordered best first) from prefix passes over the open constraints
+
+    ``group_codes`` and ``group_remaining`` are parallel lists of per-candidate
+    group codes and per-group spend limits; the limits are consumed in place.
+    Returns the spend array and the names of the constraints that bound.
+    """
+    spend = np.zeros(len(roas))
+    remaining = float(budget)
+    count_left = np.inf if max_count is None else max_count
+    alive = np.flatnonzero((caps > 0) & (roas > 0))
+    binding = set()
+    eps = TOLERANCE * max(budget, 1.0)
+    while len(alive) and remaining > eps and count_left > 0:
+        take = caps[alive]
+        over = np.cumsum(take) > remaining + eps
+        for codes, limits in zip(group_codes, group_remaining):
+            over |= _group_cumsum(take, codes[alive]) > limits[codes[alive]] + eps
+        if count_left < len(alive):
+            over[int(count_left):] = True
+        stop = int(np.argmax(over)) if over.any() else len(alive)
+
+        booked = alive[:stop]
+        spend[booked] = take[:stop]
+        remaining -= take[:stop].sum()
+        for codes, limits in zip(group_codes, group_remaining):
+            limits -= np.bincount(codes[booked], weights=take[:stop], minlength=len(limits))
+        count_left -= stop
+        if stop == len(alive):
+            break
+        if count_left <= 0:
+            binding.add('max_influencers')
+            break
+
+        # The first candidate that does not fit gets what the tightest constraint leaves
+        j = alive[stop]
+        partial = min(caps[j], remaining, *(limits[codes[j]] for codes, limits in zip(group_codes, group_remaining)))
+        if partial > eps:
+            spend[j] = partial
+            remaining -= partial
+            count_left -= 1
+            for codes, limits in zip(group_codes, group_remaining):
+                limits[codes[j]] -= partial
+
+        rest = alive[stop + 1:]
+        if remaining <= eps:
+            binding.add('budget')
+        for name, codes, limits in zip(['platform_cap', 'category_cap'], group_codes, group_remaining):
+            saturated = limits <= eps
+            if saturated[codes[j]]:
+                binding.add(name)
+            rest = rest[~saturated[codes[rest]]]
+        alive = rest
+    # The count limit ran out (in a partial booking, or before the first pass) with candidates and budget left
+    if count_left <= 0 and len(alive) and remaining > eps:
+        binding.add('max_influencers')
+    return spend, sorted(binding)
+
+
+def allocate_budget(candidates, budget, platform_caps=None, category_caps=None, min_influencers=0,
+                    max_influencers=None, max_scale=1.0):
+    """Spend plan over the candidates (as from ``candidate_frame``) and a summary of it
+
+    The plan has one row per booked influencer, best ROAS first, with
+    ``spend``, ``weight`` (spend as a multiple of the historical payout) and
+    the expected revenue, reach and orders. ``min_influencers`` spreads the
+    budget by capping every influencer at ``budget / min_influencers``.
+    """
+    payout = candidates['total_payout'].to_numpy(np.float64)
+    roas = candidates['roas'].to_numpy(np.float64)
+    caps = payout * max_scale
+    if min_influencers > 0:
+        caps = np.minimum(caps, budget / min_influencers)
+
+    group_codes, group_remaining = [], []
+    for dim, dim_caps in [('platform', platform_caps), ('category', category_caps)]:
+        codes, limits = group_limits(candidates[dim], dim_caps, budget)
+        group_codes.append(codes)
+        group_remaining.append(limits)
+    spend, binding = greedy_fill(roas, caps, budget, group_codes, group_remaining, max_influencers)
+
+    booked = spend > 0
+    plan = candidates[booked].reset_index(drop=True)
+    plan['spend'] = spend[booked]
+    plan['weight'] = plan['spend'] / plan['total_payout']
+    plan['expected_revenue'] = plan['spend'] * plan['roas']
+    plan['expected_reach'] = safe_divide(plan['spend'].to_numpy(), plan['cpm'].to_numpy(), 1000)
+    plan['expected_orders'] = plan['expected_reach'] * plan['conversion_rate'] / 100
+
+    total_spend = float(plan['spend'].sum())
+    expected_revenue = float(plan['expected_revenue'].sum())
+    summary = {
+        'budget': float(budget),
+        'spend': total_spend,
+        'expected_revenue': expected_revenue,
+        'expected_roas': expected_revenue / total_spend if total_spend > 0 else 0.0,
+        'expected_orders': float(plan['expected_orders'].sum()),
+        'expected_reach': float(plan['expected_reach'].sum()),
+        'influencers': len(plan),
+        'candidates': len(candidates),
+        'binding': binding,
+        'min_shortfall': max(min_influencers - len(plan), 0),
+    }
+    return plan, summary
+
+
+def plan_breakdown(plan, dimensions):
+    """Spend, expected revenue, influencer count and expected ROAS per value of one or more plan dimensions"""
+    breakdown = plan.groupby(dimensions, observed=True).agg(
+        spend=('spend', 'sum'),
+        expected_revenue=('expected_revenue', 'sum'),
+        influencers=('id', 'count'),
+    ).reset_index()
+    breakdown['expected_roas'] = safe_divide(breakdown['expected_revenue'].to_numpy(), breakdown['spend'].to_numpy())
+    return breakdown.sort_values('spend', ascending=False, ignore_index=True)
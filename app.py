@@ -1,11 +1,21 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 import numpy as np
-import random
-from datetime import datetime, timedelta
+import os
+from contextlib import contextmanager
+
+from allocation import BASES, plan_breakdown
+from bootstrap import CONFIDENCE, REPLICATES
+from charts import (TREND_CURVES, allocation_figure, brand_figure, category_figure, engagement_scatter_figure,
+                    flame_figure, platform_figure, revenue_trend_figure, roas_histogram_figure, top_performers_figure)
+from dateindex import date_range_key
+from engine import BASELINE_ROAS, build_pipeline, compute_kpis, dimension_summary, load_dataset
+from formatting import (ALLOCATION_COLUMNS, DETAILED_COLUMNS, INTERVAL_COLUMNS, TOP_PERFORMER_COLUMNS,
+                        column_config, display_frame)
+from pipeline import LRUCache
+from profiling import Tracer, current, span, write_chrome_trace
+from render import POINT_BUDGET, payload_bytes
+from timeseries import FREQUENCIES
 
 # --- PAGE CONFIGURATION ---
 st.set_page_config(
@@ -95,268 +105,96 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# --- DATA GENERATION FUNCTIONS ---
-@st.cache_data
-def generate_influencers_data(n=2000):
-    """Generate realistic influencer data"""
-    random.seed(42)  # For reproducibility
-    np.random.seed(42)
-    
-    # Indian names pools
-    first_names_male = ['Aarav', 'Rohan', 'Vikram', 'Karan', 'Arjun', 'Rahul', 'Amit', 'Suresh', 'Raj', 'Dev', 
-                        'Akash', 'Nikhil', 'Siddharth', 'Varun', 'Aditya', 'Ishaan', 'Kabir', 'Yash', 'Harsh', 'Ravi']
-    first_names_female = ['Priya', 'Sneha', 'Ananya', 'Kavya', 'Riya', 'Shreya', 'Pooja', 'Neha', 'Divya', 'Sanya',
-                          'Isha', 'Tanya', 'Meera', 'Aditi', 'Nisha', 'Simran', 'Kriti', 'Swati', 'Payal', 'Deepika']
-    last_names = ['Sharma', 'Patel', 'Das', 'Reddy', 'Singh', 'Gupta', 'Malhotra', 'Agarwal', 'Jain', 'Kumar',
-                  'Verma', 'Shah', 'Chopra', 'Sinha', 'Mishra', 'Yadav', 'Pandey', 'Nair', 'Iyer', 'Kapoor']
-    
-    categories = ['Fitness', 'Wellness', 'Bodybuilding', 'Yoga', 'Nutrition', 'Lifestyle', 'Sports', 'Health', 'Beauty', 'Diet']
-    platforms = ['Instagram', 'YouTube', 'Twitter', 'TikTok', 'Facebook']
-    
-    influencers = []
-    for i in range(1, n + 1):
-        gender = random.choice(['Male', 'Female'])
-        first_name = random.choice(first_names_male if gender == 'Male' else first_names_female)
-        last_name = random.choice(last_names)
-        name = f"{first_name} {last_name}"
-        
-        # Generate realistic follower counts with some correlation to platform
-        platform = random.choice(platforms)
-        if platform == 'Instagram':
-            follower_count = int(np.random.lognormal(13.5, 1.2))  # Higher for Instagram
-        elif platform == 'YouTube':
-            follower_count = int(np.random.lognormal(12.8, 1.3))
-        elif platform == 'TikTok':
-            follower_count = int(np.random.lognormal(13.2, 1.4))
-        else:
-            follower_count = int(np.random.lognormal(12.5, 1.1))
-        
-        follower_count = max(10000, min(10000000, follower_count))  # Reasonable bounds
-        
-        influencers.append({
-            'id': i,
-            'name': name,
-            'category': random.choice(categories),
-            'gender': gender,
-            'follower_count': follower_count,
-            'platform': platform
-        })
-    
-    return pd.DataFrame(influencers)
-
-@st.cache_data
-def generate_posts_data(influencers_df, posts_per_influencer_range=(1, 5)):
-    """Generate posts data"""
-    random.seed(42)
-    np.random.seed(42)
-    
-    brands = ['MuscleBlaze', 'HKVitals', 'Gritzo', 'TrueBasics', 'NutraBay']
-    captions = [
-        'Loving my new {} protein!',
-        'My daily {} routine',
-        '{} for the win!',
-        'Perfect workout fuel with {}',
-        'Unboxing {} supplements',
-        'Quick thoughts on {} nutrition',
-        'Fueling my workouts with {}',
-        '{} keeps me energized',
-        'Amazing results with {}',
-        'Check out this {} product!'
-    ]
-    
-    posts = []
-    post_id = 1
-    
-    start_date = datetime(2023, 8, 1)
-    end_date = datetime(2023, 12, 31)
-    
-    for _, influencer in influencers_df.iterrows():
-        num_posts = random.randint(*posts_per_influencer_range)
-        
-        for _ in range(num_posts):
-            brand = random.choice(brands)
-            caption = random.choice(captions).format(brand)
-            
-            # Generate realistic engagement based on follower count
-            base_reach = min(influencer['follower_count'] * random.uniform(0.1, 0.8), influencer['follower_count'])
-            reach = int(base_reach * random.uniform(0.5, 1.5))
-            
-            engagement_rate = random.uniform(0.01, 0.15)  # 1-15% engagement
-            total_engagement = int(reach * engagement_rate)
-            
-            likes = int(total_engagement * random.uniform(0.7, 0.9))
-            comments = total_engagement - likes
-            
-            # Random date between start and end
-            random_date = start_date + timedelta(days=random.randint(0, (end_date - start_date).days))
-            
-            posts.append({
-                'post_id': post_id,
-                'influencer_id': influencer['id'],
-                'platform': influencer['platform'],
-                'date': random_date.strftime('%Y-%m-%d'),
-                'url': f'http://{influencer["platform"].lower()}.com/p{post_id}',
-                'caption': caption,
-                'reach': reach,
-                'likes': likes,
-                'comments': comments
-            })
-            post_id += 1
-    
-    return pd.DataFrame(posts)
-
-@st.cache_data
-def generate_tracking_data(influencers_df, posts_df):
-    """Generate tracking/conversion data"""
-    random.seed(42)
-    np.random.seed(42)
-    
-    campaigns = ['DiwaliSale23', 'WinterBulkUp23', 'NewYearFitness24', 'SummerShred23', 'FestiveFit23']
-    brands = ['MuscleBlaze', 'HKVitals', 'Gritzo', 'TrueBasics', 'NutraBay']
-    products = {
-        'MuscleBlaze': ['Whey Protein', 'Creatine', 'Pre-Workout', 'BCAA', 'Mass Gainer'],
-        'HKVitals': ['Multivitamin', 'Biotin', 'Omega-3', 'Vitamin D', 'Iron'],
-        'Gritzo': ['SuperMilk', 'Protein Bars', 'Kids Nutrition', 'Immunity Booster', 'Growth Mix'],
-        'TrueBasics': ['Collagen', 'Probiotics', 'Ashwagandha', 'Turmeric', 'Green Tea'],
-        'NutraBay': ['Protein Powder', 'Fat Burner', 'Testosterone Booster', 'Joint Support', 'Recovery']
-    }
-    
-    tracking_data = []
-    tracking_id = 1
-    
-    # Generate tracking data for subset of influencers (not all will have conversions)
-    conversion_influencers = random.sample(list(influencers_df['id']), min(1500, len(influencers_df)))
-    
-    for influencer_id in conversion_influencers:
-        if random.random() < 0.7:  # 70% chance this influencer has conversions
-            num_conversions = random.randint(1, 3)
-            
-            for _ in range(num_conversions):
-                brand = random.choice(brands)
-                product = f"{brand} {random.choice(products[brand])}"
-                campaign = random.choice(campaigns)
-                
-                # Get influencer data for realistic conversion modeling
-                influencer = influencers_df[influencers_df['id'] == influencer_id].iloc[0]
-                follower_count = influencer['follower_count']
-                
-                # Base conversion rate based on follower count (smaller influencers often have better conversion)
-                base_conversion_rate = max(0.001, 0.01 - (follower_count / 10000000) * 0.005)
-                actual_conversion_rate = base_conversion_rate * random.uniform(0.5, 2.0)
-                
-                # Estimate reach from posts
-                influencer_posts = posts_df[posts_df['influencer_id'] == influencer_id]
-                if len(influencer_posts) > 0:
-                    avg_reach = influencer_posts['reach'].mean()
-                else:
-                    avg_reach = follower_count * 0.3
-                
-                orders = max(1, int(avg_reach * actual_conversion_rate))
-                
-                # Revenue per order varies by product type
-                if 'Protein' in product or 'Mass Gainer' in product:
-                    avg_order_value = random.randint(1500, 4000)
-                elif 'Vitamin' in product or 'Biotin' in product:
-                    avg_order_value = random.randint(500, 1500)
-                else:
-                    avg_order_value = random.randint(800, 2500)
-                
-                revenue = orders * avg_order_value
-                
-                # Random date
-                start_date = datetime(2023, 8, 1)
-                end_date = datetime(2023, 12, 31)
-                random_date = start_date + timedelta(days=random.randint(0, (end_date - start_date).days))
-                
-                tracking_data.append({
-                    'tracking_id': tracking_id,
-                    'source': 'influencer',
-                    'campaign': campaign,
-                    'influencer_id': influencer_id,
-                    'product': product,
-                    'brand': brand,
-                    'date': random_date.strftime('%Y-%m-%d'),
-                    'orders': orders,
-                    'revenue': revenue
-                })
-                tracking_id += 1
-    
-    return pd.DataFrame(tracking_data)
-
-@st.cache_data
-def generate_payouts_data(influencers_df, tracking_df):
-    """Generate payout data"""
-    random.seed(42)
-    np.random.seed(42)
-    
-    payouts = []
-    payout_id = 1
-    
-    for _, influencer in influencers_df.iterrows():
-        # Not all influencers will have payouts
-        if random.random() < 0.75:  # 75% have payouts
-            basis = random.choice(['post', 'order', 'post', 'order'])  # More likely to be post or order based
-            
-            if basis == 'post':
-                # Fixed rate per post based on follower count
-                if influencer['follower_count'] > 2000000:
-                    rate = random.randint(80000, 150000)
-                elif influencer['follower_count'] > 1000000:
-                    rate = random.randint(40000, 80000)
-                elif influencer['follower_count'] > 500000:
-                    rate = random.randint(15000, 40000)
-                else:
-                    rate = random.randint(5000, 15000)
-                
-                # Estimate number of posts (simplified)
-                num_posts = random.randint(1, 3)
-                total_payout = rate * num_posts
-                orders = None
-                
-            else:  # order-based
-                rate = random.randint(50, 200)  # Per order commission
-                
-                # Get actual orders for this influencer
-                influencer_orders = tracking_df[tracking_df['influencer_id'] == influencer['id']]['orders'].sum()
-                if influencer_orders == 0:
-                    influencer_orders = random.randint(10, 100)  # Fallback
-                
-                orders = influencer_orders
-                total_payout = rate * orders
-            
-            payouts.append({
-                'payout_id': payout_id,
-                'influencer_id': influencer['id'],
-                'basis': basis,
-                'rate': rate,
-                'orders': orders,
-                'total_payout': total_payout
-            })
-            payout_id += 1
-    
-    return pd.DataFrame(payouts)
+# --- PROFILING ---
+# Per-stage timing of every rerun; toggled in the sidebar, default from the environment
+PROFILE_RERUNS = os.environ.get('DASHBOARD_PROFILE', '') not in ('', '0')
+# Adds process-wide tracemalloc figures to profiled spans; server-wide only, as it slows every session
+TRACE_MEMORY = os.environ.get('DASHBOARD_TRACE_MEMORY', '') not in ('', '0')
+# Chrome trace-event file the Performance panel exports to
+TRACE_FILE = os.environ.get('DASHBOARD_TRACE_FILE', 'dashboard_trace.json')
+# Traces kept per session for the panel and the export
+MAX_TRACES = 20
+
+def record_trace(tracer):
+    traces = st.session_state.setdefault('traces', [])
+    traces.append(tracer.to_dict())
+    del traces[:-MAX_TRACES]
+
+@contextmanager
+def traced_section(name):
+    """Span under the rerun's tracer; a fragment rerun with profiling on gets a trace of its own"""
+    if current() is None and st.session_state.get('profile_reruns', PROFILE_RERUNS):
+        tracer = Tracer(name, memory=TRACE_MEMORY)
+        with tracer.activate(), span(name):
+            yield
+        record_trace(tracer)
+    else:
+        with span(name):
+            yield
+
+# A rerun interrupted by st.rerun/st.stop never reached its stop() below
+if current() is not None:
+    current().stop()
+rerun_tracer = Tracer('rerun', memory=TRACE_MEMORY).start() if st.session_state.get('profile_reruns', PROFILE_RERUNS) else None
 
 # --- LOAD DATA ---
+# Directory of influencers/posts/tracking_data/payouts files; synthetic data when unset
+DATA_DIR = os.environ.get('DASHBOARD_DATA_DIR')
+# Number of synthetic influencers; raise it to load test the dashboard
+N_INFLUENCERS = int(os.environ.get('DASHBOARD_N_INFLUENCERS', 2000))
+# Directory of the shared memory-mapped store; every session loads privately when unset
+STORE_DIR = os.environ.get('DASHBOARD_STORE_DIR')
+# Directory of the persistent result cache, which survives server restarts; in-memory caching only when unset
+CACHE_DIR = os.environ.get('DASHBOARD_CACHE_DIR')
+# Size bound of the persistent cache; least recently read entries are evicted beyond it
+CACHE_MB = int(os.environ.get('DASHBOARD_CACHE_MB', 1024))
+# Engine computing filter results: 'pandas' (cube-backed, default), 'duckdb' (needs the duckdb package) or
+# 'parallel' (id-sharded worker processes)
+BACKEND = os.environ.get('DASHBOARD_BACKEND', 'pandas')
+# Threads (duckdb) or processes (parallel) of the backend; one per CPU when unset
+WORKERS = int(os.environ['DASHBOARD_WORKERS']) if os.environ.get('DASHBOARD_WORKERS') else None
+
 @st.cache_data
-def load_all_data():
+def load_all_data(data_dir=DATA_DIR, n_influencers=N_INFLUENCERS):
     """Load all data with caching"""
-    influencers_df = generate_influencers_data(2000)
-    posts_df = generate_posts_data(influencers_df)
-    tracking_data_df = generate_tracking_data(influencers_df, posts_df)
-    payouts_df = generate_payouts_data(influencers_df, tracking_data_df)
-    
-    # Convert date columns
-    posts_df['date'] = pd.to_datetime(posts_df['date'])
-    tracking_data_df['date'] = pd.to_datetime(tracking_data_df['date'])
-    
-    return influencers_df, posts_df, tracking_data_df, payouts_df
+    return load_dataset(data_dir, n_influencers)
+
+@st.cache_resource
+def get_pipeline(data_dir=DATA_DIR, n_influencers=N_INFLUENCERS, store_dir=STORE_DIR, cache_dir=CACHE_DIR,
+                 backend=BACKEND, workers=WORKERS):
+    """Filter pipeline over the loaded tables, shared by every rerun and session"""
+    return build_pipeline(data_dir, n_influencers, store_dir, load=load_all_data, cache_dir=cache_dir,
+                          cache_bytes=CACHE_MB * 1024 * 1024, backend=backend, workers=workers)
 
 # Load data
-with st.spinner('Loading dashboard data...'):
-    influencers, posts, tracking_data, payouts = load_all_data()
+with st.spinner('Loading dashboard data...'), span('load_data'):
+    pipeline = get_pipeline()
 
 # --- CONSTANTS ---
-BASELINE_ROAS = 2.5
+# Rows of the budget plan sent to the browser; the summary and chart cover every booked influencer
+PLAN_ROWS = 200
+# Most points sent per scatter chart; larger selections are density-binned server-side
+SCATTER_POINT_BUDGET = int(os.environ.get('DASHBOARD_POINT_BUDGET', POINT_BUDGET))
+
+# Serialized size of every chart on the page, reported under Advanced Analytics
+chart_payloads = {}
+
+@st.cache_resource
+def get_figure_cache():
+    """Built figures and their payload sizes, shared by every rerun and session"""
+    return LRUCache(maxsize=128)
+
+def show_chart(name, inputs, build):
+    """Render a chart, rebuilding its figure only when the inputs it depends on change"""
+    def compute():
+        with span('build'):
+            fig = build()
+        return fig, payload_bytes(fig)
+
+    with traced_section(f'chart:{name}'):
+        fig, chart_payloads[name] = get_figure_cache().get_or_compute((name, inputs, pipeline.version), compute)
+        with span('render'):
+            st.plotly_chart(fig, use_container_width=True)
 
 # --- HEADER ---
 st.markdown("""
@@ -368,18 +206,19 @@ st.markdown("""
 
 # --- SIDEBAR FILTERS ---
 st.sidebar.markdown("### 🎯 Campaign Filters")
-brand_filter = st.sidebar.selectbox('🏷️ Select Brand', ['All'] + sorted(list(tracking_data['brand'].unique())))
-platform_filter = st.sidebar.selectbox('📱 Select Platform', ['All'] + sorted(list(influencers['platform'].unique())))
-campaign_filter = st.sidebar.selectbox('📈 Select Campaign', ['All'] + sorted(list(tracking_data['campaign'].unique())))
-category_filter = st.sidebar.selectbox('🎭 Select Category', ['All'] + sorted(list(influencers['category'].unique())))
+brand_filter = st.sidebar.selectbox('🏷️ Select Brand', ['All'] + pipeline.dimension_values('brand'))
+platform_filter = st.sidebar.selectbox('📱 Select Platform', ['All'] + pipeline.dimension_values('platform'))
+campaign_filter = st.sidebar.selectbox('📈 Select Campaign', ['All'] + pipeline.dimension_values('campaign'))
+category_filter = st.sidebar.selectbox('🎭 Select Category', ['All'] + pipeline.dimension_values('category'))
 
 # Date range filter
 st.sidebar.markdown("### 📅 Date Range")
+first_date, last_date = pipeline.date_bounds()
 date_range = st.sidebar.date_input(
     "Select Date Range",
-    value=(tracking_data['date'].min(), tracking_data['date'].max()),
-    min_value=tracking_data['date'].min(),
-    max_value=tracking_data['date'].max()
+    value=(first_date, last_date),
+    min_value=first_date,
+    max_value=last_date
 )
 
 # Advanced filters
@@ -387,75 +226,46 @@ st.sidebar.markdown("### ⚙️ Advanced Filters")
 min_followers = st.sidebar.slider('Minimum Followers', 0, 5000000, 0, 50000)
 max_followers = st.sidebar.slider('Maximum Followers', 0, 10000000, 10000000, 50000)
 
+# Incremental ingestion of new conversions/posts into the shared pipeline
+with st.sidebar.expander("📥 Append New Events"):
+    new_tracking_file = st.file_uploader("Tracking CSV", type='csv', key='append_tracking')
+    new_posts_file = st.file_uploader("Posts CSV", type='csv', key='append_posts')
+    if st.button("Append Batch", disabled=not (new_tracking_file or new_posts_file)):
+        try:
+            appended = pipeline.append(
+                pd.read_csv(new_tracking_file) if new_tracking_file else None,
+                pd.read_csv(new_posts_file) if new_posts_file else None
+            )
+            st.success(f"Appended {appended['tracking_rows']:,} conversions and {appended['post_rows']:,} posts")
+        except ValueError as e:
+            st.error(f"Batch rejected: {e}")
+
+st.sidebar.markdown("### ⏱️ Diagnostics")
+st.sidebar.checkbox('⏱️ Profile reruns', value=PROFILE_RERUNS, key='profile_reruns',
+                    help='Time every stage of each rerun and show the breakdown in the Performance panel')
+
 # --- DATA PROCESSING ---
-def process_data(influencers_df, posts_df, tracking_data_df, payouts_df, brand, platform, campaign, category, date_range, min_followers, max_followers):
-    """Enhanced data processing with more filters"""
-    
-    # Apply date filter
-    if len(date_range) == 2:
-        start_date, end_date = date_range
-        tracking_data_df = tracking_data_df[
-            (tracking_data_df['date'] >= pd.to_datetime(start_date)) & 
-            (tracking_data_df['date'] <= pd.to_datetime(end_date))
-        ]
-    
-    # Apply filters
-    if brand != 'All':
-        tracking_data_df = tracking_data_df[tracking_data_df['brand'] == brand]
-    if platform != 'All':
-        influencers_df = influencers_df[influencers_df['platform'] == platform]
-    if campaign != 'All':
-        tracking_data_df = tracking_data_df[tracking_data_df['campaign'] == campaign]
-    if category != 'All':
-        influencers_df = influencers_df[influencers_df['category'] == category]
-    
-    # Follower range filter
-    influencers_df = influencers_df[
-        (influencers_df['follower_count'] >= min_followers) & 
-        (influencers_df['follower_count'] <= max_followers)
-    ]
-
-    # Aggregate tracking data
-    tracking_agg = tracking_data_df.groupby('influencer_id').agg(
-        total_revenue=('revenue', 'sum'),
-        total_orders=('orders', 'sum')
-    ).reset_index()
-
-    # Aggregate post data
-    posts_agg = posts_df.groupby('influencer_id').agg(
-        total_reach=('reach', 'sum'),
-        total_likes=('likes', 'sum'),
-        total_comments=('comments', 'sum'),
-        post_count=('post_id', 'count')
-    ).reset_index()
-
-    # Merge dataframes
-    df = pd.merge(influencers_df, tracking_agg, left_on='id', right_on='influencer_id', how='left')
-    df = pd.merge(df, posts_agg, left_on='id', right_on='influencer_id', how='left')
-    df = pd.merge(df, payouts_df[['influencer_id', 'total_payout']], left_on='id', right_on='influencer_id', how='left')
-
-    # Fill NaNs for calculations
-    df[['total_revenue', 'total_orders', 'total_reach', 'total_likes', 'total_comments', 'post_count', 'total_payout']] = df[['total_revenue', 'total_orders', 'total_reach', 'total_likes', 'total_comments', 'post_count', 'total_payout']].fillna(0)
-
-    # Calculate metrics
-    df['roas'] = df.apply(lambda row: row['total_revenue'] / row['total_payout'] if row['total_payout'] > 0 else 0, axis=1)
-    df['engagement_rate'] = df.apply(lambda row: (row['total_likes'] + row['total_comments']) / row['total_reach'] * 100 if row['total_reach'] > 0 else 0, axis=1)
-    df['cpm'] = df.apply(lambda row: (row['total_payout'] / row['total_reach']) * 1000 if row['total_reach'] > 0 else 0, axis=1)
-    df['conversion_rate'] = df.apply(lambda row: (row['total_orders'] / row['total_reach']) * 100 if row['total_reach'] > 0 else 0, axis=1)
-
-    return df.drop(columns=[col for col in df.columns if 'influencer_id' in col and col != 'id'])
-
-# Process data
-filtered_df = process_data(influencers, posts, tracking_data, payouts, brand_filter, platform_filter, campaign_filter, category_filter, date_range, min_followers, max_followers)
+# Memoized per filter tuple; moving only the follower sliders reuses the cached aggregates
+with span('process_data'):
+    filtered_df = pipeline.process(brand_filter, platform_filter, campaign_filter, category_filter, date_range, min_followers, max_followers)
+# Hashable form of the filter state; sections depending on filtered_df cache on it
+filter_key = (brand_filter, platform_filter, campaign_filter, category_filter, date_range_key(date_range), min_followers, max_followers)
 
 # --- KPIs ---
-total_spend = filtered_df['total_payout'].sum()
-total_revenue = filtered_df['total_revenue'].sum()
-total_orders = filtered_df['total_orders'].sum()
-total_reach = filtered_df['total_reach'].sum()
-overall_roas = total_revenue / total_spend if total_spend > 0 else 0
-incremental_roas = overall_roas - BASELINE_ROAS
-avg_cpm = filtered_df['cpm'].mean() if len(filtered_df) > 0 else 0
+with span('kpis'):
+    kpis = compute_kpis(filtered_df, BASELINE_ROAS)
+total_spend, total_revenue, total_orders, total_reach = (
+    kpis['total_spend'], kpis['total_revenue'], kpis['total_orders'], kpis['total_reach'])
+overall_roas, incremental_roas, avg_cpm = kpis['overall_roas'], kpis['incremental_roas'], kpis['avg_cpm']
+# Bootstrap intervals of the ROAS KPIs, resampled once per filter state
+with span('roas_intervals'):
+    roas_intervals = pipeline.roas_intervals(*filter_key, BASELINE_ROAS)
+roas_bounds = roas_intervals.set_index('dimension').loc[['overall', 'incremental'], ['low', 'high']]
+
+def interval_caption(dimension):
+    """Confidence interval shown under a ROAS KPI"""
+    low, high = roas_bounds.loc[dimension]
+    return "No spend to resample" if np.isnan(low) else f"{CONFIDENCE:.0%} CI {low:.2f}x – {high:.2f}x"
 
 # KPI Display
 kpi_cols = st.columns(6)
@@ -465,281 +275,190 @@ with kpi_cols[1]:
     st.metric(label="💵 Total Revenue", value=f"₹{total_revenue:,.0f}")
 with kpi_cols[2]:
     st.metric(label="📊 Overall ROAS", value=f"{overall_roas:.2f}x")
+    st.caption(interval_caption('overall'))
 with kpi_cols[3]:
     st.metric(label="🎯 Incremental ROAS", value=f"{incremental_roas:.2f}x", delta=f"{incremental_roas:.2f}")
+    st.caption(interval_caption('incremental'))
 with kpi_cols[4]:
     st.metric(label="🛒 Total Orders", value=f"{total_orders:,.0f}")
 with kpi_cols[5]:
     st.metric(label="👥 Total Reach", value=f"{total_reach/1_000_000:.1f}M")
 
+with st.expander("📏 ROAS confidence intervals by platform and category"):
+    st.caption(f"{CONFIDENCE:.0%} bootstrap intervals from {REPLICATES:,} resamples of the selected influencers; "
+               f"'Above Baseline' is the share of resamples with ROAS above {BASELINE_ROAS:.1f}x")
+    st.dataframe(
+        display_frame(roas_intervals, INTERVAL_COLUMNS),
+        column_config=column_config(INTERVAL_COLUMNS),
+        use_container_width=True,
+        hide_index=True
+    )
+
 st.markdown("---")
 
 # --- ENHANCED CHARTS ---
-chart_cols = st.columns([2, 1])
-
-with chart_cols[0]:
+# Every section below is a fragment: its own widgets rerun only that section, and
+# its figure is rebuilt only when the filters it depends on change
+@st.fragment
+def top_performers_chart(filter_key):
     st.markdown('<div class="chart-container">', unsafe_allow_html=True)
     st.subheader("🎯 Top Performers by ROAS")
-    
-    # Get top 20 performers
-    top_performers = filtered_df.nlargest(20, 'roas')
-    
-    fig_roas = px.bar(
-        top_performers,
-        x='roas',
-        y='name',
-        orientation='h',
-        title='Top 20 Influencers by Return on Ad Spend',
-        labels={'name': 'Influencer', 'roas': 'ROAS (x)'},
-        color='roas',
-        color_continuous_scale='RdYlGn',
-        text='roas'
-    )
-    fig_roas.update_traces(texttemplate='%{text:.2f}x', textposition='outside')
-    fig_roas.update_layout(
-        height=600,
-        title_x=0.5,
-        font=dict(size=12),
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)'
-    )
-    st.plotly_chart(fig_roas, use_container_width=True)
+
+    def build():
+        # Get top 20 performers, selected without sorting the whole frame
+        return top_performers_figure(pipeline.ranking(*filter_key).top('roas', 20))
+
+    show_chart('Top Performers by ROAS', filter_key, build)
     st.markdown('</div>', unsafe_allow_html=True)
 
-with chart_cols[1]:
+@st.fragment
+def platform_chart(filtered_df, filter_key):
     st.markdown('<div class="chart-container">', unsafe_allow_html=True)
     st.subheader("📱 Platform Distribution")
-    
-    platform_stats = filtered_df.groupby('platform').agg({
-        'total_revenue': 'sum',
-        'id': 'count'
-    }).reset_index()
-    platform_stats.columns = ['platform', 'revenue', 'influencer_count']
-    
-    fig_platform = px.pie(
-        platform_stats,
-        names='platform',
-        values='revenue',
-        title='Revenue Share by Platform',
-        hole=0.4,
-        color_discrete_sequence=px.colors.qualitative.Set3
-    )
-    fig_platform.update_traces(
-        textposition='inside', 
-        textinfo='percent+label',
-        hovertemplate='<b>%{label}</b><br>Revenue: ₹%{value:,.0f}<br>Share: %{percent}<extra></extra>'
-    )
-    fig_platform.update_layout(
-        title_x=0.5,
-        font=dict(size=11),
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)'
-    )
-    st.plotly_chart(fig_platform, use_container_width=True)
+
+    def build():
+        return platform_figure(dimension_summary(filtered_df, 'platform'))
+
+    show_chart('Platform Distribution', filter_key, build)
     st.markdown('</div>', unsafe_allow_html=True)
 
-# Revenue and engagement trends
-trend_cols = st.columns(2)
+chart_cols = st.columns([2, 1])
+with chart_cols[0]:
+    top_performers_chart(filter_key)
+with chart_cols[1]:
+    platform_chart(filtered_df, filter_key)
 
-with trend_cols[0]:
+# Revenue and engagement trends
+@st.fragment
+def revenue_trend_chart(filter_key):
     st.markdown('<div class="chart-container">', unsafe_allow_html=True)
     st.subheader("📈 Revenue Trend Over Time")
-    
-    # Filter tracking data based on current filters
-    filtered_tracking = tracking_data.copy()
-    if brand_filter != 'All':
-        filtered_tracking = filtered_tracking[filtered_tracking['brand'] == brand_filter]
-    if campaign_filter != 'All':
-        filtered_tracking = filtered_tracking[filtered_tracking['campaign'] == campaign_filter]
-    
-    daily_revenue = filtered_tracking.groupby('date')['revenue'].sum().reset_index()
-    
-    fig_trend = px.line(
-        daily_revenue,
-        x='date',
-        y='revenue',
-        title='Daily Revenue Trend',
-        labels={'date': 'Date', 'revenue': 'Revenue (₹)'}
-    )
-    fig_trend.update_traces(line_color='#667eea', line_width=3)
-    fig_trend.update_layout(
-        title_x=0.5,
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        hovermode='x unified'
-    )
-    st.plotly_chart(fig_trend, use_container_width=True)
+
+    trend_cols = st.columns(3)
+    with trend_cols[0]:
+        freq = st.selectbox('Granularity', list(FREQUENCIES), format_func=FREQUENCIES.get, key='trend_freq')
+    with trend_cols[1]:
+        curve = st.selectbox('Curve', list(TREND_CURVES), key='trend_curve')
+    with trend_cols[2]:
+        rolling = st.number_input('Rolling window (periods)', min_value=2, max_value=30, value=7, step=1,
+                                  key='trend_rolling', disabled=curve != 'Rolling average')
+
+    def build():
+        # Bins, rolling means and running totals are differences of a prefix-sum curve cached per filter state
+        brand, platform, campaign, category, date_key, min_f, max_f = filter_key
+        series = pipeline.revenue_series(brand, platform, campaign, category, date_key, min_f, max_f, freq, rolling)
+        return revenue_trend_figure(series, curve, FREQUENCIES[freq])
+
+    show_chart('Revenue Trend', (filter_key, freq, curve, rolling), build)
     st.markdown('</div>', unsafe_allow_html=True)
 
-with trend_cols[1]:
+@st.fragment
+def category_chart(filtered_df, filter_key):
     st.markdown('<div class="chart-container">', unsafe_allow_html=True)
     st.subheader("🎭 Performance by Category")
-    
-    category_performance = filtered_df.groupby('category').agg({
-        'total_revenue': 'sum',
-        'total_payout': 'sum',
-        'roas': 'mean',
-        'id': 'count'
-    }).reset_index()
-    category_performance.columns = ['category', 'revenue', 'spend', 'avg_roas', 'count']
-    
-    fig_category = px.scatter(
-        category_performance,
-        x='spend',
-        y='revenue',
-        size='count',
-        color='avg_roas',
-        hover_name='category',
-        title='Category Performance Matrix',
-        labels={'spend': 'Total Spend (₹)', 'revenue': 'Total Revenue (₹)', 'count': 'Influencer Count'},
-        color_continuous_scale='Viridis'
-    )
-    fig_category.update_layout(
-        title_x=0.5,
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)'
-    )
-    st.plotly_chart(fig_category, use_container_width=True)
+
+    def build():
+        return category_figure(dimension_summary(filtered_df, 'category'))
+
+    show_chart('Performance by Category', filter_key, build)
     st.markdown('</div>', unsafe_allow_html=True)
 
+trend_cols = st.columns(2)
+with trend_cols[0]:
+    revenue_trend_chart(filter_key)
+with trend_cols[1]:
+    category_chart(filtered_df, filter_key)
+
 # Advanced Analytics Section
 st.markdown("## 📊 Advanced Analytics")
 
-analytics_cols = st.columns(3)
-
-with analytics_cols[0]:
+@st.fragment
+def roas_histogram(filtered_df, filter_key):
     st.markdown('<div class="chart-container">', unsafe_allow_html=True)
     st.subheader("🎯 ROAS Distribution")
-    
-    fig_hist = px.histogram(
-        filtered_df[filtered_df['roas'] > 0],
-        x='roas',
-        nbins=30,
-        title='ROAS Distribution Across Influencers',
-        labels={'roas': 'ROAS (x)', 'count': 'Number of Influencers'}
-    )
-    fig_hist.add_vline(x=BASELINE_ROAS, line_dash="dash", line_color="red", 
-                       annotation_text=f"Baseline ROAS ({BASELINE_ROAS}x)")
-    fig_hist.update_layout(
-        title_x=0.5,
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)'
-    )
-    st.plotly_chart(fig_hist, use_container_width=True)
+
+    def build():
+        return roas_histogram_figure(filtered_df, BASELINE_ROAS)
+
+    show_chart('ROAS Distribution', filter_key, build)
     st.markdown('</div>', unsafe_allow_html=True)
 
-with analytics_cols[1]:
+@st.fragment
+def engagement_scatter(filtered_df, filter_key):
     st.markdown('<div class="chart-container">', unsafe_allow_html=True)
     st.subheader("💡 Engagement vs Conversion")
-    
-    # Filter out zero values for better visualization
-    scatter_data = filtered_df[(filtered_df['engagement_rate'] > 0) & (filtered_df['conversion_rate'] > 0)]
-    
-    fig_scatter = px.scatter(
-        scatter_data,
-        x='engagement_rate',
-        y='conversion_rate',
-        size='follower_count',
-        color='roas',
-        hover_name='name',
-        title='Engagement vs Conversion Rate',
-        labels={'engagement_rate': 'Engagement Rate (%)', 'conversion_rate': 'Conversion Rate (%)'},
-        color_continuous_scale='Plasma'
-    )
-    fig_scatter.update_layout(
-        title_x=0.5,
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)'
-    )
-    st.plotly_chart(fig_scatter, use_container_width=True)
+
+    def build():
+        return engagement_scatter_figure(filtered_df, SCATTER_POINT_BUDGET)
+
+    show_chart('Engagement vs Conversion', filter_key, build)
     st.markdown('</div>', unsafe_allow_html=True)
 
-with analytics_cols[2]:
+@st.fragment
+def brand_chart(date_range):
     st.markdown('<div class="chart-container">', unsafe_allow_html=True)
     st.subheader("🏆 Brand Performance")
-    
-    # Filter tracking data and aggregate by brand
-    filtered_tracking_brand = tracking_data.copy()
-    if len(date_range) == 2:
-        start_date, end_date = date_range
-        filtered_tracking_brand = filtered_tracking_brand[
-            (filtered_tracking_brand['date'] >= pd.to_datetime(start_date)) & 
-            (filtered_tracking_brand['date'] <= pd.to_datetime(end_date))
-        ]
-    
-    brand_performance = filtered_tracking_brand.groupby('brand').agg({
-        'revenue': 'sum',
-        'orders': 'sum'
-    }).reset_index()
-    
-    fig_brand = px.bar(
-        brand_performance,
-        x='brand',
-        y='revenue',
-        title='Revenue by Brand',
-        labels={'brand': 'Brand', 'revenue': 'Revenue (₹)'},
-        color='revenue',
-        color_continuous_scale='Blues'
-    )
-    fig_brand.update_layout(
-        title_x=0.5,
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        xaxis_tickangle=-45
-    )
-    st.plotly_chart(fig_brand, use_container_width=True)
+
+    def build():
+        # Revenue and orders by brand within the date range, summed from the cube
+        return brand_figure(pipeline.brand_totals(date_range))
+
+    # Only the date range affects this chart
+    show_chart('Brand Performance', date_range_key(date_range), build)
     st.markdown('</div>', unsafe_allow_html=True)
 
+analytics_cols = st.columns(3)
+with analytics_cols[0]:
+    roas_histogram(filtered_df, filter_key)
+with analytics_cols[1]:
+    engagement_scatter(filtered_df, filter_key)
+with analytics_cols[2]:
+    brand_chart(date_range)
+
+with st.expander("📦 Chart Payloads"):
+    st.dataframe(
+        pd.DataFrame({'Chart': list(chart_payloads), 'Payload (KB)': [b / 1024 for b in chart_payloads.values()]}),
+        column_config={'Payload (KB)': st.column_config.NumberColumn(format='%.1f')},
+        hide_index=True,
+        use_container_width=True
+    )
+
 # --- PERFORMANCE INSIGHTS ---
 st.markdown("## 🔍 Performance Insights")
 
-insight_cols = st.columns(2)
-
-with insight_cols[0]:
+@st.fragment
+def top_performers_table(filter_key):
     st.markdown('<div class="chart-container">', unsafe_allow_html=True)
     st.subheader("⭐ Top Performers Table")
-    
-    # Get top 10 performers with key metrics
-    top_10 = filtered_df.nlargest(10, 'roas')[['name', 'platform', 'category', 'follower_count', 'total_payout', 'total_revenue', 'roas', 'engagement_rate']].copy()
-    
-    # Format for display
-    top_10['follower_count'] = top_10['follower_count'].apply(lambda x: f"{x/1_000_000:.1f}M" if x >= 1_000_000 else f"{x/1_000:.0f}K")
-    top_10['total_payout'] = top_10['total_payout'].apply(lambda x: f"₹{x:,.0f}")
-    top_10['total_revenue'] = top_10['total_revenue'].apply(lambda x: f"₹{x:,.0f}")
-    top_10['roas'] = top_10['roas'].apply(lambda x: f"{x:.2f}x")
-    top_10['engagement_rate'] = top_10['engagement_rate'].apply(lambda x: f"{x:.2f}%")
-    
-    st.dataframe(
-        top_10.rename(columns={
-            'name': 'Influencer',
-            'platform': 'Platform',
-            'category': 'Category',
-            'follower_count': 'Followers',
-            'total_payout': 'Spend',
-            'total_revenue': 'Revenue',
-            'roas': 'ROAS',
-            'engagement_rate': 'Engagement'
-        }),
-        use_container_width=True,
-        height=400
-    )
+
+    with traced_section('table:top_performers'):
+        # Get top 10 performers with key metrics; values stay numeric and are formatted by the column config
+        top_10 = display_frame(pipeline.ranking(*filter_key).top('roas', 10), TOP_PERFORMER_COLUMNS)
+
+        st.dataframe(
+            top_10,
+            column_config=column_config(TOP_PERFORMER_COLUMNS, labels={'engagement_rate': 'Engagement'}),
+            use_container_width=True,
+            height=400
+        )
     st.markdown('</div>', unsafe_allow_html=True)
 
-with insight_cols[1]:
+@st.fragment
+def key_insights(filtered_df):
     st.markdown('<div class="chart-container">', unsafe_allow_html=True)
     st.subheader("📋 Key Insights & Recommendations")
-    
+
     # Calculate insights
-    high_performers = len(filtered_df[filtered_df['roas'] >= BASELINE_ROAS])
-    total_influencers = len(filtered_df[filtered_df['total_payout'] > 0])
-    success_rate = (high_performers / total_influencers * 100) if total_influencers > 0 else 0
-    
-    best_platform = filtered_df.groupby('platform')['roas'].mean().idxmax() if len(filtered_df) > 0 else "N/A"
-    best_category = filtered_df.groupby('category')['roas'].mean().idxmax() if len(filtered_df) > 0 else "N/A"
-    
-    avg_engagement = filtered_df['engagement_rate'].mean()
-    high_engagement_threshold = avg_engagement * 1.5
-    
+    with traced_section('insights'):
+        high_performers = len(filtered_df[filtered_df['roas'] >= BASELINE_ROAS])
+        total_influencers = len(filtered_df[filtered_df['total_payout'] > 0])
+        success_rate = (high_performers / total_influencers * 100) if total_influencers > 0 else 0
+
+        best_platform = filtered_df.groupby('platform')['roas'].mean().idxmax() if len(filtered_df) > 0 else "N/A"
+        best_category = filtered_df.groupby('category')['roas'].mean().idxmax() if len(filtered_df) > 0 else "N/A"
+
+        avg_engagement = filtered_df['engagement_rate'].mean()
+
     insights_html = f"""
     <div style="padding: 1rem; background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%); border-radius: 10px; color: white; margin-bottom: 1rem;">
         <h4>📈 Performance Summary</h4>
@@ -750,7 +469,7 @@ with insight_cols[1]:
             <li>💡 Average engagement rate: <strong>{avg_engagement:.2f}%</strong></li>
         </ul>
     </div>
-    
+
     <div style="padding: 1rem; background: linear-gradient(135deg, #4facfe 0%, #00f2fe 100%); border-radius: 10px; color: white;">
         <h4>🚀 Recommendations</h4>
         <ul style="list-style: none; padding: 0;">
@@ -761,76 +480,138 @@ with insight_cols[1]:
         </ul>
     </div>
     """
-    
+
     st.markdown(insights_html, unsafe_allow_html=True)
     st.markdown('</div>', unsafe_allow_html=True)
 
+insight_cols = st.columns(2)
+with insight_cols[0]:
+    top_performers_table(filter_key)
+with insight_cols[1]:
+    key_insights(filtered_df)
+
+# --- BUDGET OPTIMIZER ---
+# A fragment: changing the budget or a constraint re-solves the plan only
+@st.fragment
+def budget_optimizer(filter_key, default_budget):
+    st.markdown("## 💼 Budget Optimizer")
+    st.markdown('<div class="chart-container">', unsafe_allow_html=True)
+
+    input_cols = st.columns(4)
+    with input_cols[0]:
+        budget = st.number_input('Budget (₹)', min_value=0.0, value=float(default_budget), step=100000.0,
+                                 format='%.0f', key='alloc_budget')
+        basis = st.selectbox('Payout basis', BASES, key='alloc_basis')
+    with input_cols[1]:
+        platform_cap = st.slider('Max share per platform', 0.05, 1.0, 1.0, 0.05, key='alloc_platform_cap')
+        category_cap = st.slider('Max share per category', 0.05, 1.0, 1.0, 0.05, key='alloc_category_cap')
+    with input_cols[2]:
+        min_influencers = st.number_input('Min influencers', min_value=0, value=0, step=10, key='alloc_min_count')
+        max_influencers = st.number_input('Max influencers (0 = no limit)', min_value=0, value=0, step=10,
+                                          key='alloc_max_count')
+    with input_cols[3]:
+        max_scale = st.number_input('Max spend per influencer (x payout)', min_value=0.1, value=2.0, step=0.5,
+                                    key='alloc_max_scale')
+        min_roas = st.number_input('Min ROAS', min_value=0.0, value=0.0, step=0.1, key='alloc_min_roas')
+
+    with traced_section('allocation'):
+        # Solved once per filter state and constraint set; a share of 1.0 leaves a group uncapped
+        plan, summary = pipeline.allocate(
+            budget, *filter_key, basis=basis, min_roas=min_roas,
+            platform_caps=platform_cap if platform_cap < 1.0 else None,
+            category_caps=category_cap if category_cap < 1.0 else None,
+            min_influencers=min_influencers, max_influencers=max_influencers or None, max_scale=max_scale)
+
+    result_cols = st.columns(4)
+    with result_cols[0]:
+        st.metric(label="💰 Planned Spend", value=f"₹{summary['spend']:,.0f}")
+    with result_cols[1]:
+        st.metric(label="💵 Expected Revenue", value=f"₹{summary['expected_revenue']:,.0f}")
+    with result_cols[2]:
+        st.metric(label="📊 Expected ROAS", value=f"{summary['expected_roas']:.2f}x",
+                  delta=f"{summary['expected_roas'] - overall_roas:.2f} vs current")
+    with result_cols[3]:
+        st.metric(label="👥 Influencers Booked", value=f"{summary['influencers']:,}")
+
+    binding = ', '.join(summary['binding']) or 'none (every candidate fully booked)'
+    st.caption(f"{summary['candidates']:,} candidates; binding constraints: {binding}")
+    if summary['min_shortfall']:
+        st.warning(f"Only {summary['influencers']:,} influencers could be booked, "
+                   f"{summary['min_shortfall']:,} short of the minimum")
+
+    if len(plan):
+        plan_cols = st.columns(2)
+        with plan_cols[0]:
+            show_chart('Budget Allocation', (filter_key, budget, basis, platform_cap, category_cap, min_influencers,
+                                             max_influencers, max_scale, min_roas),
+                       lambda: allocation_figure(plan_breakdown(plan, ['platform', 'category'])))
+        with plan_cols[1]:
+            st.dataframe(
+                display_frame(plan.head(PLAN_ROWS), ALLOCATION_COLUMNS),
+                column_config=column_config(ALLOCATION_COLUMNS),
+                use_container_width=True,
+                height=450
+            )
+            if len(plan) > PLAN_ROWS:
+                st.caption(f"Top {PLAN_ROWS} of {len(plan):,} booked influencers by ROAS")
+
+    st.markdown('</div>', unsafe_allow_html=True)
+
+budget_optimizer(filter_key, total_spend)
+
 # --- DETAILED PERFORMANCE TABLE ---
-st.markdown("## 📊 Detailed Performance Analysis")
-st.markdown('<div class="chart-container">', unsafe_allow_html=True)
-
-# Performance filter options
-perf_cols = st.columns(4)
-with perf_cols[0]:
-    sort_by = st.selectbox('Sort by', ['ROAS', 'Revenue', 'Engagement Rate', 'Followers', 'Orders'])
-with perf_cols[1]:
-    sort_order = st.selectbox('Order', ['Descending', 'Ascending'])
-with perf_cols[2]:
-    min_roas_filter = st.number_input('Min ROAS', min_value=0.0, max_value=10.0, value=0.0, step=0.1)
-with perf_cols[3]:
-    show_rows = st.selectbox('Show rows', [20, 50, 100, 200])
-
-# Filter and sort data
-detailed_df = filtered_df[filtered_df['roas'] >= min_roas_filter].copy()
-
-sort_mapping = {
-    'ROAS': 'roas',
-    'Revenue': 'total_revenue', 
-    'Engagement Rate': 'engagement_rate',
-    'Followers': 'follower_count',
-    'Orders': 'total_orders'
-}
-
-detailed_df = detailed_df.sort_values(
-    sort_mapping[sort_by], 
-    ascending=(sort_order == 'Ascending')
-).head(show_rows)
-
-# Format display data
-display_detailed = detailed_df[[
-    'name', 'platform', 'category', 'follower_count', 'total_payout', 
-    'total_revenue', 'total_orders', 'roas', 'engagement_rate', 'cpm', 'conversion_rate'
-]].copy()
-
-display_detailed['follower_count'] = display_detailed['follower_count'].apply(
-    lambda x: f"{x/1_000_000:.1f}M" if x >= 1_000_000 else f"{x/1_000:.0f}K"
-)
-display_detailed['total_payout'] = display_detailed['total_payout'].apply(lambda x: f"₹{x:,.0f}")
-display_detailed['total_revenue'] = display_detailed['total_revenue'].apply(lambda x: f"₹{x:,.0f}")
-display_detailed['roas'] = display_detailed['roas'].apply(lambda x: f"{x:.2f}x")
-display_detailed['engagement_rate'] = display_detailed['engagement_rate'].apply(lambda x: f"{x:.2f}%")
-display_detailed['cpm'] = display_detailed['cpm'].apply(lambda x: f"₹{x:.2f}")
-display_detailed['conversion_rate'] = display_detailed['conversion_rate'].apply(lambda x: f"{x:.3f}%")
-
-st.dataframe(
-    display_detailed.rename(columns={
-        'name': 'Influencer',
-        'platform': 'Platform', 
-        'category': 'Category',
-        'follower_count': 'Followers',
-        'total_payout': 'Spend',
-        'total_revenue': 'Revenue',
-        'total_orders': 'Orders',
-        'roas': 'ROAS',
-        'engagement_rate': 'Engagement %',
-        'cpm': 'CPM',
-        'conversion_rate': 'Conversion %'
-    }),
-    use_container_width=True,
-    height=600
-)
+# A fragment: the sort/threshold/row-count widgets re-sort this table only
+@st.fragment
+def detailed_table(filter_key):
+    st.markdown("## 📊 Detailed Performance Analysis")
+    st.markdown('<div class="chart-container">', unsafe_allow_html=True)
 
-st.markdown('</div>', unsafe_allow_html=True)
+    # Performance filter options
+    perf_cols = st.columns(5)
+    with perf_cols[0]:
+        sort_by = st.selectbox('Sort by', ['ROAS', 'Revenue', 'Engagement Rate', 'Followers', 'Orders'])
+    with perf_cols[1]:
+        sort_order = st.selectbox('Order', ['Descending', 'Ascending'])
+    with perf_cols[2]:
+        min_roas_filter = st.number_input('Min ROAS', min_value=0.0, max_value=10.0, value=0.0, step=0.1)
+    with perf_cols[3]:
+        show_rows = st.selectbox('Show rows', [20, 50, 100, 200])
+
+    with traced_section('table:detailed'):
+        # Ranked with top-K selection; deeper pages reuse an order cached per filter state
+        ranking = pipeline.ranking(*filter_key)
+        thresholds = {'roas': min_roas_filter}
+        page_count = max(-(-ranking.count(thresholds) // show_rows), 1)
+        with perf_cols[4]:
+            page = st.number_input('Page', min_value=1, max_value=page_count, value=1, step=1)
+
+        sort_mapping = {
+            'ROAS': 'roas',
+            'Revenue': 'total_revenue',
+            'Engagement Rate': 'engagement_rate',
+            'Followers': 'follower_count',
+            'Orders': 'total_orders'
+        }
+
+        detailed_df = ranking.top(
+            sort_mapping[sort_by],
+            show_rows,
+            ascending=(sort_order == 'Ascending'),
+            offset=(page - 1) * show_rows,
+            min_values=thresholds
+        )
+
+        # Numeric columns are formatted in the browser by the column config, whatever the row count
+        st.dataframe(
+            display_frame(detailed_df, DETAILED_COLUMNS),
+            column_config=column_config(DETAILED_COLUMNS),
+            use_container_width=True,
+            height=600
+        )
+
+    st.markdown('</div>', unsafe_allow_html=True)
+
+detailed_table(filter_key)
 
 # --- FOOTER ---
 st.markdown("---")
@@ -845,8 +626,54 @@ st.markdown("""
     </div>
 </div>
 """.format(
-    len(influencers),
-    len(tracking_data['campaign'].unique()),
-    len(posts),
-    len(tracking_data['brand'].unique())
+    len(pipeline.influencers_df),
+    len(pipeline.dimension_values('campaign')),
+    pipeline.row_counts()['posts'],
+    len(pipeline.dimension_values('brand'))
 ), unsafe_allow_html=True)
+
+# --- PERFORMANCE ---
+if rerun_tracer is not None:
+    rerun_tracer.stop()
+    record_trace(rerun_tracer)
+
+traces = st.session_state.get('traces', [])
+if traces:
+    with st.expander("⏱️ Performance"):
+        # The latest trace is this rerun, or the fragment rerun that last changed a section
+        trace = traces[-1]
+        spans = pd.DataFrame(trace['spans'])
+        top_level = spans[spans['depth'] == 0]['seconds'].sum()
+        st.caption(f"{trace['name']}: {top_level * 1000:,.1f} ms traced in {len(spans)} spans "
+                   f"({len(traces)} traces kept)")
+        st.plotly_chart(flame_figure(trace['spans']), use_container_width=True)
+
+        stage_cols = st.columns(2)
+        with stage_cols[0]:
+            stage_stats = spans.groupby('name', sort=False).agg(
+                calls=('seconds', 'size'), total_ms=('seconds', 'sum'), peak_kb=('peak_kb', 'max')
+            ).assign(total_ms=lambda d: d['total_ms'] * 1000).sort_values('total_ms', ascending=False)
+            st.dataframe(
+                stage_stats if stage_stats['peak_kb'].notna().any() else stage_stats.drop(columns='peak_kb'),
+                column_config={
+                    'calls': st.column_config.NumberColumn('Calls'),
+                    'total_ms': st.column_config.NumberColumn('Total (ms)', format='%.1f'),
+                    'peak_kb': st.column_config.NumberColumn('Process peak (KB)', format='%,.0f',
+                                                             help='tracemalloc peak of the whole server process '
+                                                                  'while the span was open')
+                },
+                use_container_width=True
+            )
+        with stage_cols[1]:
+            cache_stats = pd.DataFrame({**pipeline.cache_stats(), 'figures': get_figure_cache().stats()}).T
+            cache_stats['hit_rate'] = cache_stats['hits'] / (cache_stats['hits'] + cache_stats['misses']).where(
+                lambda n: n > 0)
+            st.dataframe(
+                cache_stats,
+                column_config={'hit_rate': st.column_config.NumberColumn('Hit rate', format='percent')},
+                use_container_width=True
+            )
+
+        if st.button("Export traces", key="export_traces"):
+            write_chrome_trace(traces, TRACE_FILE)
+            st.success(f"Wrote {len(traces)} traces to {TRACE_FILE} (open in chrome://tracing or Perfetto)")
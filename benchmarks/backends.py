@@ -0,0 +1,98 @@
+"""Cross-check and time the query backends against the pandas process_data path.
+
+For each roster size, runs every filter set of the benchmark suite through the
+raw pandas ``process_data``, the cube-backed ``FilterPipeline`` and the DuckDB
+backend, asserts that all three return identical frames (values, dtypes and
+row order), and prints the best wall time of each. Exits non-zero on a
+mismatch. Needs the optional duckdb package. The same equality is asserted
+by ``tests/test_backends.py`` on a small roster; this script is for timing.
+With ``--output`` the timings are also written as JSON, with the commit, the
+library versions and the core count they were measured with;
+``benchmarks/backends.json`` is the run the DuckDB backend's numbers quote.
+
+Run from the repository root:
+
+    python -m benchmarks.backends --sizes 20000 200000 2000000
+    python -m benchmarks.backends --sizes 200000 1000000 2000000 --output benchmarks/backends.json
+"""
+import argparse
+import datetime
+import os
+import platform
+import sys
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.suite import FILTER_SETS, git_commit, measure, save_json
+from engine import load_dataset
+from pipeline import FilterPipeline, process_data
+from sqlbackend import DuckDBBackend
+
+
+def run_size(n, repeat=3, threads=None):
+    """Filter set -> {path: seconds}; raises AssertionError when the paths disagree"""
+    tables = load_dataset(None, n)
+    pipeline = FilterPipeline(*tables)
+    backend = DuckDBBackend(*tables, threads=threads)
+    print(f"\n{n:,} influencers, {len(tables[2]):,} tracking rows, {len(tables[1]):,} posts")
+
+    def cold_process(filters):
+        pipeline.clear()
+        return pipeline.process(*filters)
+
+    timings = {}
+    for name, filters in FILTER_SETS.items():
+        expected, pandas_stats = measure(lambda: process_data(*tables, *filters), repeat)
+        cube_df, cube_stats = measure(lambda: cold_process(filters), repeat)
+        duckdb_df, duckdb_stats = measure(lambda: backend.process(*filters), repeat)
+        expected = expected.reset_index(drop=True)
+        pd.testing.assert_frame_equal(cube_df, expected, check_exact=True)
+        pd.testing.assert_frame_equal(duckdb_df, expected, check_exact=True)
+        timings[name] = {'pandas': pandas_stats['seconds'], 'cube': cube_stats['seconds'],
+                         'duckdb': duckdb_stats['seconds']}
+    backend.close()
+    return timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[20000, 200000, 2000000])
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per path; the best is kept')
+    parser.add_argument('--threads', type=int, help='DuckDB worker threads (default: all cores)')
+    parser.add_argument('--output', help='JSON file to write the timings to')
+    args = parser.parse_args(argv)
+
+    results = {}
+    for n in args.sizes:
+        try:
+            timings = results[str(n)] = run_size(n, args.repeat, args.threads)
+        except AssertionError as e:
+            print(f"MISMATCH at {n:,} influencers: {e}")
+            return 1
+        print(f"{'filter set':<28} {'pandas':>10} {'cube':>10} {'duckdb':>10} {'pandas/duckdb':>14}")
+        for name, t in timings.items():
+            print(f"{name:<28} {t['pandas']:>10.4f} {t['cube']:>10.4f} {t['duckdb']:>10.4f} "
+                  f"{t['pandas'] / t['duckdb']:>13.1f}x")
+    print("\nall backends agree")
+
+    if args.output:
+        import duckdb
+        save_json(args.output, {
+            'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'duckdb': duckdb.__version__,
+            'cpus': os.cpu_count(),
+            'threads': args.threads,
+            'repeat': args.repeat,
+            'results': results,
+        })
+        print(f"timings saved to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,61 @@
+"""Microbenchmark of the bitmap filter index against full-column boolean masks.
+
+Builds a synthetic roster, then resolves a set of sidebar filter combinations
+both with the original string-equality/range masks and with ``FilterIndex``.
+
+    python -m benchmarks.bench_filter_index --rows 1000000
+"""
+import argparse
+import itertools
+import time
+
+import numpy as np
+
+from filterindex import FilterIndex
+from synthetic import CATEGORIES, PLATFORMS, generate_influencers
+
+FOLLOWER_RANGES = [(0, 10000000), (500000, 10000000), (50000, 2000000)]
+
+
+def mask_select(df, platform, category, min_followers, max_followers):
+    """The original filter path: one full-column comparison per filter"""
+    mask = (df['follower_count'] >= min_followers) & (df['follower_count'] <= max_followers)
+    if platform != 'All':
+        mask &= df['platform'] == platform
+    if category != 'All':
+        mask &= df['category'] == category
+    return mask.to_numpy()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000)
+    args = parser.parse_args(argv)
+
+    df = generate_influencers(args.rows, np.random.default_rng(42))
+    start = time.perf_counter()
+    index = FilterIndex(df, categorical=['platform', 'category'], ranges=['follower_count'])
+    build_seconds = time.perf_counter() - start
+
+    combos = list(itertools.product(['All'] + PLATFORMS[:2], ['All'] + CATEGORIES[:2], FOLLOWER_RANGES))
+    mask_seconds = bitmap_seconds = 0.0
+    for platform, category, (low, high) in combos:
+        start = time.perf_counter()
+        expected = mask_select(df, platform, category, low, high)
+        mask_seconds += time.perf_counter() - start
+
+        start = time.perf_counter()
+        actual = index.select(platform=platform, category=category, follower_count=(low, high))
+        bitmap_seconds += time.perf_counter() - start
+
+        actual = np.ones(len(df), dtype=bool) if actual is None else actual
+        assert np.array_equal(expected, actual), (platform, category, low, high)
+
+    print(f"rows: {args.rows:,}  combinations: {len(combos)}  index build: {build_seconds:.3f}s")
+    print(f"masks:  {mask_seconds / len(combos) * 1000:8.2f} ms per combination")
+    print(f"bitmap: {bitmap_seconds / len(combos) * 1000:8.2f} ms per combination "
+          f"({mask_seconds / bitmap_seconds:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
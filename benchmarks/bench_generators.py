@@ -0,0 +1,124 @@
+"""Scaling regression benchmark for the synthetic tracking and payout generators.
+
+Times ``generate_tracking`` and ``generate_payouts`` at doubling roster sizes and
+fits the log-log slope of time against size. With the precomputed lookup indexes
+the slope should stay close to 1 (linear). At the smaller ``--baseline-sizes``
+it also times the per-row scans of the original generators over the same rows
+and reports the speedup of the indexed generators. Each scan is a full-column
+mask, so that cost is rows x table size; at these sizes pandas' per-call
+overhead still dominates it, and the speedup, not the slope, shows the gap
+(about 240x at 1,000 influencers and 630x at 4,000).
+
+Run from the repository root:
+
+    python -m benchmarks.bench_generators --sizes 20000 40000 80000 160000 --baseline-sizes 1000 2000 4000
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from synthetic import generate_influencers, generate_payouts, generate_posts, generate_tracking
+
+
+def _best_of(func, repeat):
+    """Best wall time of several runs, in seconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run(sizes, repeat=3, seed=42):
+    """Time the tracking and payout generators at each roster size"""
+    results = []
+    for n in sizes:
+        rng = np.random.default_rng(seed)
+        influencers_df = generate_influencers(n, rng)
+        posts_df = generate_posts(influencers_df, rng)
+        tracking_df = generate_tracking(influencers_df, posts_df, rng)
+
+        tracking_time = _best_of(
+            lambda: generate_tracking(influencers_df, posts_df, np.random.default_rng(seed)), repeat)
+        payouts_time = _best_of(
+            lambda: generate_payouts(influencers_df, tracking_df, np.random.default_rng(seed)), repeat)
+        results.append({'n': n, 'tracking_s': tracking_time, 'payouts_s': payouts_time})
+    return results
+
+
+def original_lookups(influencers_df, posts_df, tracking_df, payouts_df):
+    """The per-row scans of the original generate_tracking_data/generate_payouts_data, over the same rows"""
+    for influencer_id in tracking_df['influencer_id'].to_numpy():
+        influencer = influencers_df[influencers_df['id'] == influencer_id].iloc[0]
+        influencer_posts = posts_df[posts_df['influencer_id'] == influencer_id]
+        if len(influencer_posts) == 0:
+            influencer['follower_count'] * 0.3
+        else:
+            influencer_posts['reach'].mean()
+    for influencer_id in payouts_df.loc[payouts_df['basis'] == 'order', 'influencer_id'].to_numpy():
+        tracking_df[tracking_df['influencer_id'] == influencer_id]['orders'].sum()
+
+
+def run_baseline(sizes, seed=42):
+    """Time the indexed generators and the original per-row scans at each (small) roster size"""
+    results = []
+    for n in sizes:
+        rng = np.random.default_rng(seed)
+        influencers_df = generate_influencers(n, rng)
+        posts_df = generate_posts(influencers_df, rng)
+        tracking_df = generate_tracking(influencers_df, posts_df, rng)
+        payouts_df = generate_payouts(influencers_df, tracking_df, rng)
+
+        indexed_time = _best_of(lambda: (
+            generate_tracking(influencers_df, posts_df, np.random.default_rng(seed)),
+            generate_payouts(influencers_df, tracking_df, np.random.default_rng(seed))), 3)
+        original_time = _best_of(lambda: original_lookups(influencers_df, posts_df, tracking_df, payouts_df), 1)
+        results.append({'n': n, 'indexed_s': indexed_time, 'original_s': original_time})
+    return results
+
+
+def scaling_exponent(sizes, timings):
+    """Slope of log(time) against log(size)"""
+    slope, _ = np.polyfit(np.log(sizes), np.log(timings), 1)
+    return slope
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[20000, 40000, 80000, 160000])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--max-exponent', type=float, default=1.3,
+                        help='fail when the fitted scaling exponent exceeds this value')
+    parser.add_argument('--baseline-sizes', type=int, nargs='*', default=[1000, 2000, 4000],
+                        help='also time the original per-row scans at these sizes (none to skip)')
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, args.repeat)
+    print(f"{'influencers':>12} {'tracking (s)':>14} {'payouts (s)':>13}")
+    for row in results:
+        print(f"{row['n']:>12,} {row['tracking_s']:>14.4f} {row['payouts_s']:>13.4f}")
+
+    failed = False
+    for column in ('tracking_s', 'payouts_s'):
+        exponent = scaling_exponent(args.sizes, [row[column] for row in results])
+        status = 'ok' if exponent <= args.max_exponent else 'REGRESSION'
+        failed |= exponent > args.max_exponent
+        print(f"{column[:-2]} scaling exponent: {exponent:.2f} ({status})")
+
+    if args.baseline_sizes:
+        baseline = run_baseline(args.baseline_sizes)
+        print(f"\n{'influencers':>12} {'indexed (s)':>13} {'original scans (s)':>19} {'speedup':>8}")
+        for row in baseline:
+            print(f"{row['n']:>12,} {row['indexed_s']:>13.4f} {row['original_s']:>19.4f} "
+                  f"{row['original_s'] / row['indexed_s']:>7.0f}x")
+        if len(baseline) > 1:
+            exponent = scaling_exponent(args.baseline_sizes, [row['original_s'] for row in baseline])
+            print(f"original scans scaling exponent: {exponent:.2f}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,69 @@
+"""Load-time and memory comparison of the ingest formats.
+
+Writes a synthetic dataset to a temporary directory, then loads it three ways:
+plain object-dtype CSV followed by ``pd.to_datetime`` (the old path), the
+projected/typed CSV import and the projected Parquet/Feather reads.
+
+    python -m benchmarks.bench_ingest --influencers 200000
+"""
+import argparse
+import tempfile
+import time
+
+import pandas as pd
+
+import ingest
+from synthetic import generate_dataset
+
+
+def _frame_bytes(tables):
+    return sum(df.memory_usage(deep=True).sum() for df in tables)
+
+
+def _load_plain_csv(data_dir):
+    tables = [pd.read_csv(ingest.table_path(data_dir, table, 'csv')) for table in ingest.TABLE_NAMES]
+    for df in tables:
+        if 'date' in df.columns:
+            df['date'] = pd.to_datetime(df['date'])
+    return tables
+
+
+def _timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def run(n_influencers):
+    """Load time and in-memory size for each ingest path"""
+    tables = generate_dataset(n_influencers)
+    results = []
+    with tempfile.TemporaryDirectory() as data_dir:
+        ingest.write_tables(tables, data_dir, 'csv')
+        seconds, loaded = _timed(lambda: _load_plain_csv(data_dir))
+        results.append(('csv (object dtypes)', seconds, _frame_bytes(loaded)))
+        seconds, loaded = _timed(lambda: ingest.load_tables(data_dir, ingest.DASHBOARD_COLUMNS))
+        results.append(('csv import (typed)', seconds, _frame_bytes(loaded)))
+
+        for fmt in ('feather', 'parquet'):
+            ingest.write_tables(tables, data_dir, fmt)  # table_path prefers parquet, then feather
+            seconds, loaded = _timed(lambda: ingest.load_tables(data_dir, ingest.DASHBOARD_COLUMNS))
+            results.append((fmt, seconds, _frame_bytes(loaded)))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--influencers', type=int, default=200000)
+    args = parser.parse_args(argv)
+
+    results = run(args.influencers)
+    base_seconds, base_bytes = results[0][1], results[0][2]
+    print(f"{'path':<22} {'load (s)':>10} {'memory (MB)':>12} {'speedup':>8} {'memory':>7}")
+    for name, seconds, size in results:
+        print(f"{name:<22} {seconds:>10.3f} {size / 1e6:>12.1f} {base_seconds / seconds:>7.1f}x "
+              f"{size / base_bytes:>6.0%}")
+
+
+if __name__ == '__main__':
+    main()
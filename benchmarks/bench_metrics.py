@@ -0,0 +1,61 @@
+"""Vectorized metrics against the original row-wise ``df.apply`` path.
+
+    python -m benchmarks.bench_metrics --rows 10000 100000 1000000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from metrics import METRIC_COLUMNS, add_metrics
+
+
+def apply_metrics(df):
+    """The original row-wise metric computation, kept as the benchmark reference"""
+    df['roas'] = df.apply(lambda row: row['total_revenue'] / row['total_payout'] if row['total_payout'] > 0 else 0, axis=1)
+    df['engagement_rate'] = df.apply(lambda row: (row['total_likes'] + row['total_comments']) / row['total_reach'] * 100 if row['total_reach'] > 0 else 0, axis=1)
+    df['cpm'] = df.apply(lambda row: (row['total_payout'] / row['total_reach']) * 1000 if row['total_reach'] > 0 else 0, axis=1)
+    df['conversion_rate'] = df.apply(lambda row: (row['total_orders'] / row['total_reach']) * 100 if row['total_reach'] > 0 else 0, axis=1)
+    return df
+
+
+def make_aggregates(n, seed=42):
+    """Aggregate columns with a realistic share of zero payouts and zero reach"""
+    rng = np.random.default_rng(seed)
+    reach = rng.integers(0, 2000000, n).astype(np.float64)
+    reach[rng.random(n) < 0.1] = 0
+    payout = rng.integers(5000, 300000, n).astype(np.float64)
+    payout[rng.random(n) < 0.25] = 0
+    return pd.DataFrame({
+        'total_revenue': rng.integers(0, 5000000, n).astype(np.float64),
+        'total_orders': rng.integers(0, 5000, n).astype(np.float64),
+        'total_reach': reach,
+        'total_likes': (reach * 0.05).round(),
+        'total_comments': (reach * 0.01).round(),
+        'total_payout': payout,
+    })
+
+
+def _timed(func, df):
+    start = time.perf_counter()
+    result = func(df.copy())
+    return time.perf_counter() - start, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000])
+    args = parser.parse_args(argv)
+
+    print(f"{'rows':>10} {'apply (s)':>10} {'vectorized (s)':>15} {'speedup':>8}")
+    for n in args.rows:
+        df = make_aggregates(n)
+        apply_seconds, expected = _timed(apply_metrics, df)
+        vector_seconds, actual = _timed(add_metrics, df)
+        pd.testing.assert_frame_equal(expected[METRIC_COLUMNS], actual[METRIC_COLUMNS])
+        print(f"{n:>10,} {apply_seconds:>10.3f} {vector_seconds:>15.4f} {apply_seconds / vector_seconds:>7.0f}x")
+
+
+if __name__ == '__main__':
+    main()
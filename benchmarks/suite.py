@@ -0,0 +1,241 @@
+"""Benchmark suite for the dashboard pipeline at several data sizes.
+
+For each roster size, times and measures the peak traced memory (Python and
+NumPy allocations; Arrow's own pool is not traced) of: the four synthetic
+generators, ``load_all_data`` (reading the compact tables back from Parquet),
+cold and warm starts through the persistent disk cache, the raw and memoized
+``process_data`` paths and the revenue time series under representative filter
+sets, every chart's figure construction and the table preparation.
+Each run is appended to a JSON history and compared with a stored baseline;
+a stage slower or larger than the baseline by more than the tolerance is
+flagged as a regression. Timings only compare on the same machine, so no
+baseline ships with the repository: save one first (``--save-baseline``) on
+the machine that runs the suite, before the changes to be checked. Without a
+baseline a run is only recorded in the history. The history is ignored by git,
+so running the suite leaves the tree clean; only a baseline is ever written on
+purpose.
+
+Run from the repository root:
+
+    python -m benchmarks.suite --sizes 2000 20000 200000 2000000
+    python -m benchmarks.suite --sizes 2000 20000 --save-baseline
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from allocation import allocate_budget, candidate_frame
+from bootstrap import roas_intervals
+from charts import (brand_figure, category_figure, engagement_scatter_figure, platform_figure, revenue_trend_figure,
+                    roas_histogram_figure, top_performers_figure)
+from engine import BASELINE_ROAS, build_pipeline, dimension_summary, load_dataset
+from formatting import DETAILED_COLUMNS, TOP_PERFORMER_COLUMNS, display_frame
+from ingest import write_tables
+from pipeline import FilterPipeline, process_data
+from ranking import Ranking
+from schema import compact_tables
+from synthetic import (BRANDS, CAMPAIGNS, CATEGORIES, PLATFORMS, START_DATE, generate_influencers, generate_payouts,
+                       generate_posts, generate_tracking)
+from timeseries import TimeSeries
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+# Untracked (.gitignore); every run appends to it
+DEFAULT_HISTORY = os.path.join(BENCHMARK_DIR, 'history.json')
+DEFAULT_BASELINE = os.path.join(BENCHMARK_DIR, 'baseline.json')
+
+FILTER_SETS = {
+    'all': ('All', 'All', 'All', 'All', None, 0, 10000000),
+    'brand_platform': (BRANDS[0], PLATFORMS[0], 'All', 'All', None, 0, 10000000),
+    'campaign_category_dates': ('All', 'All', CAMPAIGNS[0], CATEGORIES[0],
+                                (pd.Timestamp(START_DATE) + pd.Timedelta(days=30),
+                                 pd.Timestamp(START_DATE) + pd.Timedelta(days=90)), 0, 10000000),
+    'followers': ('All', 'All', 'All', 'All', None, 100000, 2000000),
+}
+# Stages faster than this are never flagged; their timings are mostly noise
+MIN_FLAGGED_SECONDS = 0.005
+
+
+def measure(func, repeat):
+    """Best wall time over repeat runs, and the peak traced memory of one more run; returns (result, stats)"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    result = func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, {'seconds': min(timings), 'peak_mb': peak / 1e6}
+
+
+def run_size(n, repeat=3, seed=42):
+    """Stage name -> {'seconds', 'peak_mb'} for one roster size"""
+    stats = {}
+
+    def stage(name, func):
+        result, stats[name] = measure(func, repeat)
+        return result
+
+    # Generators, each timed on the outputs of the previous one
+    influencers = stage('generate_influencers', lambda: generate_influencers(n, np.random.default_rng(seed)))
+    posts = stage('generate_posts', lambda: generate_posts(influencers, np.random.default_rng(seed)))
+    tracking = stage('generate_tracking', lambda: generate_tracking(influencers, posts, np.random.default_rng(seed)))
+    payouts = stage('generate_payouts', lambda: generate_payouts(influencers, tracking, np.random.default_rng(seed)))
+    tables = compact_tables((influencers, posts, tracking, payouts))
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        write_tables(tables, data_dir, 'parquet')
+        tables = stage('load_all_data', lambda: load_dataset(data_dir))
+
+        cache_dir = os.path.join(data_dir, 'cache')
+
+        def cold_start():
+            shutil.rmtree(cache_dir, ignore_errors=True)
+            return build_pipeline(data_dir, cache_dir=cache_dir).process(*FILTER_SETS['all'])
+
+        # A server restart: tables, cubes and the default view are read back from disk
+        stage('disk_cache_cold_start', cold_start)
+        stage('disk_cache_warm_start',
+              lambda: build_pipeline(data_dir, cache_dir=cache_dir).process(*FILTER_SETS['all']))
+
+    for name, filters in FILTER_SETS.items():
+        stage(f'process_data:{name}', lambda: process_data(*tables, *filters))
+    pipeline = stage('pipeline_build', lambda: FilterPipeline(*tables))
+
+    def cold_process(filters):
+        pipeline.clear()
+        return pipeline.process(*filters)
+
+    for name, filters in FILTER_SETS.items():
+        stage(f'pipeline_process:{name}', lambda: cold_process(filters))
+
+    all_filters = FILTER_SETS['all']
+    filtered_df = pipeline.process(*all_filters)
+    stage('chart:top_performers', lambda: top_performers_figure(Ranking(filtered_df).top('roas', 20)))
+    stage('chart:platform', lambda: platform_figure(dimension_summary(filtered_df, 'platform')))
+    stage('timeseries_build', lambda: TimeSeries(pipeline.cube.tracking_cube, pipeline.influencers_df))
+
+    def cold_series(filters):
+        pipeline.curve_cache.clear()
+        return pipeline.revenue_series(*filters, freq='W')
+
+    for name, filters in FILTER_SETS.items():
+        stage(f'revenue_series:{name}', lambda: cold_series(filters))
+    stage('chart:revenue_trend', lambda: revenue_trend_figure(pipeline.revenue_series(*all_filters)))
+    stage('roas_intervals', lambda: roas_intervals(filtered_df, BASELINE_ROAS))
+    stage('chart:category', lambda: category_figure(dimension_summary(filtered_df, 'category')))
+    stage('chart:roas_histogram', lambda: roas_histogram_figure(filtered_df, BASELINE_ROAS))
+    stage('chart:engagement_scatter', lambda: engagement_scatter_figure(filtered_df))
+    stage('chart:brand', lambda: brand_figure(pipeline.cube.brand_totals()))
+
+    stage('table:top_performers', lambda: display_frame(Ranking(filtered_df).top('roas', 10), TOP_PERFORMER_COLUMNS))
+    stage('table:detailed_200', lambda: display_frame(
+        Ranking(filtered_df).top('total_revenue', 200, min_values={'roas': 1.0}), DETAILED_COLUMNS))
+
+    # Budget plans over every candidate: budget and per-influencer caps only, then crossing group and count caps
+    candidates = candidate_frame(filtered_df, pipeline.payouts_df)
+    budget = float(filtered_df['total_payout'].sum())
+    stage('allocation:budget', lambda: allocate_budget(candidates, budget, max_scale=2.0))
+    stage('allocation:constrained', lambda: allocate_budget(candidates, budget, platform_caps=0.3, category_caps=0.2,
+                                                            max_influencers=len(candidates) // 2, max_scale=2.0))
+    return stats
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, tolerance):
+    """(size, stage, metric, value, baseline value) for every stage worse than baseline * (1 + tolerance)"""
+    regressions = []
+    for size, stages in results.items():
+        for name, stats in stages.items():
+            base = baseline.get('results', {}).get(size, {}).get(name)
+            if base is None:
+                continue
+            if stats['seconds'] > base['seconds'] * (1 + tolerance) and stats['seconds'] >= MIN_FLAGGED_SECONDS:
+                regressions.append((size, name, 'seconds', stats['seconds'], base['seconds']))
+            if stats['peak_mb'] > base['peak_mb'] * (1 + tolerance) and stats['peak_mb'] - base['peak_mb'] >= 1:
+                regressions.append((size, name, 'peak_mb', stats['peak_mb'], base['peak_mb']))
+    return regressions
+
+
+def load_json(path, default):
+    if not os.path.exists(path):
+        return default
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_json(path, data):
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[2000, 20000, 200000, 2000000])
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per stage; the best is kept')
+    parser.add_argument('--history', default=DEFAULT_HISTORY, help='JSON file every run is appended to')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true', help='store this run as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='flag stages slower or larger than the baseline by more than this fraction')
+    args = parser.parse_args(argv)
+
+    results = {}
+    for n in args.sizes:
+        results[str(n)] = run_size(n, args.repeat)
+        print(f"\n{n:,} influencers")
+        print(f"{'stage':<40} {'seconds':>10} {'peak MB':>10}")
+        for name, stats in results[str(n)].items():
+            print(f"{name:<40} {stats['seconds']:>10.4f} {stats['peak_mb']:>10.1f}")
+
+    run = {
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'repeat': args.repeat,
+        'results': results,
+    }
+    history = load_json(args.history, [])
+    history.append(run)
+    save_json(args.history, history)
+
+    if args.save_baseline:
+        save_json(args.baseline, run)
+        print(f"\nbaseline saved to {args.baseline}")
+        return 0
+
+    baseline = load_json(args.baseline, None)
+    if baseline is None:
+        print(f"\nno baseline at {args.baseline}; run with --save-baseline to create one")
+        return 0
+    regressions = compare(results, baseline, args.tolerance)
+    for size, name, metric, value, base in regressions:
+        print(f"REGRESSION {int(size):,} {name} {metric}: {value:.4f} vs baseline {base:.4f} ({value / base:.2f}x)")
+    if not regressions:
+        print(f"\nno regressions against baseline {baseline.get('commit') or ''} ({baseline['timestamp']})")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,148 @@
+"""Bootstrap confidence intervals for overall, incremental and per-segment ROAS.
+
+ROAS is a ratio of sums over influencers, so a replicate only needs the
+resampled revenue and spend totals. Each influencer is one row of a matrix
+holding its revenue and spend, overall and per platform/category value (zero
+outside its own segment). Every replicate's totals are then one row of
+``counts @ values``, where ``counts`` holds how often each influencer was
+drawn: all replicates come from one batched matrix product, with no loop over
+replicates.
+
+Rosters larger than ``SUBSET_ROWS`` use the bag of little bootstraps (Kleiner
+et al., 2014). Each of ``SUBSETS`` random subsets of ``b`` influencers is
+resampled to the full roster size, so the work is bounded by replicates x
+``b`` instead of replicates x roster size. The weights are Gamma(n / b) draws,
+the continuous (Bayesian bootstrap) form of the multinomial counts: they have
+the same mean and nearly the same variance, and are several times cheaper to
+draw. ROAS is a ratio, so the weights need no normalizing. A subset's replicates
+scatter around that subset's own ROAS, which is skewed for heavy-tailed
+revenue. So the deviations from it are averaged over the subsets and added to
+the full-roster estimate.
+"""
+import warnings
+
+import numpy as np
+import pandas as pd
+
+REPLICATES = 2000
+CONFIDENCE = 0.95
+INTERVAL_DIMENSIONS = ['platform', 'category']
+# Rosters up to this size are resampled whole; larger ones in subsets of at least this many rows
+SUBSET_ROWS = 2000
+SUBSET_EXPONENT = 0.6
+SUBSETS = 10
+# Exact counts from index draws and one bincount up to this many draws per row, Gamma weights beyond
+DRAW_RATIO = 2
+
+
+def resample_weights(rng, n_draws, n_rows, replicates):
+    """Weight of each of n_rows rows in a resample of n_draws draws, one row per replicate"""
+    if n_draws <= DRAW_RATIO * n_rows:
+        draws = rng.integers(0, n_rows, size=(replicates, n_draws), dtype=np.int32)
+        draws += (np.arange(replicates, dtype=np.int32) * n_rows)[:, None]
+        return np.bincount(draws.ravel(), minlength=replicates * n_rows).reshape(replicates, n_rows).astype(np.float64)
+    return rng.standard_gamma(n_draws / n_rows, size=(replicates, n_rows))
+
+
+def segments(filtered_df, dimensions=INTERVAL_DIMENSIONS):
+    """(dimension, value) label of every segment, 'overall' first, and each row's segment number per dimension"""
+    labels = [('overall', 'All')]
+    codes = []
+    for dim in dimensions:
+        dim_codes, values = pd.factorize(filtered_df[dim], sort=True)
+        codes.append(np.where(dim_codes >= 0, dim_codes + len(labels), -1))
+        labels += [(dim, value) for value in values]
+    return labels, codes
+
+
+def segment_matrix(revenue, spend, codes, n_segments):
+    """Revenue and spend of every row in each segment it belongs to, zero elsewhere
+
+    Segment i's revenue and spend are columns 2i and 2i + 1.
+    """
+    matrix = np.zeros((len(revenue), n_segments, 2))
+    matrix[:, 0] = np.column_stack([revenue, spend])
+    for dim_codes in codes:
+        rows = np.flatnonzero(dim_codes >= 0)
+        matrix[rows, dim_codes[rows], 0] = revenue[rows]
+        matrix[rows, dim_codes[rows], 1] = spend[rows]
+    return matrix.reshape(len(revenue), 2 * n_segments)
+
+
+def ratio(totals):
+    """ROAS from interleaved revenue and spend totals along the last axis; NaN without spend"""
+    roas = np.full(totals.shape[:-1] + (totals.shape[-1] // 2,), np.nan)
+    np.divide(totals[..., 0::2], totals[..., 1::2], out=roas, where=totals[..., 1::2] > 0)
+    return roas
+
+
+def replicate_deviations(revenue, spend, codes, n_segments, rng, replicates=REPLICATES):
+    """Replicate ROAS minus its subset's ROAS, per (subset, replicate, segment), from batched resampling"""
+    n = len(revenue)
+    if n <= SUBSET_ROWS:
+        subsets = np.arange(n)[None, :]
+    else:
+        size = min(n, max(SUBSET_ROWS, int(n ** SUBSET_EXPONENT)))
+        subsets = np.stack([rng.choice(n, size, replace=False) for _ in range(SUBSETS)])
+    # Only the rows of the subsets get a segment matrix
+    rows = subsets.ravel()
+    values = segment_matrix(revenue[rows], spend[rows], [dim_codes[rows] for dim_codes in codes], n_segments)
+    values = values.reshape(subsets.shape + (2 * n_segments,))
+
+    per_subset = -(-replicates // len(subsets))
+    weights = np.stack([resample_weights(rng, n, subsets.shape[1], per_subset) for _ in range(len(subsets))])
+    # (subsets x replicates x rows) @ (subsets x rows x columns): every replicate's totals at once
+    roas = ratio(np.matmul(weights, values))
+    return roas - ratio(values.sum(axis=1))[:, None, :]
+
+
+def roas_intervals(filtered_df, baseline_roas, dimensions=INTERVAL_DIMENSIONS, replicates=REPLICATES,
+                   confidence=CONFIDENCE, seed=0):
+    """Point estimate and percentile bootstrap interval of ROAS overall, incremental and per segment
+
+    One row per segment: ('overall', 'All'), ('incremental', 'All') (overall
+    minus the baseline) and (dimension, value) for every value of each
+    dimension, with ``roas``, ``low``, ``high``, the share of replicates
+    above the baseline and the influencer count. Seeded, so a filter state
+    always gets the same interval.
+    """
+    labels, codes = segments(filtered_df, dimensions)
+    revenue = filtered_df['total_revenue'].to_numpy(np.float64)
+    spend = filtered_df['total_payout'].to_numpy(np.float64)
+    n_segments = len(labels)
+    totals = np.zeros((2, n_segments))
+    sizes = np.zeros(n_segments, dtype=np.int64)
+    totals[:, 0] = revenue.sum(), spend.sum()
+    sizes[0] = len(revenue)
+    for dim_codes in codes:
+        rows = dim_codes >= 0
+        totals[0] += np.bincount(dim_codes[rows], weights=revenue[rows], minlength=n_segments)
+        totals[1] += np.bincount(dim_codes[rows], weights=spend[rows], minlength=n_segments)
+        sizes += np.bincount(dim_codes[rows], minlength=n_segments)
+    point = np.divide(totals[0], totals[1], out=np.zeros(n_segments), where=totals[1] > 0)
+
+    if len(revenue):
+        roas = point + replicate_deviations(revenue, spend, codes, n_segments, np.random.default_rng(seed),
+                                            replicates)
+        alpha = (1 - confidence) / 2
+        # Segments without spend in every replicate of a subset have all-NaN slices
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            low, high = np.nanmean(np.nanquantile(roas, [alpha, 1 - alpha], axis=1), axis=1)
+            above = np.nanmean(np.nanmean(np.where(np.isnan(roas), np.nan, roas > baseline_roas), axis=1), axis=0)
+    else:
+        low = high = above = np.full(n_segments, np.nan)
+
+    intervals = pd.DataFrame({
+        'dimension': [dim for dim, _ in labels],
+        'value': [value for _, value in labels],
+        'roas': point,
+        'low': low,
+        'high': high,
+        'share_above_baseline': above,
+        'influencers': sizes,
+    })
+    incremental = intervals.iloc[[0]].assign(
+        dimension='incremental', roas=lambda d: d['roas'] - baseline_roas,
+        low=lambda d: d['low'] - baseline_roas, high=lambda d: d['high'] - baseline_roas)
+    return pd.concat([intervals.iloc[[0]], incremental, intervals.iloc[1:]], ignore_index=True)
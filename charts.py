@@ -0,0 +1,231 @@
+"""Plotly figures of the dashboard, built from already aggregated data.
+
+Each function takes the frame a chart displays and returns the figure, with
+no Streamlit calls, so figure construction can be cached by the app and timed
+by the benchmarks on its own.
+"""
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+from render import POINT_BUDGET, downsample_scatter, histogram_figure, render_mode
+
+TRANSPARENT = 'rgba(0,0,0,0)'
+
+
+def top_performers_figure(top_performers):
+    """Horizontal ROAS bars of the top influencers"""
+    fig_roas = px.bar(
+        top_performers,
+        x='roas',
+        y='name',
+        orientation='h',
+        title='Top 20 Influencers by Return on Ad Spend',
+        labels={'name': 'Influencer', 'roas': 'ROAS (x)'},
+        color='roas',
+        color_continuous_scale='RdYlGn',
+        text='roas'
+    )
+    fig_roas.update_traces(texttemplate='%{text:.2f}x', textposition='outside')
+    fig_roas.update_layout(
+        height=600,
+        title_x=0.5,
+        font=dict(size=12),
+        plot_bgcolor=TRANSPARENT,
+        paper_bgcolor=TRANSPARENT
+    )
+    return fig_roas
+
+
+def platform_figure(platform_stats):
+    """Donut of revenue share per platform"""
+    fig_platform = px.pie(
+        platform_stats,
+        names='platform',
+        values='revenue',
+        title='Revenue Share by Platform',
+        hole=0.4,
+        color_discrete_sequence=px.colors.qualitative.Set3
+    )
+    fig_platform.update_traces(
+        textposition='inside',
+        textinfo='percent+label',
+        hovertemplate='<b>%{label}</b><br>Revenue: ₹%{value:,.0f}<br>Share: %{percent}<extra></extra>'
+    )
+    fig_platform.update_layout(
+        title_x=0.5,
+        font=dict(size=11),
+        plot_bgcolor=TRANSPARENT,
+        paper_bgcolor=TRANSPARENT
+    )
+    return fig_platform
+
+
+# Revenue trend curves: column of the resampled series and its axis label
+TREND_CURVES = {
+    'Revenue': ('revenue', 'Revenue (₹)'),
+    'Rolling average': ('rolling_revenue', 'Rolling Avg Revenue (₹)'),
+    'Cumulative': ('cumulative_revenue', 'Cumulative Revenue (₹)'),
+}
+
+
+def revenue_trend_figure(series, curve='Revenue', period='Daily'):
+    """Line of one revenue curve of a resampled series (see TREND_CURVES)"""
+    column, label = TREND_CURVES[curve]
+    fig_trend = px.line(
+        series,
+        x='date',
+        y=column,
+        title=f'{period} Revenue Trend' if curve == 'Revenue' else f'{period} Revenue Trend ({curve})',
+        labels={'date': 'Date', column: label},
+        markers=period != 'Daily'
+    )
+    fig_trend.update_traces(line_color='#667eea', line_width=3)
+    fig_trend.update_layout(
+        title_x=0.5,
+        plot_bgcolor=TRANSPARENT,
+        paper_bgcolor=TRANSPARENT,
+        hovermode='x unified'
+    )
+    return fig_trend
+
+
+def category_figure(category_performance):
+    """Spend against revenue per category, sized by influencer count"""
+    fig_category = px.scatter(
+        category_performance,
+        x='spend',
+        y='revenue',
+        size='count',
+        color='avg_roas',
+        hover_name='category',
+        title='Category Performance Matrix',
+        labels={'spend': 'Total Spend (₹)', 'revenue': 'Total Revenue (₹)', 'count': 'Influencer Count'},
+        color_continuous_scale='Viridis'
+    )
+    fig_category.update_layout(
+        title_x=0.5,
+        plot_bgcolor=TRANSPARENT,
+        paper_bgcolor=TRANSPARENT
+    )
+    return fig_category
+
+
+def allocation_figure(breakdown):
+    """Planned spend per platform, stacked by category"""
+    fig_allocation = px.bar(
+        breakdown,
+        x='platform',
+        y='spend',
+        color='category',
+        hover_data={'expected_revenue': ':,.0f', 'influencers': True, 'expected_roas': ':.2f'},
+        title='Planned Spend by Platform and Category',
+        labels={'spend': 'Planned Spend (₹)', 'platform': 'Platform', 'category': 'Category'}
+    )
+    fig_allocation.update_layout(
+        title_x=0.5,
+        plot_bgcolor=TRANSPARENT,
+        paper_bgcolor=TRANSPARENT
+    )
+    return fig_allocation
+
+
+def roas_histogram_figure(filtered_df, baseline_roas):
+    """Distribution of positive ROAS with the baseline marked"""
+    # Binned with NumPy; only the 30 bar heights are sent to the browser
+    roas_values = filtered_df['roas'].to_numpy()
+    fig_hist = histogram_figure(
+        roas_values[roas_values > 0],
+        nbins=30,
+        title='ROAS Distribution Across Influencers',
+        x_label='ROAS (x)',
+        y_label='Number of Influencers'
+    )
+    fig_hist.add_vline(x=baseline_roas, line_dash="dash", line_color="red",
+                       annotation_text=f"Baseline ROAS ({baseline_roas}x)")
+    fig_hist.update_layout(
+        title_x=0.5,
+        plot_bgcolor=TRANSPARENT,
+        paper_bgcolor=TRANSPARENT
+    )
+    return fig_hist
+
+
+def engagement_scatter_figure(filtered_df, point_budget=POINT_BUDGET):
+    """Engagement against conversion rate per influencer, reduced to the point budget"""
+    # Filter out zero values for better visualization
+    scatter_data = filtered_df[(filtered_df['engagement_rate'] > 0) & (filtered_df['conversion_rate'] > 0)]
+    # Above the point budget, the top ROAS outliers stay individual and the rest are density-binned
+    scatter_data = downsample_scatter(
+        scatter_data[['name', 'engagement_rate', 'conversion_rate', 'follower_count', 'roas']],
+        'engagement_rate', 'conversion_rate', outlier_by='roas', label='name', budget=point_budget
+    )
+
+    fig_scatter = px.scatter(
+        scatter_data,
+        x='engagement_rate',
+        y='conversion_rate',
+        size='follower_count',
+        color='roas',
+        hover_name='name',
+        title='Engagement vs Conversion Rate',
+        labels={'engagement_rate': 'Engagement Rate (%)', 'conversion_rate': 'Conversion Rate (%)'},
+        color_continuous_scale='Plasma',
+        render_mode=render_mode(len(scatter_data))
+    )
+    fig_scatter.update_layout(
+        title_x=0.5,
+        plot_bgcolor=TRANSPARENT,
+        paper_bgcolor=TRANSPARENT
+    )
+    return fig_scatter
+
+
+def brand_figure(brand_performance):
+    """Revenue bars per brand"""
+    fig_brand = px.bar(
+        brand_performance,
+        x='brand',
+        y='revenue',
+        title='Revenue by Brand',
+        labels={'brand': 'Brand', 'revenue': 'Revenue (₹)'},
+        color='revenue',
+        color_continuous_scale='Blues'
+    )
+    fig_brand.update_layout(
+        title_x=0.5,
+        plot_bgcolor=TRANSPARENT,
+        paper_bgcolor=TRANSPARENT,
+        xaxis_tickangle=-45
+    )
+    return fig_brand
+
+
+def flame_figure(spans):
+    """Flame-style timeline of one trace: a bar per span at its start offset, one row per nesting depth"""
+    spans = pd.DataFrame(spans, columns=['name', 'depth', 'start', 'seconds', 'net_kb', 'peak_kb'])
+    fig_flame = go.Figure(go.Bar(
+        base=spans['start'] * 1000,
+        x=spans['seconds'] * 1000,
+        y=spans['depth'],
+        orientation='h',
+        text=spans['name'],
+        textposition='inside',
+        insidetextanchor='start',
+        customdata=spans[['name', 'peak_kb', 'net_kb']],
+        hovertemplate='<b>%{customdata[0]}</b><br>%{x:.1f} ms' + (
+            '<br>process peak %{customdata[1]:,.0f} KB, net %{customdata[2]:,.0f} KB'
+            if spans['peak_kb'].notna().any() else '') + '<extra></extra>',
+        marker=dict(color=spans['seconds'], colorscale='YlOrRd')
+    ))
+    fig_flame.update_yaxes(autorange='reversed', dtick=1, title='Depth')
+    fig_flame.update_layout(
+        title='Rerun Timeline',
+        title_x=0.5,
+        xaxis_title='Milliseconds since rerun start',
+        height=120 + 40 * (int(spans['depth'].max()) + 1 if len(spans) else 1),
+        bargap=0.1,
+        plot_bgcolor=TRANSPARENT,
+        paper_bgcolor=TRANSPARENT
+    )
+    return fig_flame
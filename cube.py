@@ -0,0 +1,134 @@
+"""Pre-aggregated daily cubes over tracking and post events.
+
+The tracking cube holds revenue/orders summed per (influencer_id, date, brand,
+campaign) and the post cube holds reach/likes/comments/post counts per
+(influencer_id, date). Both are built once at load and stored sorted by date;
+every filtered total the dashboard needs is answered by a ``searchsorted``
+date slice, a bitmap AND for brand/campaign and a sum over the cube, so the cost depends on the number of
+distinct keys rather than on raw event rows. New event batches are folded in
+with ``DataCube.append``.
+"""
+import numpy as np
+import pandas as pd
+
+from dateindex import DateSortedFrame, date_mask
+from profiling import span
+
+TRACKING_KEYS = ['influencer_id', 'date', 'brand', 'campaign']
+POST_KEYS = ['influencer_id', 'date']
+
+
+def filter_tracking(df, brand='All', campaign='All', date_range=None):
+    """Rows of an unsorted tracking table or batch matching the tracking filters"""
+    df = df[date_mask(df, date_range)]
+    if brand != 'All':
+        df = df[df['brand'] == brand]
+    if campaign != 'All':
+        df = df[df['campaign'] == campaign]
+    return df
+
+
+def widen(df, columns):
+    """Frame whose narrow integer columns are cast to int64, so sums over them cannot overflow"""
+    narrow = {col: np.int64 for col in columns
+              if pd.api.types.is_integer_dtype(df[col]) and df[col].dtype.itemsize < 8}
+    return df.astype(narrow) if narrow else df
+
+
+def build_tracking_cube(tracking_df):
+    """Revenue and orders summed per (influencer_id, date, brand, campaign)"""
+    tracking_df = widen(tracking_df, ['revenue', 'orders'])
+    return tracking_df.groupby(TRACKING_KEYS, observed=True).agg(
+        revenue=('revenue', 'sum'),
+        orders=('orders', 'sum')
+    ).reset_index()
+
+
+def build_post_cube(posts_df):
+    """Reach, likes, comments and post count summed per (influencer_id, date)"""
+    posts_df = widen(posts_df, ['reach', 'likes', 'comments'])
+    return posts_df.groupby(POST_KEYS, observed=True).agg(
+        reach=('reach', 'sum'),
+        likes=('likes', 'sum'),
+        comments=('comments', 'sum'),
+        post_count=('post_id', 'count')
+    ).reset_index()
+
+
+def sum_post_totals(post_rows):
+    """Total reach, likes, comments and post count per influencer"""
+    return post_rows.groupby('influencer_id').agg(
+        total_reach=('reach', 'sum'),
+        total_likes=('likes', 'sum'),
+        total_comments=('comments', 'sum'),
+        post_count=('post_count', 'sum')
+    )
+
+
+class DataCube:
+    """Date-sorted tracking and post cubes with the slice-and-sum queries used by the dashboard"""
+
+    def __init__(self, tracking_cube, post_cube):
+        # Appended batches are kept as separate date-sorted runs; every query
+        # sums, so keys repeated across runs need no compaction.
+        self._tracking = DateSortedFrame(tracking_cube, categorical=['brand', 'campaign'])
+        self._posts = DateSortedFrame(post_cube)
+
+    @classmethod
+    def from_tables(cls, tracking_df, posts_df):
+        return cls(build_tracking_cube(tracking_df), build_post_cube(posts_df))
+
+    @property
+    def tracking_cube(self):
+        return self._tracking.frame
+
+    @property
+    def post_cube(self):
+        return self._posts.frame
+
+    def append(self, tracking_df=None, posts_df=None):
+        """Fold a batch of new raw events into the cubes in O(batch)"""
+        if tracking_df is not None and len(tracking_df):
+            self._tracking.append(build_tracking_cube(tracking_df))
+        if posts_df is not None and len(posts_df):
+            self._posts.append(build_post_cube(posts_df))
+
+    def date_bounds(self):
+        """First and last tracked date"""
+        return self._tracking.bounds()
+
+    def dimension_values(self, col):
+        """Sorted distinct brands or campaigns in the cube"""
+        return self._tracking.values(col)
+
+    def tracking_slice(self, brand='All', campaign='All', date_range=None):
+        """Cube rows matching the tracking filters"""
+        return self._tracking.between(date_range, brand=brand, campaign=campaign)
+
+    def tracking_totals(self, brand='All', campaign='All', date_range=None):
+        """Total revenue and orders per influencer under the tracking filters"""
+        with span('filter:tracking'):
+            rows = self.tracking_slice(brand, campaign, date_range)
+        with span('groupby:tracking'):
+            return rows.groupby('influencer_id').agg(
+                total_revenue=('revenue', 'sum'),
+                total_orders=('orders', 'sum')
+            )
+
+    def post_totals(self, date_range=None):
+        """Total reach, likes, comments and post count per influencer within the date range"""
+        with span('filter:posts'):
+            rows = self._posts.between(date_range)
+        with span('groupby:posts'):
+            return sum_post_totals(rows)
+
+    def daily_revenue(self, brand='All', campaign='All', date_range=None):
+        """Revenue per day under the tracking filters"""
+        return self.tracking_slice(brand, campaign, date_range).groupby('date')['revenue'].sum().reset_index()
+
+    def brand_totals(self, date_range=None):
+        """Revenue and orders per brand within the date range"""
+        return self.tracking_slice(date_range=date_range).groupby('brand', observed=True).agg({
+            'revenue': 'sum',
+            'orders': 'sum'
+        }).reset_index()
@@ -0,0 +1,125 @@
+"""Date-sorted storage with an int64 day index for range filtering.
+
+A frame kept sorted by ``date`` carries the day number (days since the Unix
+epoch) of every row. Any inclusive date range then resolves to a contiguous
+positional slice via two ``searchsorted`` calls, with no boolean mask over the
+whole column.
+"""
+import numpy as np
+import pandas as pd
+
+from filterindex import FilterIndex
+
+
+def date_range_key(date_range):
+    """Hashable date filter; partial selections (one date picked) mean no filter"""
+    if date_range is not None and len(date_range) == 2:
+        return tuple(pd.Timestamp(d) for d in date_range)
+    return None
+
+
+def day_numbers(dates):
+    """Days since the epoch for an array-like of datetimes"""
+    return np.asarray(dates, dtype='datetime64[ns]').astype('datetime64[D]').astype(np.int64)
+
+
+def sort_by_date(df):
+    """Frame stably sorted by date with a fresh RangeIndex"""
+    if df['date'].is_monotonic_increasing:
+        return df.reset_index(drop=True)
+    return df.sort_values('date', kind='stable', ignore_index=True)
+
+
+def date_mask(df, date_range):
+    """Boolean mask of rows inside an inclusive date range, for small unsorted frames such as batches"""
+    date_key = date_range_key(date_range)
+    if date_key is None:
+        return np.ones(len(df), dtype=bool)
+    start_day, end_day = day_numbers([date_key[0], date_key[1]])
+    days = day_numbers(df['date'])
+    return (days >= start_day) & (days <= end_day)
+
+
+class DateIndex:
+    """Sorted day numbers of a date-sorted frame"""
+
+    def __init__(self, days):
+        self.days = days
+
+    @classmethod
+    def from_frame(cls, df):
+        return cls(day_numbers(df['date']))
+
+    def slice(self, date_range):
+        """Positional slice of the rows inside an inclusive date range (all rows when unset)"""
+        date_key = date_range_key(date_range)
+        if date_key is None:
+            return slice(0, len(self.days))
+        start_day, end_day = day_numbers([date_key[0], date_key[1]])
+        return slice(int(np.searchsorted(self.days, start_day, side='left')),
+                     int(np.searchsorted(self.days, end_day, side='right')))
+
+    def bounds(self):
+        """First and last date as Timestamps"""
+        return (pd.Timestamp(self.days[0], unit='D'), pd.Timestamp(self.days[-1], unit='D'))
+
+
+class DateSortedFrame:
+    """Frame stored as a few date-sorted runs, each with its own day index
+
+    An appended batch becomes a new run, and a run is merged into the one
+    before it once it has grown as large (as in a binary counter). Each row is
+    merged O(log n) times, so an append costs amortized O(batch log n) rather
+    than a re-sort of the whole frame; range queries search every run. Reading
+    ``frame`` merges all runs into one. When ``categorical`` columns are given,
+    every run keeps a ``FilterIndex`` over them.
+    """
+
+    def __init__(self, df, categorical=()):
+        self.categorical = categorical
+        self._runs = [self._run(sort_by_date(df))]
+
+    def _run(self, df, days=None):
+        """(frame, DateIndex, FilterIndex or None) of a date-sorted frame"""
+        index = DateIndex(day_numbers(df['date']) if days is None else days)
+        return df, index, FilterIndex(df, self.categorical) if self.categorical else None
+
+    def _merge(self, runs):
+        """One run from consecutive runs, earlier runs first within a day"""
+        days = np.concatenate([index.days for _, index, _ in runs])
+        # Timsort merges presorted runs in linear time per run
+        order = np.argsort(days, kind='stable')
+        df = pd.concat([df for df, _, _ in runs], ignore_index=True).take(order).reset_index(drop=True)
+        return self._run(df, days[order])
+
+    def append(self, df):
+        self._runs.append(self._run(sort_by_date(df)))
+        while len(self._runs) > 1 and len(self._runs[-2][0]) <= len(self._runs[-1][0]):
+            self._runs[-2:] = [self._merge(self._runs[-2:])]
+
+    @property
+    def frame(self):
+        if len(self._runs) > 1:
+            self._runs = [self._merge(self._runs)]
+        return self._runs[0][0]
+
+    def between(self, date_range, **filters):
+        """Rows inside an inclusive date range, narrowed by categorical filters on the bitmap index"""
+        parts = []
+        for df, index, bitmaps in self._runs:
+            rows = index.slice(date_range)
+            mask = bitmaps.select(rows, **filters) if filters else None
+            parts.append(df.iloc[rows] if mask is None else df.iloc[rows][mask])
+        return parts[0] if len(parts) == 1 else pd.concat(parts, ignore_index=True)
+
+    def bounds(self):
+        """First and last date as Timestamps"""
+        firsts, lasts = zip(*(index.bounds() for _, index, _ in self._runs))
+        return min(firsts), max(lasts)
+
+    def values(self, col):
+        """Sorted distinct values of a categorical column"""
+        return sorted(set().union(*(bitmaps.values(col) for _, _, bitmaps in self._runs)))
+
+    def __len__(self):
+        return sum(len(df) for df, _, _ in self._runs)
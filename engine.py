@@ -0,0 +1,251 @@
+"""Headless ROAS engine: data loading, filtering, KPIs and summaries without Streamlit.
+
+Everything the dashboard computes for one filter state is available here as
+plain pandas, and ``python -m engine`` writes it as a batch report. This module
+and its imports never load Streamlit or Plotly.
+
+    python -m engine report out/ --brand MuscleBlaze --start 2023-09-01 --end 2023-11-30 --format parquet
+    python -m engine allocate plan/ --budget 50000000 --platform-cap 0.4 --max-influencers 500 --max-scale 2
+"""
+import argparse
+import json
+import os
+
+import pandas as pd
+
+from allocation import BASES, plan_breakdown
+from cube import DataCube
+from ingest import DASHBOARD_COLUMNS, TABLE_NAMES, load_tables
+from metrics import safe_divide
+from pipeline import FilterPipeline
+from resultcache import DEFAULT_MAX_BYTES, DiskCache
+from schema import compact_tables
+from sqlbackend import BACKENDS, create_backend
+from store import CUBE_NAMES, dataset_source, ensure_store, open_store, store_frames
+from synthetic import generate_dataset
+
+BASELINE_ROAS = 2.5
+# Follower slider bounds; the defaults select every influencer
+MIN_FOLLOWERS = 0
+MAX_FOLLOWERS = 10000000
+SUMMARY_DIMENSIONS = ['platform', 'category']
+REPORT_FORMATS = ['json', 'parquet']
+
+
+def load_dataset(data_dir=None, n_influencers=2000):
+    """The four tables in the compact layout, from data_dir or generated synthetically"""
+    if data_dir:
+        # Columnar files carry parsed dates and categoricals, and only the used columns are read
+        tables = load_tables(data_dir, DASHBOARD_COLUMNS)
+    else:
+        # The synthetic engine emits parsed datetime64 dates, so no conversion pass is needed
+        tables = generate_dataset(n_influencers, seed=42)
+    # Categoricals and int32/float32 columns keep the multi-session host within memory
+    return compact_tables(tables)
+
+
+def dataset_fingerprint(cache, data_dir=None, n_influencers=2000):
+    """Disk cache key prefix of the dataset: content digests of the data files, or the synthetic parameters"""
+    return cache.fingerprint(*dataset_source(data_dir, n_influencers))
+
+
+def cached_frames(cache, fingerprint, load):
+    """Date-sorted tables and cubes by name from the disk cache, loading and storing them on a miss"""
+    names = TABLE_NAMES + CUBE_NAMES
+    frames = {name: cache.get((fingerprint, 'table', name)) for name in names}
+    if any(df is None for df in frames.values()):
+        frames = store_frames(load())
+        for name in names:
+            cache.put((fingerprint, 'table', name), frames[name])
+    return frames
+
+
+def build_pipeline(data_dir=None, n_influencers=2000, store_dir=None, load=load_dataset, cache_dir=None,
+                   cache_bytes=DEFAULT_MAX_BYTES, backend='pandas', workers=None):
+    """FilterPipeline over the loaded tables, or over a shared memory-mapped store when store_dir is set
+
+    ``load(data_dir, n_influencers)`` supplies the tables when there is no
+    store yet (the dashboard passes its cached loader). With ``cache_dir``,
+    the tables, aggregates and filter results persist there across restarts,
+    keyed by the content of the source data. ``backend`` selects the engine
+    that computes filter results ('pandas', 'duckdb' when installed, or
+    'parallel' for id-sharded worker processes), ``workers`` its thread or
+    process count.
+    """
+    cache = DiskCache(cache_dir, cache_bytes) if cache_dir else None
+    fingerprint = None
+    if store_dir:
+        # Memory-mapped tables and cubes shared by every server process; (re)built when missing or stale
+        ensure_store(store_dir, lambda: load(data_dir, n_influencers), data_dir, n_influencers)
+        store = open_store(store_dir)
+        tables, cube = store.tables, store.cube()
+        if cache is not None:
+            # The manifest fingerprint digests the source files, so changed sources miss the cached results
+            fingerprint = cache.fingerprint(('store', store.manifest['fingerprint']))
+    elif cache is not None:
+        fingerprint = dataset_fingerprint(cache, data_dir, n_influencers)
+        frames = cached_frames(cache, fingerprint, lambda: load(data_dir, n_influencers))
+        tables = tuple(frames[name] for name in TABLE_NAMES)
+        cube = DataCube(frames['tracking_cube'], frames['post_cube'])
+    else:
+        tables, cube = load(data_dir, n_influencers), None
+    return FilterPipeline(*tables, cube=cube, disk=cache, disk_key=fingerprint,
+                          backend=create_backend(backend, tables, workers))
+
+
+def compute_kpis(filtered_df, baseline_roas=BASELINE_ROAS):
+    """Headline KPIs of a filtered per-influencer frame"""
+    total_spend = float(filtered_df['total_payout'].sum())
+    total_revenue = float(filtered_df['total_revenue'].sum())
+    overall_roas = total_revenue / total_spend if total_spend > 0 else 0.0
+    return {
+        'total_spend': total_spend,
+        'total_revenue': total_revenue,
+        'total_orders': int(filtered_df['total_orders'].sum()),
+        'total_reach': int(filtered_df['total_reach'].sum()),
+        'overall_roas': overall_roas,
+        'incremental_roas': overall_roas - baseline_roas,
+        'avg_cpm': float(filtered_df['cpm'].mean()) if len(filtered_df) > 0 else 0.0,
+        'influencers': len(filtered_df),
+    }
+
+
+def dimension_summary(filtered_df, dimension):
+    """Revenue, spend, orders, reach, influencer count and ROAS per value of a roster dimension"""
+    summary = filtered_df.groupby(dimension, observed=True).agg(
+        revenue=('total_revenue', 'sum'),
+        spend=('total_payout', 'sum'),
+        orders=('total_orders', 'sum'),
+        reach=('total_reach', 'sum'),
+        count=('id', 'count'),
+        avg_roas=('roas', 'mean'),
+    ).reset_index()
+    summary['roas'] = safe_divide(summary['revenue'].to_numpy(), summary['spend'].to_numpy())
+    return summary
+
+
+def build_report(pipeline, brand='All', platform='All', campaign='All', category='All', date_range=None,
+                 min_followers=MIN_FOLLOWERS, max_followers=MAX_FOLLOWERS, top_n=20):
+    """KPIs, ROAS intervals, top performers and brand/platform/category summaries for one filter state, as frames"""
+    filters = (brand, platform, campaign, category, date_range, min_followers, max_followers)
+    filtered_df = pipeline.process(*filters)
+    report = {
+        'kpis': pd.DataFrame([compute_kpis(filtered_df)]),
+        'top_performers': pipeline.ranking(*filters).top('roas', top_n).reset_index(drop=True),
+        'brand_summary': pipeline.brand_totals(date_range),
+        'roas_intervals': pipeline.roas_intervals(*filters, BASELINE_ROAS),
+    }
+    for dimension in SUMMARY_DIMENSIONS:
+        report[f'{dimension}_summary'] = dimension_summary(filtered_df, dimension)
+    return report
+
+
+def scenario_table(pipeline, combinations=None, date_range=None, min_followers=MIN_FOLLOWERS,
+                   max_followers=MAX_FOLLOWERS, baseline_roas=BASELINE_ROAS):
+    """Spend, revenue, orders, overall and incremental ROAS per brand/campaign/platform/category combination
+
+    Evaluates every combination (each dimension's values plus 'All') unless a
+    list of (brand, campaign, platform, category) tuples is given.
+    """
+    return pipeline.scenarios(date_range, min_followers, max_followers, baseline_roas, combinations)
+
+
+def allocation_report(pipeline, budget=None, brand='All', platform='All', campaign='All', category='All',
+                      date_range=None, min_followers=MIN_FOLLOWERS, max_followers=MAX_FOLLOWERS, **constraints):
+    """Budget plan, its summary and its per-platform/category split for one filter state, as frames
+
+    The budget defaults to the filtered roster's historical spend; constraints
+    are passed to ``FilterPipeline.allocate``.
+    """
+    filters = (brand, platform, campaign, category, date_range, min_followers, max_followers)
+    if budget is None:
+        budget = float(pipeline.process(*filters)['total_payout'].sum())
+    plan, summary = pipeline.allocate(budget, *filters, **constraints)
+    report = {
+        'allocation_summary': pd.DataFrame([{**summary, 'binding': ','.join(summary['binding'])}]),
+        'allocation_plan': plan,
+    }
+    for dimension in SUMMARY_DIMENSIONS:
+        report[f'allocation_{dimension}'] = plan_breakdown(plan, dimension)
+    return report
+
+
+def write_report(report, out_dir, fmt='json'):
+    """Write every frame of a report to out_dir as <name>.json or <name>.parquet; returns the paths"""
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for name, df in report.items():
+        path = os.path.join(out_dir, f'{name}.{fmt}')
+        if fmt == 'parquet':
+            df.to_parquet(path, index=False)
+        else:
+            df.to_json(path, orient='records', date_format='iso', indent=2)
+        paths.append(path)
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Write the dashboard KPIs and summaries for one filter set, '
+                                                 'the KPIs of every filter combination (scenarios), '
+                                                 'or a budget plan over the filtered roster (allocate)')
+    parser.add_argument('command', choices=['report', 'scenarios', 'allocate'])
+    parser.add_argument('out_dir')
+    parser.add_argument('--data-dir', help='load tables from this ingest directory instead of generating them')
+    parser.add_argument('--store-dir', help='read tables from this shared memory-mapped store')
+    parser.add_argument('--cache-dir', help='persist tables, aggregates and results in this disk cache')
+    parser.add_argument('--backend', choices=BACKENDS, default='pandas', help='engine computing filter results')
+    parser.add_argument('--workers', type=int, help='threads (duckdb) or processes (parallel) of the backend')
+    parser.add_argument('--influencers', type=int, default=2000)
+    parser.add_argument('--brand', default='All')
+    parser.add_argument('--platform', default='All')
+    parser.add_argument('--campaign', default='All')
+    parser.add_argument('--category', default='All')
+    parser.add_argument('--start', help='first date (YYYY-MM-DD); needs --end')
+    parser.add_argument('--end', help='last date (YYYY-MM-DD); needs --start')
+    parser.add_argument('--min-followers', type=int, default=MIN_FOLLOWERS)
+    parser.add_argument('--max-followers', type=int, default=MAX_FOLLOWERS)
+    parser.add_argument('--top', type=int, default=20, help='number of top performers by ROAS')
+    parser.add_argument('--format', choices=REPORT_FORMATS, default='json')
+    parser.add_argument('--budget', type=float, help='budget to allocate (default: historical spend of the selection)')
+    parser.add_argument('--basis', choices=BASES, default='All', help='only influencers paid on this payout basis')
+    parser.add_argument('--platform-cap', type=float, help='largest share of the budget for any one platform')
+    parser.add_argument('--category-cap', type=float, help='largest share of the budget for any one category')
+    parser.add_argument('--min-influencers', type=int, default=0)
+    parser.add_argument('--max-influencers', type=int)
+    parser.add_argument('--max-scale', type=float, default=1.0, help='most spend per influencer, in historical payouts')
+    parser.add_argument('--min-roas', type=float, default=0.0, help='only influencers with at least this ROAS')
+    args = parser.parse_args(argv)
+
+    if bool(args.start) != bool(args.end):
+        parser.error('--start and --end must be given together')
+    date_range = (pd.Timestamp(args.start), pd.Timestamp(args.end)) if args.start else None
+
+    pipeline = build_pipeline(args.data_dir, args.influencers, args.store_dir, cache_dir=args.cache_dir,
+                              backend=args.backend, workers=args.workers)
+    if args.command == 'scenarios':
+        # Brand/platform/campaign/category flags are ignored; every combination is evaluated
+        table = scenario_table(pipeline, date_range=date_range, min_followers=args.min_followers,
+                               max_followers=args.max_followers)
+        paths = write_report({'scenarios': table}, args.out_dir, args.format)
+        print(f"{len(table):,} combinations; wrote {paths[0]}")
+        return
+    if args.command == 'allocate':
+        report = allocation_report(pipeline, args.budget, args.brand, args.platform, args.campaign, args.category,
+                                   date_range, args.min_followers, args.max_followers, basis=args.basis,
+                                   min_roas=args.min_roas, platform_caps=args.platform_cap,
+                                   category_caps=args.category_cap, min_influencers=args.min_influencers,
+                                   max_influencers=args.max_influencers, max_scale=args.max_scale)
+        paths = write_report(report, args.out_dir, args.format)
+        print(json.dumps(report['allocation_summary'].to_dict('records')[0], indent=2))
+        print(f"wrote {len(paths)} files to {args.out_dir}")
+        return
+
+    report = build_report(pipeline, args.brand, args.platform, args.campaign, args.category, date_range,
+                          args.min_followers, args.max_followers, args.top)
+    paths = write_report(report, args.out_dir, args.format)
+    print(json.dumps(report['kpis'].to_dict('records')[0], indent=2))
+    print(f"wrote {len(paths)} files to {args.out_dir}")
+
+
+if __name__ == '__main__':
+    main()
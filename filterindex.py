@@ -0,0 +1,82 @@
+"""Bitmap index over the categorical filter dimensions.
+
+For each categorical column a packed bitmap (``np.packbits``, one bit per row)
+is precomputed per distinct value; numeric range filters use a sorted index
+(argsort order + sorted values) resolved with ``searchsorted``. Any combination
+of sidebar filters then resolves with a few bitwise ANDs over packed bytes
+instead of full-column string comparisons.
+"""
+import numpy as np
+import pandas as pd
+
+
+class FilterIndex:
+    """Packed bitmaps per categorical value and sorted indexes for numeric ranges"""
+
+    def __init__(self, df, categorical=(), ranges=()):
+        self.n = len(df)
+        self.bitmaps = {}
+        for col in categorical:
+            codes, uniques = pd.factorize(df[col])
+            self.bitmaps[col] = {value: np.packbits(codes == code) for code, value in enumerate(uniques)}
+        self.sorted = {}
+        for col in ranges:
+            values = df[col].to_numpy()
+            order = np.argsort(values, kind='stable')
+            self.sorted[col] = (order, values[order])
+
+    def values(self, col):
+        """Sorted distinct values of a categorical column"""
+        return sorted(self.bitmaps[col])
+
+    def bitmap(self, col, value):
+        """Packed bitmap of the rows where col == value"""
+        bits = self.bitmaps[col].get(value)
+        if bits is None:
+            return np.zeros((self.n + 7) // 8, dtype=np.uint8)
+        return bits
+
+    def range_bitmap(self, col, low, high):
+        """Packed bitmap of the rows where low <= col <= high, or None when every row matches"""
+        order, values = self.sorted[col]
+        start = np.searchsorted(values, low, side='left')
+        stop = np.searchsorted(values, high, side='right')
+        if start == 0 and stop == self.n:
+            return None
+        mask = np.zeros(self.n, dtype=bool)
+        mask[order[start:stop]] = True
+        return np.packbits(mask)
+
+    def covers(self, col, low, high):
+        """True when every row has low <= col <= high"""
+        _, values = self.sorted[col]
+        return self.n == 0 or (values[0] >= low and values[-1] <= high)
+
+    def select(self, rows=None, **filters):
+        """Boolean mask over rows (a positional slice, default all) matching every filter
+
+        Categorical filters take a value, with 'All' meaning no filter; range
+        filters take a (low, high) tuple. Returns None when nothing is filtered.
+        """
+        rows = rows or slice(0, self.n)
+        start, stop = rows.start or 0, self.n if rows.stop is None else rows.stop
+        # Work on the packed bytes covering the slice only
+        first_byte, last_byte = start // 8, (stop + 7) // 8
+
+        combined = None
+        for col, value in filters.items():
+            if col in self.sorted:
+                bits = self.range_bitmap(col, *value)
+            elif value == 'All':
+                bits = None
+            else:
+                bits = self.bitmap(col, value)
+            if bits is None:
+                continue
+            bits = bits[first_byte:last_byte]
+            combined = bits.copy() if combined is None else np.bitwise_and(combined, bits, out=combined)
+
+        if combined is None:
+            return None
+        offset = start - first_byte * 8
+        return np.unpackbits(combined, count=offset + stop - start)[offset:].view(bool)
@@ -0,0 +1,65 @@
+"""Display formats for the dashboard tables.
+
+Tables are rendered from their numeric columns with ``st.column_config``
+number formats, so no per-cell string formatting happens on the server, the
+values stay numeric and sortable in the browser, and rendering cost does not
+grow with the number of rows shown. Streamlit is imported only when a column
+config is built, so the specs can be shared with headless code.
+"""
+
+# Display label and printf-style/preset number format of every table column; None leaves the value as is
+COLUMN_FORMATS = {
+    'name': ('Influencer', None),
+    'platform': ('Platform', None),
+    'category': ('Category', None),
+    'follower_count': ('Followers', 'compact'),
+    'total_payout': ('Spend', '₹%,.0f'),
+    'total_revenue': ('Revenue', '₹%,.0f'),
+    'total_orders': ('Orders', None),
+    'roas': ('ROAS', '%.2fx'),
+    'engagement_rate': ('Engagement %', '%.2f%%'),
+    'cpm': ('CPM', '₹%.2f'),
+    'conversion_rate': ('Conversion %', '%.3f%%'),
+    'basis': ('Basis', None),
+    'spend': ('Planned Spend', '₹%,.0f'),
+    'weight': ('x Payout', '%.2fx'),
+    'expected_revenue': ('Expected Revenue', '₹%,.0f'),
+    'expected_reach': ('Expected Reach', 'compact'),
+    'expected_orders': ('Expected Orders', '%,.0f'),
+    'dimension': ('Breakdown', None),
+    'value': ('Segment', None),
+    'low': ('CI Low', '%.2fx'),
+    'high': ('CI High', '%.2fx'),
+    'share_above_baseline': ('Above Baseline', 'percent'),
+    'influencers': ('Influencers', None),
+}
+
+TOP_PERFORMER_COLUMNS = ['name', 'platform', 'category', 'follower_count', 'total_payout', 'total_revenue',
+                         'roas', 'engagement_rate']
+DETAILED_COLUMNS = ['name', 'platform', 'category', 'follower_count', 'total_payout', 'total_revenue',
+                    'total_orders', 'roas', 'engagement_rate', 'cpm', 'conversion_rate']
+INTERVAL_COLUMNS = ['dimension', 'value', 'roas', 'low', 'high', 'share_above_baseline', 'influencers']
+ALLOCATION_COLUMNS = ['name', 'platform', 'category', 'basis', 'roas', 'spend', 'weight', 'expected_revenue',
+                      'expected_reach', 'expected_orders']
+
+
+def display_frame(df, columns):
+    """Projection of df onto the displayed columns; values are left numeric"""
+    return df[columns]
+
+
+def column_labels(columns, labels=None):
+    """Header of every displayed column, with optional per-table overrides"""
+    labels = labels or {}
+    return {col: labels.get(col, COLUMN_FORMATS[col][0]) for col in columns}
+
+
+def column_config(columns, labels=None):
+    """``st.dataframe`` column_config rendering each column with its label and number format"""
+    import streamlit as st
+
+    config = {}
+    for col, label in column_labels(columns, labels).items():
+        fmt = COLUMN_FORMATS[col][1]
+        config[col] = st.column_config.NumberColumn(label, format=fmt) if fmt else label
+    return config
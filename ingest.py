@@ -0,0 +1,154 @@
+"""File ingestion for the dashboard tables.
+
+Tables live in a data directory as ``<table>.parquet``, ``<table>.feather`` or
+``<table>.csv``. CSV is meant for the initial import only: ``import_csv`` parses
+it once (dates, categoricals) and writes a columnar copy that every later load
+reads directly, with column projection and no per-load date conversion.
+
+    python -m ingest data/ --format parquet
+"""
+import argparse
+import os
+
+import pandas as pd
+
+# Column schema per table: all columns, low-cardinality string columns stored as
+# categoricals and date columns parsed at import time.
+TABLE_SCHEMAS = {
+    'influencers': {
+        'columns': ['id', 'name', 'category', 'gender', 'follower_count', 'platform'],
+        'categorical': ['category', 'gender', 'platform'],
+        'dates': [],
+    },
+    'posts': {
+        'columns': ['post_id', 'influencer_id', 'platform', 'date', 'url', 'caption', 'reach', 'likes', 'comments'],
+        'categorical': ['platform', 'caption'],
+        'dates': ['date'],
+    },
+    'tracking_data': {
+        'columns': ['tracking_id', 'source', 'campaign', 'influencer_id', 'product', 'brand', 'date', 'orders', 'revenue'],
+        'categorical': ['source', 'campaign', 'product', 'brand'],
+        'dates': ['date'],
+    },
+    'payouts': {
+        'columns': ['payout_id', 'influencer_id', 'basis', 'rate', 'orders', 'total_payout'],
+        'categorical': ['basis'],
+        'dates': [],
+    },
+}
+TABLE_NAMES = list(TABLE_SCHEMAS)
+
+# Columns the dashboard actually reads; everything else stays on disk
+DASHBOARD_COLUMNS = {
+    'influencers': ['id', 'name', 'category', 'follower_count', 'platform'],
+    'posts': ['post_id', 'influencer_id', 'date', 'reach', 'likes', 'comments'],
+    'tracking_data': ['influencer_id', 'campaign', 'brand', 'date', 'orders', 'revenue'],
+    'payouts': ['influencer_id', 'basis', 'rate', 'orders', 'total_payout'],
+}
+
+# Preferred on-disk formats, fastest first
+FORMATS = ['parquet', 'feather', 'csv']
+
+
+def table_path(data_dir, table, fmt=None):
+    """Path of a table file, or of the fastest format present when fmt is None"""
+    if fmt is not None:
+        return os.path.join(data_dir, f'{table}.{fmt}')
+    for candidate in FORMATS:
+        path = os.path.join(data_dir, f'{table}.{candidate}')
+        if os.path.exists(path):
+            return path
+    raise FileNotFoundError(f"No {'/'.join(FORMATS)} file for table '{table}' in {data_dir}")
+
+
+def apply_schema(df, table):
+    """Cast categorical columns and parse date columns that are still strings"""
+    schema = TABLE_SCHEMAS[table]
+    for col in schema['categorical']:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+    for col in schema['dates']:
+        if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = pd.to_datetime(df[col], format='%Y-%m-%d')
+    return df
+
+
+def _read_csv(path, table, columns):
+    """Parse a CSV table once, straight into categorical and datetime columns"""
+    schema = TABLE_SCHEMAS[table]
+    return pd.read_csv(
+        path,
+        usecols=columns,
+        dtype={col: 'category' for col in schema['categorical'] if col in columns},
+        parse_dates=[col for col in schema['dates'] if col in columns],
+        date_format='%Y-%m-%d',
+    )
+
+
+def _write(df, path, fmt):
+    """Write one table in the given format"""
+    if fmt == 'parquet':
+        df.to_parquet(path, index=False)
+    elif fmt == 'feather':
+        df.to_feather(path)
+    elif fmt == 'csv':
+        df.to_csv(path, index=False, date_format='%Y-%m-%d')
+    else:
+        raise ValueError(f"Unsupported format '{fmt}', expected one of {FORMATS}")
+
+
+def read_table(data_dir, table, columns=None):
+    """Read one table with column projection from its fastest on-disk format"""
+    columns = list(columns or TABLE_SCHEMAS[table]['columns'])
+    path = table_path(data_dir, table)
+
+    if path.endswith('.parquet'):
+        df = pd.read_parquet(path, columns=columns)
+    elif path.endswith('.feather'):
+        df = pd.read_feather(path, columns=columns)
+    else:
+        df = _read_csv(path, table, columns)
+    # Columnar files already carry categorical/datetime types, so this is a no-op for them
+    return apply_schema(df[columns], table)
+
+
+def load_tables(data_dir, columns=None):
+    """Load influencers, posts, tracking and payouts from a data directory"""
+    columns = columns or {}
+    return tuple(read_table(data_dir, table, columns.get(table)) for table in TABLE_NAMES)
+
+
+def write_tables(tables, data_dir, fmt='parquet'):
+    """Write the four tables to data_dir with the ingest schema applied
+
+    Derived columns that compact tables dropped (post ``url``) are rebuilt, so
+    the files always hold the full schema.
+    """
+    from schema import post_urls
+
+    os.makedirs(data_dir, exist_ok=True)
+    for table, df in zip(TABLE_NAMES, tables):
+        df = apply_schema(df.copy(), table).reset_index(drop=True)
+        if table == 'posts' and 'url' not in df.columns:
+            position = min(TABLE_SCHEMAS['posts']['columns'].index('url'), len(df.columns))
+            df.insert(position, 'url', post_urls(df, tables[0]))
+        _write(df, table_path(data_dir, table, fmt), fmt)
+
+
+def import_csv(data_dir, fmt='parquet'):
+    """One-off conversion of the CSV tables in data_dir to a columnar format"""
+    tables = [_read_csv(table_path(data_dir, table, 'csv'), table, TABLE_SCHEMAS[table]['columns'])
+              for table in TABLE_NAMES]
+    write_tables(tables, data_dir, fmt)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Convert CSV dashboard tables to a columnar format')
+    parser.add_argument('data_dir')
+    parser.add_argument('--format', choices=['parquet', 'feather'], default='parquet')
+    args = parser.parse_args(argv)
+    import_csv(args.data_dir, args.format)
+
+
+if __name__ == '__main__':
+    main()
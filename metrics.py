@@ -0,0 +1,43 @@
+"""Vectorized derived metrics (ROAS, engagement rate, CPM, conversion rate).
+
+All metrics are plain NumPy array arithmetic over the aggregate columns. A
+metric whose denominator is zero (no payout, no reach) is reported as 0,
+matching the dashboard's original row-wise definitions.
+"""
+import numpy as np
+
+METRIC_COLUMNS = ['roas', 'engagement_rate', 'cpm', 'conversion_rate']
+
+
+def safe_divide(numerator, denominator, scale=1.0):
+    """Elementwise numerator / denominator * scale, 0 where the denominator is not positive"""
+    numerator = np.asarray(numerator, dtype=np.float64)
+    denominator = np.asarray(denominator, dtype=np.float64)
+    out = np.zeros(np.broadcast_shapes(numerator.shape, denominator.shape))
+    np.divide(numerator, denominator, out=out, where=denominator > 0)
+    if scale != 1.0:
+        out *= scale
+    return out
+
+
+def compute_metrics(total_revenue, total_orders, total_reach, total_likes, total_comments, total_payout):
+    """All four derived metrics as arrays keyed by column name"""
+    total_reach = np.asarray(total_reach, dtype=np.float64)
+    engagement = np.asarray(total_likes, dtype=np.float64) + np.asarray(total_comments, dtype=np.float64)
+    return {
+        'roas': safe_divide(total_revenue, total_payout),
+        'engagement_rate': safe_divide(engagement, total_reach, 100),
+        'cpm': safe_divide(total_payout, total_reach, 1000),
+        'conversion_rate': safe_divide(total_orders, total_reach, 100),
+    }
+
+
+def add_metrics(df):
+    """Add the metric columns to a frame holding the aggregate columns, in place"""
+    metrics = compute_metrics(df['total_revenue'].to_numpy(), df['total_orders'].to_numpy(),
+                              df['total_reach'].to_numpy(), df['total_likes'].to_numpy(),
+                              df['total_comments'].to_numpy(), df['total_payout'].to_numpy())
+    for col in METRIC_COLUMNS:
+        df[col] = metrics[col]
+    return df
+
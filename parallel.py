@@ -0,0 +1,266 @@
+"""Multi-process, sharded execution of process_data and the payout order totals.
+
+Influencers are split into contiguous id ranges, one shard per task. The four
+tables are sorted by influencer id and copied once into
+``multiprocessing.shared_memory`` blocks that every worker maps by name, so no
+table is pickled to the pool. The row range of every shard in every table is
+found up front with ``searchsorted``, so a worker maps only its own contiguous
+slice and total work stays O(rows), whatever the shard count. Each worker runs
+the ordinary stage functions over its slice and returns a partial result;
+shards cover disjoint ids, so merging is a concatenation in range order (then
+roster order) and never depends on which worker finished first.
+
+``ShardedExecutor`` is also a ``FilterPipeline`` backend, selected with
+``backend='parallel'`` (``DASHBOARD_BACKEND``, ``--backend``) and sized with
+``workers``.
+
+Scaling with the worker count has not been measured: the only host this was
+timed on has a single CPU, where the pool adds overhead and cannot win. The
+shards are independent, so speedup is bounded by the serial merge and by
+memory bandwidth, not by coordination; measure before relying on it:
+
+    python -m parallel --influencers 1000000 --workers 1 2 4 8 16
+"""
+import argparse
+import os
+import time
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from ingest import TABLE_NAMES
+from pipeline import process_data
+from synthetic import generate_payouts
+
+# Column holding the influencer id in each table
+ID_COLUMNS = {'influencers': 'id', 'posts': 'influencer_id', 'tracking_data': 'influencer_id',
+              'payouts': 'influencer_id'}
+
+# Shared blocks already mapped by this process, by block name
+_attached = {}
+
+
+def _detach_stale(live):
+    """Unmap blocks not in live; an unlinked block's pages stay allocated while any process maps it"""
+    for name in list(_attached):
+        if name not in live:
+            try:
+                _attached[name].close()
+            except BufferError:
+                # A view over it is still referenced; retried with the next task
+                continue
+            del _attached[name]
+
+
+class SharedFrame:
+    """A frame's columns copied into shared memory; pickles as block names and dtypes only
+
+    Numeric and datetime columns are stored as their raw values, every other
+    column as factorized int32 codes with its categories carried alongside.
+    """
+
+    def __init__(self, df):
+        self.length = len(df)
+        self.start, self.stop = 0, len(df)
+        self.columns = []
+        self._blocks = []
+        for col in df.columns:
+            series = df[col]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                values, categories = series.cat.codes.to_numpy(np.int32), series.cat.categories
+            elif pd.api.types.is_numeric_dtype(series) or pd.api.types.is_datetime64_any_dtype(series):
+                values, categories = series.to_numpy(), None
+            else:
+                codes, categories = pd.factorize(series)
+                values = codes.astype(np.int32)
+            block = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+            np.ndarray(values.shape, dtype=values.dtype, buffer=block.buf)[:] = values
+            self._blocks.append(block)
+            self.columns.append((col, block.name, values.dtype.str, categories))
+
+    def __getstate__(self):
+        return {'length': self.length, 'start': self.start, 'stop': self.stop, 'columns': self.columns,
+                '_blocks': []}
+
+    def rows(self, start, stop):
+        """Picklable handle on rows [start, stop) of the same blocks"""
+        view = object.__new__(SharedFrame)
+        view.__dict__.update(self.__getstate__(), start=start, stop=stop)
+        return view
+
+    def frame(self):
+        """Frame of zero-copy views over the handle's rows (non-numeric columns as categoricals)"""
+        data = {}
+        for col, name, dtype, categories in self.columns:
+            if name not in _attached:
+                _attached[name] = shared_memory.SharedMemory(name=name)
+            values = np.ndarray((self.length,), dtype=np.dtype(dtype), buffer=_attached[name].buf)
+            values = values[self.start:self.stop]
+            data[col] = values if categories is None else pd.Categorical.from_codes(values, categories)
+        return pd.DataFrame(data, copy=False)
+
+    def block_names(self):
+        return [name for _, name, _, _ in self.columns]
+
+    def release(self):
+        """Free the shared blocks; only the creating process may call this"""
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+
+def id_shards(ids, n_shards):
+    """Half-open (low, high) id ranges splitting the ids into n_shards balanced, contiguous groups"""
+    ids = np.unique(np.asarray(ids))
+    n_shards = max(min(n_shards, len(ids)), 1)
+    edges = ids[np.linspace(0, len(ids), n_shards + 1).astype(np.int64)[:-1]]
+    highs = np.append(edges[1:], ids[-1] + 1)
+    return [(int(low), int(high)) for low, high in zip(edges, highs)]
+
+
+def sort_by_id(df, col):
+    """Frame stably sorted by its influencer id column"""
+    ids = df[col].to_numpy()
+    if (np.diff(ids) >= 0).all():
+        return df
+    return df.iloc[np.argsort(ids, kind='stable')]
+
+
+def shard_offsets(sorted_ids, bounds):
+    """[start, stop) row range of each (low, high) id range in an id-sorted column"""
+    edges = np.searchsorted(sorted_ids, [bound for pair in bounds for bound in pair])
+    return [(int(start), int(stop)) for start, stop in edges.reshape(-1, 2)]
+
+
+def _process_shard(task):
+    shard, filters, live = task
+    _detach_stale(live)
+    return process_data(*(table.frame() for table in shard), *filters)
+
+
+def _order_sums_shard(task):
+    tracking, live = task
+    _detach_stale(live)
+    return tracking.frame().groupby('influencer_id')['orders'].sum()
+
+
+def _shutdown(pool, tables):
+    pool.shutdown()
+    for table in tables.values():
+        table.release()
+
+
+def merge_shards(parts, roster_ids, dtypes):
+    """Concatenate per-shard results into roster order with the roster's column dtypes"""
+    df = pd.concat(parts, ignore_index=True)
+    positions = pd.Index(roster_ids).get_indexer(df['id'])
+    if not (np.diff(positions) >= 0).all():
+        df = df.iloc[np.argsort(positions, kind='stable')].reset_index(drop=True)
+    return df.astype({col: dtype for col, dtype in dtypes.items() if col in df.columns})
+
+
+class ShardedExecutor:
+    """Process pool running process_data and the payout order totals shard-by-shard over shared tables
+
+    ``workers`` defaults to the CPU count; ``shards`` (default: workers) sets
+    how many id ranges the roster is split into. Use as a context manager, or
+    call ``close`` to stop the pool and free the shared memory.
+    """
+
+    def __init__(self, influencers_df, posts_df, tracking_data_df, payouts_df, workers=None, shards=None):
+        self.workers = workers or os.cpu_count()
+        self.bounds = id_shards(influencers_df['id'], shards or self.workers)
+        self.influencers_df = influencers_df
+        self._roster_ids = influencers_df['id'].to_numpy()
+        self._dtypes = influencers_df.dtypes.to_dict()
+        self.tables = {}
+        self.offsets = {}
+        self._share('influencers', influencers_df)
+        self.register(posts_df, tracking_data_df, payouts_df)
+        self.pool = ProcessPoolExecutor(self.workers)
+        # Frees the pool and blocks of an executor nobody closes (e.g. a server's discarded pipeline) when
+        # it is collected, or at exit; unlike an atexit hook it holds no reference to the executor
+        self._finalizer = weakref.finalize(self, _shutdown, self.pool, self.tables)
+
+    def _share(self, name, df):
+        """Copy a table, sorted by influencer id, into shared memory and find each shard's rows in it"""
+        if name in self.tables:
+            self.tables[name].release()
+        df = sort_by_id(df, ID_COLUMNS[name])
+        self.tables[name] = SharedFrame(df)
+        self.offsets[name] = shard_offsets(df[ID_COLUMNS[name]].to_numpy(), self.bounds)
+
+    def register(self, posts_df, tracking_data_df, payouts_df):
+        """(Re)share the event and payout tables, e.g. after new events were appended"""
+        for name, df in zip(TABLE_NAMES[1:], [posts_df, tracking_data_df, payouts_df]):
+            self._share(name, df)
+        self._order_dtype = tracking_data_df['orders'].dtype
+        # Sent with every task so workers unmap the blocks this replaced
+        self._live = frozenset(name for table in self.tables.values() for name in table.block_names())
+
+    def _shard(self, name, i):
+        return self.tables[name].rows(*self.offsets[name][i])
+
+    def process(self, brand, platform, campaign, category, date_range, min_followers, max_followers):
+        """Same frame as ``pipeline.process_data``, computed one id range per task"""
+        filters = (brand, platform, campaign, category, date_range, min_followers, max_followers)
+        tasks = [([self._shard(name, i) for name in TABLE_NAMES], filters, self._live)
+                 for i in range(len(self.bounds))]
+        return merge_shards(list(self.pool.map(_process_shard, tasks)), self._roster_ids, self._dtypes)
+
+    def order_sums(self):
+        """Total tracked orders per influencer id, as ``synthetic.build_order_sum_index``"""
+        tasks = [(self._shard('tracking_data', i), self._live) for i in range(len(self.bounds))]
+        return pd.concat(list(self.pool.map(_order_sums_shard, tasks))).astype(self._order_dtype)
+
+    def payouts(self, rng):
+        """Payout table as ``synthetic.generate_payouts``, with the order totals computed per shard"""
+        return generate_payouts(self.influencers_df, None, rng, order_sum_index=self.order_sums())
+
+    def close(self):
+        self._finalizer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main(argv=None):
+    from schema import compact_tables
+    from synthetic import generate_dataset
+
+    parser = argparse.ArgumentParser(description='Time sharded process_data against the single-process path')
+    parser.add_argument('--influencers', type=int, default=200000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[os.cpu_count()],
+                        help='one or more pool sizes, timed in turn')
+    args = parser.parse_args(argv)
+
+    tables = compact_tables(generate_dataset(args.influencers))
+    filters = ('All', 'All', 'All', 'All', None, 0, 10000000)
+
+    start = time.perf_counter()
+    expected = process_data(*tables, *filters)
+    expected_payouts = generate_payouts(tables[0], tables[2], np.random.default_rng(7))
+    single_seconds = time.perf_counter() - start
+
+    print(f"influencers: {args.influencers:,}  cpus: {os.cpu_count()}  single process: {single_seconds:.2f}s")
+    for workers in args.workers:
+        with ShardedExecutor(*tables, workers=workers) as executor:
+            start = time.perf_counter()
+            actual = executor.process(*filters)
+            actual_payouts = executor.payouts(np.random.default_rng(7))
+            sharded_seconds = time.perf_counter() - start
+
+        pd.testing.assert_frame_equal(expected, actual)
+        pd.testing.assert_frame_equal(expected_payouts, actual_payouts)
+        print(f"workers: {workers:>2}  sharded: {sharded_seconds:.2f}s ({single_seconds / sharded_seconds:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,547 @@
+"""Staged, memoized version of the dashboard's process_data pipeline.
+
+``process_data`` is split into three stages so each can be cached on only the
+filters it depends on:
+
+1. ``aggregate_tracking`` - tracking rows filtered by date/brand/campaign and
+   grouped per influencer (keyed on brand, campaign, date_range)
+2. ``aggregate_posts`` - post totals per influencer (keyed on date_range)
+3. ``select_influencers`` + ``combine`` - roster filters, joins and metrics
+   (vectorized in ``metrics``)
+
+``FilterPipeline`` answers stages 1 and 2 from a ``DataCube`` built once over
+the tables, and memoizes the stages and the final frame in bounded LRU caches,
+so moving only the follower sliders reuses the cached aggregates. Batches of
+new events are applied incrementally to the cube and to every cached entry.
+With a ``DiskCache`` attached, aggregates and results missing from memory are
+read from (or written to) disk, so they survive server restarts. With a query
+``backend`` (see ``sqlbackend``), filter results are computed by it from the
+raw tables instead of from the cube.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from allocation import allocate_budget, candidate_frame
+from bootstrap import roas_intervals
+from cube import DataCube, filter_tracking, widen
+from dateindex import DateSortedFrame, date_mask, date_range_key
+from filterindex import FilterIndex
+from metrics import METRIC_COLUMNS, add_metrics, compute_metrics
+from profiling import span
+from ranking import Ranking
+from scenarios import SCENARIO_DIMENSIONS, all_combinations, scenario_kpis
+from timeseries import TimeSeries
+
+# Columns a batch of new events must provide to ``FilterPipeline.append``
+TRACKING_BATCH_COLUMNS = ['influencer_id', 'campaign', 'brand', 'date', 'orders', 'revenue']
+POST_BATCH_COLUMNS = ['post_id', 'influencer_id', 'date', 'reach', 'likes', 'comments']
+
+AGGREGATE_COLUMNS = ['total_revenue', 'total_orders', 'total_reach', 'total_likes', 'total_comments', 'post_count',
+                     'total_payout']
+
+
+class LRUCache:
+    """Thread-safe bounded LRU mapping with hit/miss/eviction counters"""
+
+    def __init__(self, maxsize=32):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_compute(self, key, compute):
+        """Cached value for key, computing and storing it on a miss"""
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+        value = compute()
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def put(self, key, value):
+        """Replace the value of a cached key without touching recency or counters"""
+        with self._lock:
+            if key in self._data:
+                self._data[key] = value
+
+    def items(self):
+        """Snapshot of the cached (key, value) pairs"""
+        with self._lock:
+            return list(self._data.items())
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'size': len(self._data), 'maxsize': self.maxsize}
+
+
+# --- STAGES ---
+def aggregate_tracking(tracking_data_df, brand, campaign, date_range):
+    """Filter tracking data and total revenue/orders per influencer"""
+    tracking_data_df = widen(filter_tracking(tracking_data_df, brand, campaign, date_range), ['revenue', 'orders'])
+    return tracking_data_df.groupby('influencer_id').agg(
+        total_revenue=('revenue', 'sum'),
+        total_orders=('orders', 'sum')
+    )
+
+
+def aggregate_posts(posts_df, date_range=None):
+    """Total reach, likes, comments and post count per influencer within the date range"""
+    posts_df = widen(posts_df[date_mask(posts_df, date_range)], ['reach', 'likes', 'comments'])
+    return posts_df.groupby('influencer_id').agg(
+        total_reach=('reach', 'sum'),
+        total_likes=('likes', 'sum'),
+        total_comments=('comments', 'sum'),
+        post_count=('post_id', 'count')
+    )
+
+
+def select_influencers(influencers_df, platform, category, min_followers, max_followers, index=None):
+    """Apply the roster filters (platform, category, follower range), via the bitmap index when given"""
+    if index is not None:
+        mask = index.select(platform=platform, category=category, follower_count=(min_followers, max_followers))
+        return influencers_df if mask is None else influencers_df[mask]
+    if platform != 'All':
+        influencers_df = influencers_df[influencers_df['platform'] == platform]
+    if category != 'All':
+        influencers_df = influencers_df[influencers_df['category'] == category]
+    return influencers_df[
+        (influencers_df['follower_count'] >= min_followers) &
+        (influencers_df['follower_count'] <= max_followers)
+    ]
+
+
+def combine(influencers_df, tracking_agg, posts_agg, payouts_df):
+    """Join the aggregates onto the selected roster and compute the metrics"""
+    with span('merge'):
+        df = influencers_df.join(tracking_agg, on='id')
+        df = df.join(posts_agg, on='id')
+        df = df.join(payouts_df.set_index('influencer_id')['total_payout'], on='id')
+        df = df.reset_index(drop=True)
+
+        # Fill NaNs for calculations
+        df[AGGREGATE_COLUMNS] = df[AGGREGATE_COLUMNS].fillna(0)
+
+    with span('metrics'):
+        return add_metrics(df)
+
+
+def process_data(influencers_df, posts_df, tracking_data_df, payouts_df, brand, platform, campaign, category, date_range, min_followers, max_followers):
+    """Enhanced data processing with more filters (uncached)"""
+    tracking_agg = aggregate_tracking(tracking_data_df, brand, campaign, date_range)
+    posts_agg = aggregate_posts(posts_df, date_range)
+    roster = select_influencers(influencers_df, platform, category, min_followers, max_followers)
+    return combine(roster, tracking_agg, posts_agg, payouts_df)
+
+
+def _hashable(caps):
+    """Cache key form of a per-group cap: None, a share, or a sorted tuple of (value, share)"""
+    return tuple(sorted(caps.items())) if isinstance(caps, dict) else caps
+
+
+def validate_batch(batch, columns, known_ids, dtypes=None):
+    """Checked copy of a batch of new events, in the dtypes of the table it is appended to
+
+    Requires the given columns without missing values, parses ``date``, and
+    rejects negative numbers and influencer ids that are not in the roster.
+    Numeric columns are cast to ``dtypes`` (the table's); values an integer
+    column cannot hold exactly (fractions, out of range) are rejected.
+    """
+    missing = [col for col in columns if col not in batch.columns]
+    if missing:
+        raise ValueError(f"Batch is missing columns: {', '.join(missing)}")
+    batch = batch[columns].copy()
+    if batch.isna().any().any():
+        raise ValueError("Batch has missing values")
+
+    batch['date'] = pd.to_datetime(batch['date'])
+    for col in batch.columns.difference(['date', 'brand', 'campaign']):
+        if not pd.api.types.is_numeric_dtype(batch[col]):
+            raise ValueError(f"Batch column '{col}' must be numeric")
+        if (batch[col] < 0).any():
+            raise ValueError(f"Batch column '{col}' has negative values")
+        dtype = None if dtypes is None else dtypes.get(col)
+        if dtype is None:
+            continue
+        if pd.api.types.is_integer_dtype(dtype):
+            values = batch[col].to_numpy()
+            if (values != np.round(values)).any():
+                raise ValueError(f"Batch column '{col}' must hold whole numbers, like the loaded data")
+            if values.max(initial=0) > np.iinfo(dtype).max:
+                raise ValueError(f"Batch column '{col}' has values too large for {np.dtype(dtype).name}")
+        batch[col] = batch[col].astype(dtype)
+
+    unknown = known_ids.get_indexer(batch['influencer_id']) < 0
+    if unknown.any():
+        raise ValueError(f"Batch references unknown influencer ids: {sorted(set(batch['influencer_id'][unknown]))[:10]}")
+    return batch
+
+
+def add_totals(agg, delta):
+    """Aggregate frame with per-influencer delta totals added; existing rows are updated in place"""
+    if delta.empty:
+        return agg
+    rows = agg.index.get_indexer(delta.index)
+    found = rows >= 0
+    for col in delta.columns:
+        # Upcast first (e.g. integer totals receiving float deltas); in-place writes must not lose values
+        dtype = np.result_type(agg[col].dtype, delta[col].dtype)
+        if agg[col].dtype != dtype:
+            agg[col] = agg[col].astype(dtype)
+    if found.any():
+        cols = agg.columns.get_indexer(delta.columns)
+        agg.iloc[rows[found], cols] = agg.iloc[rows[found], cols].to_numpy() + delta.to_numpy()[found]
+    if not found.all():
+        agg = pd.concat([agg, delta[~found]])
+    return agg
+
+
+class FilterPipeline:
+    """process_data over fixed tables, memoized per stage on the filter tuple
+
+    Returned frames are shared between callers and must be treated as read-only.
+    New tracking/post events are folded in with ``append``, which updates the
+    cube, the payout totals and every cached aggregate in place instead of
+    recomputing them.
+    """
+
+    def __init__(self, influencers_df, posts_df, tracking_data_df, payouts_df, maxsize=32, cube=None, disk=None,
+                 disk_key=None, backend=None):
+        self.influencers_df = influencers_df
+        self.payouts_df = payouts_df
+        # Payouts are copied before the first in-place update; the input may be a read-only shared view
+        self._payouts_owned = False
+        # Raw events are stored sorted by date; appended batches merge on the next read
+        self._posts = DateSortedFrame(posts_df)
+        self._tracking = DateSortedFrame(tracking_data_df)
+        # Appended batches are cast to the loaded tables' dtypes
+        self._batch_dtypes = {'tracking': tracking_data_df.dtypes.to_dict(), 'posts': posts_df.dtypes.to_dict()}
+        self.cube = cube if cube is not None else DataCube.from_tables(tracking_data_df, posts_df)
+        self.tracking_cache = LRUCache(maxsize)
+        self.posts_cache = LRUCache(maxsize)
+        self.result_cache = LRUCache(maxsize)
+        self.curve_cache = LRUCache(maxsize)
+        # Prefix-sum revenue/order curves per segment, built on the first trend query
+        self._timeseries = None
+        self.ranking_cache = LRUCache(maxsize)
+        self.allocation_cache = LRUCache(maxsize)
+        self.interval_cache = LRUCache(maxsize)
+        self.roster_index = FilterIndex(influencers_df, categorical=['platform', 'category'], ranges=['follower_count'])
+        self._influencer_ids = pd.Index(influencers_df['id'])
+        self._payout_rows = pd.Index(payouts_df['influencer_id'])
+        self._result_rows = {}
+        # Bumped by every append; views derived outside the pipeline key on it
+        self.version = 0
+        # Second-level cache on disk, keyed under the fingerprint of the source data
+        self.disk = disk
+        self.disk_key = disk_key
+        # Alternative engine for filter results; re-registered with the merged tables after appends
+        self.backend = backend
+        self._backend_stale = False
+        self._lock = threading.RLock()
+
+    @property
+    def posts_df(self):
+        with self._lock:
+            return self._posts.frame
+
+    @property
+    def tracking_data_df(self):
+        with self._lock:
+            return self._tracking.frame
+
+    def row_counts(self):
+        """Rows of each event table, without merging the runs of appended batches"""
+        with self._lock:
+            return {'posts': len(self._posts), 'tracking_data': len(self._tracking)}
+
+    def tracking_aggregate(self, brand, campaign, date_range):
+        key = (brand, campaign, date_range_key(date_range))
+        with span('aggregate:tracking'):
+            return self.tracking_cache.get_or_compute(key, lambda: self._persisted(
+                'tracking', key, lambda: self.cube.tracking_totals(brand, campaign, date_range)))
+
+    def posts_aggregate(self, date_range):
+        key = date_range_key(date_range)
+        with span('aggregate:posts'):
+            return self.posts_cache.get_or_compute(key, lambda: self._persisted(
+                'posts', key, lambda: self.cube.post_totals(date_range)))
+
+    def _persisted(self, kind, key, compute):
+        """compute() through the disk cache when one is attached"""
+        if self.disk_key is None:
+            return compute()
+        with span('disk_cache'):
+            return self.disk.get_or_compute((self.disk_key, kind, key), compute)
+
+    @property
+    def timeseries(self):
+        with self._lock:
+            if self._timeseries is None:
+                self._timeseries = TimeSeries(self.cube.tracking_cube, self.influencers_df)
+            return self._timeseries
+
+    def revenue_curve(self, brand, platform, campaign, category, min_followers, max_followers):
+        """Cumulative daily revenue and orders under every filter but the date range"""
+        key = (brand, platform, campaign, category, min_followers, max_followers)
+
+        def compute():
+            if self.roster_index.covers('follower_count', min_followers, max_followers):
+                return self.timeseries.curve(brand, platform, campaign, category)
+            # Follower ranges cut across segments; sum the cube rows of the selected roster instead
+            roster = select_influencers(self.influencers_df, platform, category, min_followers, max_followers,
+                                        self.roster_index)
+            return self.timeseries.roster_curve(self.cube.tracking_slice(brand, campaign), roster['id'])
+
+        with self._lock:
+            return self.curve_cache.get_or_compute(key, compute)
+
+    def revenue_series(self, brand, platform, campaign, category, date_range, min_followers, max_followers,
+                       freq='D', rolling=7):
+        """Revenue and orders per day, week or month inside the date range, with rolling and cumulative revenue"""
+        with span('timeseries'):
+            return self.revenue_curve(brand, platform, campaign, category, min_followers,
+                                      max_followers).resample(date_range, freq, rolling)
+
+    def brand_totals(self, date_range):
+        """Revenue and orders per brand within the date range"""
+        with self._lock:
+            return self.cube.brand_totals(date_range)
+
+    def dimension_values(self, col):
+        """Sorted distinct values of a filter dimension (brand, campaign, platform or category)"""
+        with self._lock:
+            if col in self.roster_index.bitmaps:
+                return self.roster_index.values(col)
+            return self.cube.dimension_values(col)
+
+    def date_bounds(self):
+        """First and last tracked date"""
+        with self._lock:
+            return self.cube.date_bounds()
+
+    def process(self, brand, platform, campaign, category, date_range, min_followers, max_followers):
+        """Filtered per-influencer frame for one filter state"""
+        key = (brand, platform, campaign, category, date_range_key(date_range), min_followers, max_followers)
+
+        def combine_filtered():
+            if self.backend is not None:
+                return self._backend_process(brand, platform, campaign, category, date_range, min_followers,
+                                             max_followers)
+            with span('filter:roster'):
+                roster = select_influencers(self.influencers_df, platform, category, min_followers, max_followers,
+                                            self.roster_index)
+            return combine(roster, self.tracking_aggregate(brand, campaign, date_range),
+                           self.posts_aggregate(date_range), self.payouts_df)
+
+        def compute():
+            # Each backend's results are persisted under its own key
+            kind = 'result' if self.backend is None else ('result', type(self.backend).__name__)
+            df = self._persisted(kind, key, combine_filtered)
+            self._result_rows[key] = pd.Index(df['id'])
+            return df
+
+        with self._lock:
+            return self.result_cache.get_or_compute(key, compute)
+
+    def _backend_process(self, *filters):
+        if self._backend_stale:
+            self.backend.register(self.posts_df, self.tracking_data_df, self.payouts_df)
+            self._backend_stale = False
+        with span('backend'):
+            return self.backend.process(*filters)
+
+    def ranking(self, brand, platform, campaign, category, date_range, min_followers, max_followers):
+        """Top-K ranked views of the filtered frame for one filter state"""
+        key = (brand, platform, campaign, category, date_range_key(date_range), min_followers, max_followers)
+        with self._lock:
+            return self.ranking_cache.get_or_compute(key, lambda: Ranking(self.process(
+                brand, platform, campaign, category, date_range, min_followers, max_followers)))
+
+    def roas_intervals(self, brand, platform, campaign, category, date_range, min_followers, max_followers,
+                       baseline_roas):
+        """Bootstrap intervals of overall, incremental and per-platform/category ROAS for one filter state"""
+        key = (brand, platform, campaign, category, date_range_key(date_range), min_followers, max_followers)
+
+        def compute():
+            with span('bootstrap'):
+                return roas_intervals(self.process(*key), baseline_roas)
+
+        with self._lock:
+            return self.interval_cache.get_or_compute((key, baseline_roas), compute)
+
+    def allocate(self, budget, brand, platform, campaign, category, date_range, min_followers, max_followers,
+                 basis='All', min_roas=0.0, platform_caps=None, category_caps=None, min_influencers=0,
+                 max_influencers=None, max_scale=1.0):
+        """Budget plan over the filtered roster maximizing expected revenue, and its summary
+
+        See ``allocation.allocate_budget`` for the constraints; caps are one
+        share of the budget for every group or a mapping of value to share.
+        """
+        filters = (brand, platform, campaign, category, date_range_key(date_range), min_followers, max_followers)
+        constraints = (basis, min_roas, _hashable(platform_caps), _hashable(category_caps), min_influencers,
+                       max_influencers, max_scale)
+
+        def compute():
+            with span('allocate'):
+                candidates = candidate_frame(self.process(*filters), self.payouts_df, basis, min_roas)
+                return allocate_budget(candidates, budget, platform_caps, category_caps, min_influencers,
+                                       max_influencers, max_scale)
+
+        with self._lock:
+            return self.allocation_cache.get_or_compute((filters, budget, constraints), compute)
+
+    def scenarios(self, date_range, min_followers, max_followers, baseline_roas, combinations=None):
+        """KPIs for many (brand, campaign, platform, category) combinations from one grouped pass
+
+        ``combinations`` is a frame or a list of tuples in that order, with
+        'All' for no filter; every combination of 'All' and the known values
+        is evaluated when it is None.
+        """
+        with self._lock:
+            if combinations is None:
+                combinations = all_combinations({dim: self.dimension_values(dim) for dim in SCENARIO_DIMENSIONS})
+            elif not isinstance(combinations, pd.DataFrame):
+                combinations = pd.DataFrame(list(combinations), columns=SCENARIO_DIMENSIONS)
+            roster = select_influencers(self.influencers_df, 'All', 'All', min_followers, max_followers,
+                                        self.roster_index)
+            return scenario_kpis(self.cube.tracking_slice(date_range=date_range), roster, self.payouts_df,
+                                 combinations, baseline_roas)
+
+    def append(self, tracking_batch=None, posts_batch=None):
+        """Fold a batch of new tracking and/or post rows into the data and every cached aggregate
+
+        Cost is proportional to the batch and the number of cached filter states,
+        not to the size of the loaded tables. Raises ValueError for invalid batches.
+        """
+        if tracking_batch is not None:
+            tracking_batch = validate_batch(tracking_batch, TRACKING_BATCH_COLUMNS, self._influencer_ids,
+                                            self._batch_dtypes['tracking'])
+        if posts_batch is not None:
+            posts_batch = validate_batch(posts_batch, POST_BATCH_COLUMNS, self._influencer_ids,
+                                         self._batch_dtypes['posts'])
+        has_tracking = tracking_batch is not None and len(tracking_batch) > 0
+        has_posts = posts_batch is not None and len(posts_batch) > 0
+
+        with self._lock:
+            # Every delta is computed before the first write, so a failure leaves the pipeline unchanged
+            tracking_deltas = [(key, agg, aggregate_tracking(tracking_batch, *key))
+                               for key, agg in self.tracking_cache.items()] if has_tracking else []
+            posts_deltas = [(key, agg, aggregate_posts(posts_batch, key))
+                            for key, agg in self.posts_cache.items()] if has_posts else []
+
+            # The data no longer matches the fingerprinted source; disk entries are neither read nor written
+            self.disk_key = None
+            self.cube.append(tracking_batch, posts_batch)
+            touched = pd.Index([], dtype='int64')
+            if has_tracking:
+                self._tracking.append(tracking_batch)
+                touched = touched.union(pd.Index(tracking_batch['influencer_id'].unique()))
+                self._update_order_payouts(tracking_batch)
+                for key, agg, delta in tracking_deltas:
+                    self.tracking_cache.put(key, add_totals(agg, delta))
+                if self._timeseries is not None and not self._timeseries.append(tracking_batch):
+                    self._timeseries = None
+                self.curve_cache.clear()
+            if has_posts:
+                self._posts.append(posts_batch)
+                touched = touched.union(pd.Index(posts_batch['influencer_id'].unique()))
+                for key, agg, delta in posts_deltas:
+                    self.posts_cache.put(key, add_totals(agg, delta))
+            self._refresh_results(touched)
+            # Cached rankings, plans and intervals were built from the pre-append values
+            self.ranking_cache.clear()
+            self.allocation_cache.clear()
+            self.interval_cache.clear()
+            self._backend_stale = True
+            self.version += 1
+
+        return {'tracking_rows': 0 if tracking_batch is None else len(tracking_batch),
+                'post_rows': 0 if posts_batch is None else len(posts_batch),
+                'influencers': len(touched)}
+
+    def _update_order_payouts(self, tracking_batch):
+        """Grow order-based payouts by the batch's new orders"""
+        new_orders = tracking_batch.groupby('influencer_id')['orders'].sum()
+        rows = self._payout_rows.get_indexer(new_orders.index)
+        found = rows >= 0
+        rows, new_orders = rows[found], new_orders.to_numpy()[found]
+        is_order = self.payouts_df['basis'].iloc[rows].to_numpy() == 'order'
+        rows, new_orders = rows[is_order], new_orders[is_order]
+        if len(rows) == 0:
+            return
+        if not self._payouts_owned:
+            self.payouts_df = self.payouts_df.copy()
+            self._payouts_owned = True
+        orders = self.payouts_df['orders'].to_numpy()[rows] + new_orders
+        rates = self.payouts_df['rate'].to_numpy()[rows]
+        self.payouts_df.iloc[rows, self.payouts_df.columns.get_loc('orders')] = orders.astype(
+            self.payouts_df['orders'].dtype)
+        self.payouts_df.iloc[rows, self.payouts_df.columns.get_loc('total_payout')] = (rates * orders).astype(
+            self.payouts_df['total_payout'].dtype)
+
+    def _refresh_results(self, touched):
+        """Recompute aggregate and metric columns of cached result rows for the touched influencers"""
+        if touched.empty:
+            return
+        payout_totals = self.payouts_df['total_payout'].to_numpy()
+        live_keys = set()
+        for key, df in self.result_cache.items():
+            live_keys.add(key)
+            result_ids = self._result_rows[key]
+            # Matching dtypes let the index look ids up in its hash table instead of converting itself
+            rows = result_ids.get_indexer(touched.astype(result_ids.dtype))
+            rows = rows[rows >= 0]
+            if len(rows) == 0:
+                continue
+            brand, _, campaign, _, date_key, _, _ = key
+            ids = df['id'].to_numpy()[rows]
+            totals = pd.concat([
+                self.tracking_aggregate(brand, campaign, date_key).reindex(ids),
+                self.posts_aggregate(date_key).reindex(ids),
+            ], axis=1).reindex(columns=AGGREGATE_COLUMNS).fillna(0)
+            payout_rows = self._payout_rows.get_indexer(ids)
+            totals['total_payout'] = np.where(payout_rows >= 0, payout_totals[payout_rows], 0)
+            metrics = compute_metrics(*(totals[col].to_numpy() for col in
+                                        ['total_revenue', 'total_orders', 'total_reach', 'total_likes',
+                                         'total_comments', 'total_payout']))
+            for col in AGGREGATE_COLUMNS:
+                df.iloc[rows, df.columns.get_loc(col)] = totals[col].to_numpy()
+            for col in METRIC_COLUMNS:
+                df.iloc[rows, df.columns.get_loc(col)] = metrics[col]
+        # Drop row indexes of results evicted from the cache
+        for key in set(self._result_rows) - live_keys:
+            del self._result_rows[key]
+
+    def clear(self):
+        with self._lock:
+            for cache in (self.tracking_cache, self.posts_cache, self.result_cache, self.curve_cache,
+                          self.ranking_cache, self.allocation_cache, self.interval_cache):
+                cache.clear()
+            self._result_rows.clear()
+
+    def cache_stats(self):
+        """Hit/miss/eviction counters per cache"""
+        stats = {'results': self.result_cache.stats(), 'tracking_aggregates': self.tracking_cache.stats(),
+                 'post_aggregates': self.posts_cache.stats(), 'revenue_curves': self.curve_cache.stats(),
+                 'rankings': self.ranking_cache.stats(), 'allocations': self.allocation_cache.stats(),
+                 'roas_intervals': self.interval_cache.stats()}
+        if self.disk is not None:
+            stats['disk'] = self.disk.stats()
+        return stats
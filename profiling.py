@@ -0,0 +1,168 @@
+"""Opt-in per-stage timing and memory tracing for dashboard reruns.
+
+Code marks its stages with ``with span('name'):``. Spans are recorded only
+while a ``Tracer`` is active in the current context (``tracer.activate()``, or
+between ``tracer.start()`` and ``tracer.stop()``); otherwise ``span`` is a
+no-op costing one context-variable lookup. Spans nest, and each records its
+start offset and wall time. Traces export to the Chrome trace-event format,
+readable by chrome://tracing and Perfetto.
+
+A ``Tracer(memory=True)`` also records the net and peak memory allocated
+inside each span, via ``tracemalloc``. Those figures are process-wide: the
+tracing is shared by every thread, so allocations and peak resets of other
+sessions land in whichever span is open, and it slows every session while
+on. The dashboard only enables it server-wide (``DASHBOARD_TRACE_MEMORY``).
+Tracers share one tracing session, started by the first and stopped by the
+last.
+"""
+import contextlib
+import contextvars
+import json
+import threading
+import time
+import tracemalloc
+
+_active = contextvars.ContextVar('tracer', default=None)
+
+# Memory tracers holding the process-wide tracemalloc session, and whether a tracer started it
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users = 0
+_tracemalloc_owned = False
+
+
+def _acquire_tracemalloc():
+    global _tracemalloc_users, _tracemalloc_owned
+    with _tracemalloc_lock:
+        if _tracemalloc_users == 0:
+            # Tracing started outside (e.g. PYTHONTRACEMALLOC) is left running
+            _tracemalloc_owned = not tracemalloc.is_tracing()
+            if _tracemalloc_owned:
+                tracemalloc.start()
+        _tracemalloc_users += 1
+
+
+def _release_tracemalloc():
+    global _tracemalloc_users
+    with _tracemalloc_lock:
+        _tracemalloc_users -= 1
+        if _tracemalloc_users == 0 and _tracemalloc_owned:
+            tracemalloc.stop()
+
+
+class Tracer:
+    """Spans recorded during one rerun (or one fragment rerun)"""
+
+    def __init__(self, name='rerun', memory=False):
+        self.name = name
+        self.memory = memory
+        self.spans = []
+        self.started = time.time()
+        self._origin = time.perf_counter()
+        self._stack = []
+        self._token = None
+        self._tracing = False
+
+    def start(self):
+        """Record spans opened in this context until ``stop``"""
+        if self.memory and not self._tracing:
+            _acquire_tracemalloc()
+            self._tracing = True
+        self._token = _active.set(self)
+        return self
+
+    def stop(self):
+        if self._token is not None:
+            _active.reset(self._token)
+            self._token = None
+        if self._tracing:
+            _release_tracemalloc()
+            self._tracing = False
+
+    @contextlib.contextmanager
+    def activate(self):
+        """Record spans opened in this context until the block exits"""
+        self.start()
+        try:
+            yield self
+        finally:
+            self.stop()
+
+    def span(self, name):
+        return self._memory_span(name) if self._tracing else self._time_span(name)
+
+    @contextlib.contextmanager
+    def _time_span(self, name):
+        self._stack.append({})
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            self._stack.pop()
+            self.spans.append({'name': name, 'depth': len(self._stack), 'start': start - self._origin,
+                               'seconds': seconds, 'net_kb': None, 'peak_kb': None})
+
+    @contextlib.contextmanager
+    def _memory_span(self, name):
+        start_current, peak_before = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        frame = {'peak': start_current}
+        self._stack.append(frame)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            end_current, peak = tracemalloc.get_traced_memory()
+            peak = max(frame['peak'], peak)
+            self._stack.pop()
+            if self._stack:
+                # reset_peak above hid the parent's peak so far; carry both up
+                self._stack[-1]['peak'] = max(self._stack[-1]['peak'], peak, peak_before)
+            self.spans.append({
+                'name': name,
+                'depth': len(self._stack),
+                'start': start - self._origin,
+                'seconds': seconds,
+                'net_kb': (end_current - start_current) / 1024,
+                'peak_kb': (peak - start_current) / 1024,
+            })
+
+    def total_seconds(self):
+        return sum(s['seconds'] for s in self.spans if s['depth'] == 0)
+
+    def to_dict(self):
+        return {'name': self.name, 'started': self.started, 'spans': sorted(self.spans, key=lambda s: s['start'])}
+
+
+def current():
+    """The tracer active in this context, or None"""
+    return _active.get()
+
+
+def span(name):
+    """Context manager timing a stage under the active tracer; a no-op when none is active"""
+    tracer = _active.get()
+    return tracer.span(name) if tracer is not None else contextlib.nullcontext()
+
+
+def chrome_trace(traces):
+    """Chrome trace-event document of traces (Tracer.to_dict() records), one thread row per trace"""
+    events = []
+    for tid, trace in enumerate(traces, 1):
+        origin_us = trace['started'] * 1e6
+        events.append({'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': tid, 'args': {'name': trace['name']}})
+        for s in trace['spans']:
+            memory = {} if s['peak_kb'] is None else {
+                'process_net_kb': round(s['net_kb'], 1), 'process_peak_kb': round(s['peak_kb'], 1)}
+            events.append({
+                'name': s['name'], 'ph': 'X', 'pid': 1, 'tid': tid,
+                'ts': origin_us + s['start'] * 1e6, 'dur': s['seconds'] * 1e6, 'args': memory,
+            })
+    return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+
+def write_chrome_trace(traces, path):
+    """Write traces to path as a Chrome trace-event JSON file"""
+    with open(path, 'w') as f:
+        json.dump(chrome_trace(traces), f)
@@ -0,0 +1,83 @@
+"""Top-K selection over the filtered per-influencer frame.
+
+The first page of a ranked view is selected with ``np.partition`` in
+O(n + k log k) instead of sorting every row. Deeper pages fall back to a full
+stable order per metric and direction, computed once per filter state and
+cached on the ``Ranking`` so paging through it costs only a slice.
+"""
+import threading
+
+import numpy as np
+
+
+def top_k_positions(values, k, ascending=False):
+    """Positions of the k largest (or smallest) values, ranked, ties in positional order
+
+    Matches ``nlargest``/``nsmallest`` with ``keep='first'``.
+    """
+    keys = np.asarray(values, dtype=np.float64) if ascending else -np.asarray(values, dtype=np.float64)
+    k = min(k, len(keys))
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+    kth = np.partition(keys, k - 1)[k - 1]
+    better = np.flatnonzero(keys < kth)
+    ties = np.flatnonzero(keys == kth)[:k - len(better)]
+    rows = np.concatenate([better, ties])
+    return rows[np.lexsort((rows, keys[rows]))]
+
+
+def sorted_positions(values, ascending=False):
+    """Stable full ranking of every position"""
+    keys = np.asarray(values, dtype=np.float64)
+    return np.argsort(keys if ascending else -keys, kind='stable')
+
+
+class Ranking:
+    """Ranked views of one filtered frame, with the full order of each metric cached on first use"""
+
+    def __init__(self, df):
+        self.df = df
+        self._orders = {}
+        self._lock = threading.Lock()
+
+    def _mask(self, min_values):
+        """Rows with col >= value for every (col, value) in min_values, or None when unfiltered"""
+        mask = None
+        for col, value in (min_values or {}).items():
+            if value is None:
+                continue
+            col_mask = self.df[col].to_numpy() >= value
+            mask = col_mask if mask is None else mask & col_mask
+        return mask
+
+    def sorted_order(self, metric, ascending=False):
+        """Full stable order of the frame by metric, cached per direction"""
+        with self._lock:
+            key = (metric, ascending)
+            if key not in self._orders:
+                self._orders[key] = sorted_positions(self.df[metric].to_numpy(), ascending)
+            return self._orders[key]
+
+    def count(self, min_values=None):
+        """Number of rows passing the minimum thresholds"""
+        mask = self._mask(min_values)
+        return len(self.df) if mask is None else int(mask.sum())
+
+    def positions(self, metric, k, ascending=False, offset=0, min_values=None):
+        """Positions of ranks offset..offset+k by metric among rows passing min_values"""
+        mask = self._mask(min_values)
+        if offset > 0 or (metric, ascending) in self._orders:
+            order = self.sorted_order(metric, ascending)
+            if mask is not None:
+                order = order[mask[order]]
+            return order[offset:offset + k]
+
+        values = self.df[metric].to_numpy()
+        if mask is None:
+            return top_k_positions(values, k, ascending)
+        candidates = np.flatnonzero(mask)
+        return candidates[top_k_positions(values[candidates], k, ascending)]
+
+    def top(self, metric, k, ascending=False, offset=0, min_values=None):
+        """Rows of ranks offset..offset+k by metric; see ``positions``"""
+        return self.df.iloc[self.positions(metric, k, ascending, offset, min_values)]
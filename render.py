@@ -0,0 +1,93 @@
+"""Server-side reduction of chart data before it is handed to Plotly.
+
+Histograms are pre-binned with ``np.histogram`` so only bin counts are sent,
+scatter plots are reduced to a point budget (density bins plus the top-N
+outliers kept as individual points), and scatter traces switch to WebGL above
+a size threshold. ``payload_bytes`` reports the serialized size of a figure.
+"""
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+# Points sent per scatter chart; larger inputs are density-binned
+POINT_BUDGET = 5000
+# Individual points kept by highest outlier metric when binning
+TOP_OUTLIERS = 200
+# Scatter traces with more points than this render with WebGL
+WEBGL_THRESHOLD = 1000
+
+
+def render_mode(n_points, threshold=WEBGL_THRESHOLD):
+    """Plotly Express render_mode for a scatter of n_points"""
+    return 'webgl' if n_points > threshold else 'svg'
+
+
+def binned_histogram(values, nbins=30):
+    """Bin counts, left edges and widths of values over nbins equal-width bins"""
+    values = np.asarray(values, dtype=np.float64)
+    counts, edges = np.histogram(values, bins=nbins) if len(values) else (np.zeros(0, dtype=np.int64), np.zeros(1))
+    return pd.DataFrame({'start': edges[:-1], 'width': np.diff(edges), 'count': counts})
+
+
+def histogram_figure(values, nbins=30, title=None, x_label=None, y_label='Count'):
+    """Bar figure of pre-binned counts; only nbins bars are serialized whatever the input size"""
+    bins = binned_histogram(values, nbins)
+    fig = go.Figure(go.Bar(
+        x=bins['start'] + bins['width'] / 2,
+        y=bins['count'],
+        width=bins['width'],
+        customdata=np.column_stack([bins['start'], bins['start'] + bins['width']]),
+        hovertemplate='%{customdata[0]:.2f} – %{customdata[1]:.2f}<br>%{y:,}<extra></extra>'
+    ))
+    fig.update_layout(title=title, xaxis_title=x_label, yaxis_title=y_label, bargap=0)
+    return fig
+
+
+def _bin_codes(values, nbins):
+    """Equal-width bin number of every value, 0..nbins-1"""
+    low, high = values.min(), values.max()
+    if high <= low:
+        return np.zeros(len(values), dtype=np.int64)
+    return np.minimum(((values - low) / (high - low) * nbins).astype(np.int64), nbins - 1)
+
+
+def downsample_scatter(df, x, y, outlier_by, label, budget=POINT_BUDGET, top_n=TOP_OUTLIERS):
+    """At most ``budget`` scatter points summarizing df
+
+    Frames within budget are returned unchanged. Otherwise the ``top_n`` rows
+    with the largest ``outlier_by`` stay individual points and the rest are
+    binned on a square x/y grid: every occupied cell becomes one point at the
+    mean of its rows, with numeric columns averaged, ``label`` set to the row
+    count and a ``points`` column giving the rows it stands for.
+    """
+    if len(df) <= budget:
+        return df.assign(points=1)
+
+    top_n = min(top_n, budget // 2)
+    scores = df[outlier_by].to_numpy()
+    outlier_rows = np.argpartition(-scores, top_n - 1)[:top_n] if top_n else np.zeros(0, dtype=np.int64)
+    keep = np.ones(len(df), dtype=bool)
+    keep[outlier_rows] = False
+    rest = df[keep]
+
+    grid = max(int(np.sqrt(budget - top_n)), 1)
+    codes = (_bin_codes(rest[x].to_numpy(np.float64), grid) * grid
+             + _bin_codes(rest[y].to_numpy(np.float64), grid))
+    cells, cell_rows = np.unique(codes, return_inverse=True)
+    counts = np.bincount(cell_rows, minlength=len(cells))
+
+    numeric = [col for col in rest.columns if pd.api.types.is_numeric_dtype(rest[col])]
+    binned = pd.DataFrame({
+        col: np.bincount(cell_rows, weights=rest[col].to_numpy(np.float64), minlength=len(cells)) / counts
+        for col in numeric
+    })
+    binned[label] = [f'{n:,} influencers' for n in counts]
+    binned['points'] = counts
+
+    outliers = df.iloc[outlier_rows].assign(points=1)
+    return pd.concat([outliers[numeric + [label, 'points']], binned], ignore_index=True)
+
+
+def payload_bytes(fig):
+    """Size in bytes of a figure's JSON serialization, as sent to the browser"""
+    return len(fig.to_json().encode('utf-8'))
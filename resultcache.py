@@ -0,0 +1,172 @@
+"""Persistent on-disk cache of frames, shared across server restarts and processes.
+
+Each entry is one uncompressed Arrow IPC file named by a hash of its key, so a
+warm start reads tables, aggregates and filter results back with a memory map
+and no recomputation. Keys start with a fingerprint of the source data (content
+digests of the data files, or the synthetic generator and its parameters), so
+changed sources miss instead of serving stale entries. The directory is bounded
+in bytes; the least recently read entries are deleted first.
+"""
+import hashlib
+import json
+import os
+import threading
+
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+DEFAULT_MAX_BYTES = 1 << 30
+DIGESTS = 'digests.json'
+# Bumped when the layout of cached frames changes
+CACHE_VERSION = 1
+# Modules whose code shapes the cached frames; editing one invalidates every entry
+CODE_FILES = ['synthetic.py', 'schema.py', 'ingest.py', 'store.py', 'cube.py', 'dateindex.py', 'filterindex.py',
+              'metrics.py', 'pipeline.py', 'sqlbackend.py', 'parallel.py']
+CODE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _digest_file(path, chunk_size=1 << 20):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_digests(paths, memo):
+    """Content digest per file, rehashing only files whose size or mtime differ from their memo entry
+
+    ``memo`` maps absolute paths to ``[size, mtime_ns, digest]`` and is updated
+    in place.
+    """
+    digests = []
+    for path in paths:
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        seen = memo.get(path)
+        if seen is None or seen[:2] != [stat.st_size, stat.st_mtime_ns]:
+            seen = memo[path] = [stat.st_size, stat.st_mtime_ns, _digest_file(path)]
+        digests.append(seen[2])
+    return digests
+
+
+def source_fingerprint(source, paths=(), memo=None):
+    """Digest of source (a tuple of plain values), the files it was read from and the code shaping the frames"""
+    memo = {} if memo is None else memo
+    code = file_digests([os.path.join(CODE_DIR, name) for name in CODE_FILES], memo)
+    return hashlib.blake2b(repr((CACHE_VERSION, source, file_digests(paths, memo), code)).encode(),
+                           digest_size=16).hexdigest()
+
+
+class DiskCache:
+    """Size-bounded directory of Arrow IPC frames keyed by tuples of plain values"""
+
+    def __init__(self, cache_dir, max_bytes=DEFAULT_MAX_BYTES):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._bytes = sum(size for _, size, _ in self._entries())
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest() + '.arrow')
+
+    def _entries(self):
+        """(path, bytes, last read) of every entry"""
+        with os.scandir(self.cache_dir) as it:
+            return [(e.path, e.stat().st_size, e.stat().st_mtime) for e in it if e.name.endswith('.arrow')]
+
+    def get(self, key):
+        """Cached frame for key, or None"""
+        path = self._path(key)
+        try:
+            table = ipc.open_file(pa.memory_map(path, 'r')).read_all()
+            # Touched so eviction sees it as recently read
+            os.utime(path)
+        except (OSError, pa.ArrowInvalid):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        # Consolidated blocks are a writable copy; cached frames may be updated in place
+        return table.to_pandas()
+
+    def put(self, key, df):
+        """Store a frame under key, evicting old entries past the size bound; write errors are ignored"""
+        path = self._path(key)
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        table = pa.Table.from_pandas(df)
+        try:
+            with pa.OSFile(tmp_path, 'wb') as sink:
+                with ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+            with self._lock:
+                # Rewriting a key replaces its file, whose bytes are no longer in the directory
+                replaced = os.path.getsize(path) if os.path.exists(path) else 0
+                os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+        with self._lock:
+            self._bytes += os.path.getsize(path) - replaced
+            if self._bytes > self.max_bytes:
+                self._evict()
+
+    def get_or_compute(self, key, compute):
+        """Cached frame for key, computing and storing it on a miss"""
+        df = self.get(key)
+        if df is None:
+            df = compute()
+            self.put(key, df)
+        return df
+
+    def _evict(self):
+        """Delete the least recently read entries until the directory fits the size bound"""
+        # Other processes write to the same directory, so the total is recounted from disk
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        self._bytes = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if self._bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            self._bytes -= size
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            for path, _, _ in self._entries():
+                os.remove(path)
+            self._bytes = 0
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'size': len(self._entries()), 'bytes': self._bytes, 'max_bytes': self.max_bytes}
+
+    def fingerprint(self, source, paths=()):
+        """Key prefix for data from source (a tuple of plain values) and the files it was read from"""
+        memo = self._read_memo()
+        fingerprint = source_fingerprint(source, paths, memo)
+        self._write_memo(memo)
+        return fingerprint
+
+    def _read_memo(self):
+        try:
+            with open(os.path.join(self.cache_dir, DIGESTS)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_memo(self, memo):
+        memo_path = os.path.join(self.cache_dir, DIGESTS)
+        tmp_path = f'{memo_path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(memo, f)
+        os.replace(tmp_path, memo_path)
@@ -0,0 +1,73 @@
+"""Batch KPIs for many brand x campaign x platform x category combinations at once.
+
+Rather than one ``process_data`` run per combination, the tracking cube slice
+for the date range is labelled with each row's roster platform/category and
+summed once per (brand, campaign, platform, category). Every rollup where some
+dimensions are 'All' is then summed from that small table, and spend (which
+depends only on platform and category) is rolled up the same way from the
+payouts. Any combination's KPIs are a lookup into the two rollups.
+"""
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from cube import widen
+from metrics import safe_divide
+
+SCENARIO_DIMENSIONS = ['brand', 'campaign', 'platform', 'category']
+ROSTER_DIMENSIONS = ['platform', 'category']
+
+
+def rollup(df, dims, measures):
+    """Sums of measures for every subset of dims; dims outside a subset are labelled 'All'"""
+    base = df.groupby(dims, observed=True)[measures].sum().reset_index()
+    base[dims] = base[dims].astype(object)
+    parts = []
+    for size in range(len(dims) + 1):
+        for subset in itertools.combinations(dims, size):
+            part = base.groupby(list(subset))[measures].sum().reset_index() if subset else base[measures].sum().to_frame().T
+            for dim in dims:
+                if dim not in subset:
+                    part[dim] = 'All'
+            parts.append(part[dims + measures])
+    return pd.concat(parts, ignore_index=True).set_index(dims)
+
+
+def all_combinations(dimension_values):
+    """Every combination of 'All' plus the values of each dimension, as a frame"""
+    return pd.DataFrame(
+        list(itertools.product(*(['All'] + list(dimension_values[dim]) for dim in SCENARIO_DIMENSIONS))),
+        columns=SCENARIO_DIMENSIONS)
+
+
+def scenario_kpis(tracking_slice, roster, payouts_df, combinations, baseline_roas):
+    """Spend, revenue, orders, overall and incremental ROAS per combination
+
+    ``tracking_slice`` is the tracking cube restricted to the date range and
+    ``roster`` the influencers passing the follower filters; ``combinations``
+    is a frame with one column per scenario dimension ('All' for no filter).
+    """
+    roster_ids = pd.Index(roster['id'])
+    rows = roster_ids.get_indexer(tracking_slice['influencer_id'])
+    tracked = rows >= 0
+    tracking = widen(tracking_slice.loc[tracked, ['brand', 'campaign', 'revenue', 'orders']], ['revenue', 'orders'])
+    for dim in ROSTER_DIMENSIONS:
+        tracking[dim] = roster[dim].take(rows[tracked]).to_numpy()
+    revenue = rollup(tracking, SCENARIO_DIMENSIONS, ['revenue', 'orders'])
+
+    payout_rows = roster_ids.get_indexer(payouts_df['influencer_id'])
+    paid = payout_rows >= 0
+    spend = pd.DataFrame({'spend': payouts_df['total_payout'].to_numpy()[paid]})
+    for dim in ROSTER_DIMENSIONS:
+        spend[dim] = roster[dim].take(payout_rows[paid]).to_numpy()
+    spend = rollup(spend, ROSTER_DIMENSIONS, ['spend'])
+
+    result = combinations[SCENARIO_DIMENSIONS].astype(object).reset_index(drop=True)
+    totals = revenue.reindex(pd.MultiIndex.from_frame(result)).fillna(0)
+    result['total_spend'] = spend['spend'].reindex(pd.MultiIndex.from_frame(result[ROSTER_DIMENSIONS])).fillna(0).to_numpy()
+    result['total_revenue'] = totals['revenue'].to_numpy()
+    result['total_orders'] = totals['orders'].to_numpy().astype(np.int64)
+    result['overall_roas'] = safe_divide(result['total_revenue'].to_numpy(), result['total_spend'].to_numpy())
+    result['incremental_roas'] = result['overall_roas'] - baseline_roas
+    return result
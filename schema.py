@@ -0,0 +1,108 @@
+"""Compact in-memory layout for the four dashboard tables.
+
+Low-cardinality strings become categoricals, identifiers and per-row counts are
+downcast to int32 and nullable counts to float32 when every value fits, and
+columns that are pure functions of other columns are dropped and derived on
+demand: ``post_urls`` rebuilds the post ``url`` from the posting influencer's
+platform and the post id, and ``write_tables`` calls it when exporting. Post
+``caption`` is kept: it is drawn per post, not derived, and as a categorical it
+costs one small code per row. The cubes widen int32 measures to int64 before
+summing.
+
+    python -m schema --influencers 200000
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from ingest import TABLE_NAMES, apply_schema
+
+# Columns downcast to int32 when every value fits
+INT32_COLUMNS = {
+    'influencers': ['id', 'follower_count'],
+    'posts': ['post_id', 'influencer_id', 'reach', 'likes', 'comments'],
+    'tracking_data': ['tracking_id', 'influencer_id', 'orders'],
+    'payouts': ['payout_id', 'influencer_id', 'rate'],
+}
+# Columns downcast to float32 when every value is exactly representable
+FLOAT32_COLUMNS = {
+    'payouts': ['orders'],
+}
+# Columns dropped as pure functions of other columns, recomputed on demand
+DERIVED_COLUMNS = {
+    'posts': ['url'],
+}
+
+INT32_INFO = np.iinfo(np.int32)
+FLOAT32_EXACT_LIMIT = 2 ** 24
+
+
+def _fits_int32(values):
+    return len(values) == 0 or (values.min() >= INT32_INFO.min and values.max() <= INT32_INFO.max)
+
+
+def _fits_float32(values):
+    finite = values[np.isfinite(values)]
+    return len(finite) == 0 or (np.abs(finite).max() <= FLOAT32_EXACT_LIMIT and (finite == np.round(finite)).all())
+
+
+def compact_table(df, table):
+    """Table in the compact layout: categoricals, int32/float32 where safe, derived columns dropped"""
+    df = apply_schema(df.drop(columns=DERIVED_COLUMNS.get(table, []), errors='ignore'), table)
+    for col in INT32_COLUMNS.get(table, []):
+        if col in df.columns and pd.api.types.is_integer_dtype(df[col]) and _fits_int32(df[col].to_numpy()):
+            df[col] = df[col].astype(np.int32)
+    for col in FLOAT32_COLUMNS.get(table, []):
+        if col in df.columns and pd.api.types.is_float_dtype(df[col]) and _fits_float32(df[col].to_numpy()):
+            df[col] = df[col].astype(np.float32)
+    return df
+
+
+def compact_tables(tables):
+    """Compact influencers, posts, tracking and payouts"""
+    return tuple(compact_table(df, table) for table, df in zip(TABLE_NAMES, tables))
+
+
+def post_urls(posts_df, influencers_df):
+    """Post URLs derived from the posting influencer's platform and post_id"""
+    platforms = influencers_df['platform'].astype('category')
+    prefixes = np.array([f'http://{p.lower()}.com/p' for p in platforms.cat.categories], dtype=object)
+    owners = pd.Index(influencers_df['id']).get_indexer(posts_df['influencer_id'])
+    prefix = pd.Series(prefixes[platforms.cat.codes.to_numpy()[owners]], index=posts_df.index)
+    return prefix + posts_df['post_id'].astype(str)
+
+
+def table_bytes(df):
+    """Deep in-memory size of a frame"""
+    return int(df.memory_usage(deep=True).sum())
+
+
+def memory_report(before, after):
+    """Per-table memory of two layouts of the same tables"""
+    report = pd.DataFrame({
+        'table': TABLE_NAMES,
+        'before_mb': [table_bytes(df) / 1e6 for df in before],
+        'after_mb': [table_bytes(df) / 1e6 for df in after],
+    })
+    total = pd.DataFrame({'table': ['total'], 'before_mb': [report['before_mb'].sum()],
+                          'after_mb': [report['after_mb'].sum()]})
+    report = pd.concat([report, total], ignore_index=True)
+    report['saved'] = 1 - report['after_mb'] / report['before_mb']
+    return report
+
+
+def main(argv=None):
+    from synthetic import generate_dataset
+
+    parser = argparse.ArgumentParser(description='Report per-table memory of the compact layout')
+    parser.add_argument('--influencers', type=int, default=200000)
+    args = parser.parse_args(argv)
+
+    tables = generate_dataset(args.influencers)
+    report = memory_report(tables, compact_tables(tables))
+    print(report.to_string(index=False, float_format=lambda x: f'{x:,.2f}'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,198 @@
+"""Shared read-only data store backed by memory-mapped Arrow files.
+
+``build_store`` writes the four tables and their cubes once as uncompressed
+Arrow IPC files; ``open_store`` memory-maps them and hands out pandas frames
+whose numeric columns are zero-copy views of the mapped pages. Every session
+and every server process opening the same store shares one copy of the data
+through the OS page cache, and opening it costs no parsing or aggregation.
+
+The manifest records a fingerprint of the source (content digests of the data
+files or the synthetic parameters, plus the store and code versions); a store
+whose fingerprint no longer matches is rebuilt. A build writes into a private
+temporary directory and renames it into place, so concurrent builders never
+share a file and readers only ever see a complete store.
+
+    python -m store build store/ --influencers 200000
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+from cube import DataCube, build_post_cube, build_tracking_cube
+from dateindex import sort_by_date
+from ingest import DASHBOARD_COLUMNS, TABLE_NAMES, table_path
+from resultcache import source_fingerprint
+
+CUBE_NAMES = ['tracking_cube', 'post_cube']
+MANIFEST = 'manifest.json'
+# Bumped when the layout of stored frames changes
+STORE_VERSION = 2
+# Opening a store that a rebuild is swapping out is retried this many times, waiting OPEN_BACKOFF
+# seconds before the first retry and twice as long before each next one (about 0.6s in all)
+OPEN_ATTEMPTS = 7
+OPEN_BACKOFF = 0.01
+
+
+def _arrow_path(store_dir, name):
+    return os.path.join(store_dir, f'{name}.arrow')
+
+
+def _write_arrow(df, path):
+    """Write a frame as an uncompressed Arrow IPC file"""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    with pa.OSFile(path, 'wb') as sink:
+        with ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+def _map_arrow(path):
+    """Frame over a memory-mapped Arrow IPC file; numeric columns are zero-copy and read-only"""
+    table = ipc.open_file(pa.memory_map(path, 'r')).read_all()
+    return table.to_pandas(split_blocks=True)
+
+
+def store_frames(tables):
+    """The four tables, event tables date-sorted, plus their date-sorted cubes, by name"""
+    frames = dict(zip(TABLE_NAMES, tables))
+    # Event tables are stored date-sorted so opening them never needs a sorted copy
+    frames['posts'] = sort_by_date(frames['posts'])
+    frames['tracking_data'] = sort_by_date(frames['tracking_data'])
+    frames['tracking_cube'] = sort_by_date(build_tracking_cube(frames['tracking_data']))
+    frames['post_cube'] = sort_by_date(build_post_cube(frames['posts']))
+    return frames
+
+
+def dataset_source(data_dir=None, n_influencers=2000):
+    """(source, paths) identifying the dataset: the ingest files and columns, or the synthetic parameters"""
+    if data_dir:
+        return ('files', sorted(DASHBOARD_COLUMNS.items())), [table_path(data_dir, table) for table in TABLE_NAMES]
+    return ('synthetic', n_influencers, 42), []
+
+
+def store_fingerprint(data_dir=None, n_influencers=2000, digests=None):
+    """Fingerprint a store built from the dataset must carry; ``digests`` memoizes file digests in place"""
+    source, paths = dataset_source(data_dir, n_influencers)
+    return source_fingerprint(('store', STORE_VERSION, source), paths, digests)
+
+
+def read_manifest(store_dir):
+    """Manifest of a complete store, or None"""
+    try:
+        with open(os.path.join(store_dir, MANIFEST)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _publish(build_dir, store_dir):
+    """Rename a finished build directory to store_dir, moving any previous store aside first"""
+    old_dir = f'{build_dir}.old'
+    try:
+        os.rename(store_dir, old_dir)
+    except FileNotFoundError:
+        pass
+    try:
+        os.rename(build_dir, store_dir)
+    except OSError:
+        # Another builder published between the two renames; its store is as new as this one
+        shutil.rmtree(build_dir, ignore_errors=True)
+    # Processes still mapping the old files keep their pages until they unmap them
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+
+def build_store(store_dir, tables, fingerprint=None, digests=None):
+    """Write the four tables and their date-sorted cubes to store_dir, replacing any store there
+
+    ``fingerprint`` (from ``store_fingerprint``) and the file ``digests`` it
+    was computed with are recorded in the manifest.
+    """
+    store_dir = os.path.abspath(store_dir)
+    parent = os.path.dirname(store_dir)
+    os.makedirs(parent, exist_ok=True)
+    build_dir = tempfile.mkdtemp(prefix=f'.{os.path.basename(store_dir)}.', dir=parent)
+    try:
+        frames = store_frames(tables)
+        for name, df in frames.items():
+            _write_arrow(df, _arrow_path(build_dir, name))
+        manifest = {'created': time.time(), 'version': STORE_VERSION, 'fingerprint': fingerprint,
+                    'digests': digests or {}, 'rows': {name: len(df) for name, df in frames.items()}}
+        with open(os.path.join(build_dir, MANIFEST), 'w') as f:
+            json.dump(manifest, f, indent=2)
+    except BaseException:
+        shutil.rmtree(build_dir, ignore_errors=True)
+        raise
+    _publish(build_dir, store_dir)
+
+
+def ensure_store(store_dir, load, data_dir=None, n_influencers=2000):
+    """Manifest of the store for the dataset, (re)building it from ``load()`` when missing or stale"""
+    manifest = read_manifest(store_dir)
+    # Digests recorded by the last build spare rehashing unchanged source files
+    digests = dict(manifest.get('digests', {})) if manifest else {}
+    fingerprint = store_fingerprint(data_dir, n_influencers, digests)
+    if manifest is None or manifest.get('fingerprint') != fingerprint:
+        build_store(store_dir, load(), fingerprint, digests)
+    return fingerprint
+
+
+class SharedStore:
+    """Memory-mapped tables and cubes of one store directory"""
+
+    def __init__(self, store_dir):
+        self.store_dir = store_dir
+        # A rebuild swapping the directory in leaves it missing, or the old files deleted, for a moment;
+        # read it again once the new one has been renamed into place
+        for attempt in range(OPEN_ATTEMPTS):
+            try:
+                with open(os.path.join(store_dir, MANIFEST)) as f:
+                    self.manifest = json.load(f)
+                self.frames = {name: _map_arrow(_arrow_path(store_dir, name)) for name in TABLE_NAMES + CUBE_NAMES}
+                break
+            except FileNotFoundError:
+                if attempt == OPEN_ATTEMPTS - 1:
+                    raise
+                time.sleep(OPEN_BACKOFF * 2 ** attempt)
+
+    @property
+    def tables(self):
+        """Influencers, posts, tracking and payouts"""
+        return tuple(self.frames[name] for name in TABLE_NAMES)
+
+    def cube(self):
+        """DataCube over the stored, already date-sorted cubes"""
+        return DataCube(self.frames['tracking_cube'], self.frames['post_cube'])
+
+
+def open_store(store_dir):
+    return SharedStore(store_dir)
+
+
+def main(argv=None):
+    from schema import compact_tables
+    from synthetic import generate_dataset
+
+    parser = argparse.ArgumentParser(description='Build a shared memory-mapped data store')
+    parser.add_argument('command', choices=['build'])
+    parser.add_argument('store_dir')
+    parser.add_argument('--data-dir', help='load tables from this ingest directory instead of generating them')
+    parser.add_argument('--influencers', type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    if args.data_dir:
+        from ingest import load_tables
+        tables = load_tables(args.data_dir, DASHBOARD_COLUMNS)
+    else:
+        tables = generate_dataset(args.influencers)
+    digests = {}
+    fingerprint = store_fingerprint(args.data_dir, args.influencers, digests)
+    build_store(args.store_dir, compact_tables(tables), fingerprint, digests)
+
+
+if __name__ == '__main__':
+    main()
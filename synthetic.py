@@ -0,0 +1,268 @@
+"""Vectorized synthetic data engine for the influencer ROI dashboard.
+
+Every table is drawn with array operations from a single ``np.random.Generator``,
+so generation is linear in the number of rows and deterministic per seed.
+The schemas and distributions match the original per-row generators.
+
+At the default 1-5 posts per influencer, 1M influencers yield about 3M posts
+and 1.05M tracking rows (about 5s on one core); ``posts_per_influencer_range
+=(3, 7)`` gives the 5M posts of the load-test target (about 8s).
+"""
+import numpy as np
+import pandas as pd
+
+# --- REFERENCE DATA ---
+FIRST_NAMES_MALE = ['Aarav', 'Rohan', 'Vikram', 'Karan', 'Arjun', 'Rahul', 'Amit', 'Suresh', 'Raj', 'Dev',
+                    'Akash', 'Nikhil', 'Siddharth', 'Varun', 'Aditya', 'Ishaan', 'Kabir', 'Yash', 'Harsh', 'Ravi']
+FIRST_NAMES_FEMALE = ['Priya', 'Sneha', 'Ananya', 'Kavya', 'Riya', 'Shreya', 'Pooja', 'Neha', 'Divya', 'Sanya',
+                      'Isha', 'Tanya', 'Meera', 'Aditi', 'Nisha', 'Simran', 'Kriti', 'Swati', 'Payal', 'Deepika']
+LAST_NAMES = ['Sharma', 'Patel', 'Das', 'Reddy', 'Singh', 'Gupta', 'Malhotra', 'Agarwal', 'Jain', 'Kumar',
+              'Verma', 'Shah', 'Chopra', 'Sinha', 'Mishra', 'Yadav', 'Pandey', 'Nair', 'Iyer', 'Kapoor']
+
+GENDERS = ['Male', 'Female']
+CATEGORIES = ['Fitness', 'Wellness', 'Bodybuilding', 'Yoga', 'Nutrition', 'Lifestyle', 'Sports', 'Health', 'Beauty', 'Diet']
+PLATFORMS = ['Instagram', 'YouTube', 'Twitter', 'TikTok', 'Facebook']
+BRANDS = ['MuscleBlaze', 'HKVitals', 'Gritzo', 'TrueBasics', 'NutraBay']
+CAMPAIGNS = ['DiwaliSale23', 'WinterBulkUp23', 'NewYearFitness24', 'SummerShred23', 'FestiveFit23']
+CAPTIONS = [
+    'Loving my new {} protein!',
+    'My daily {} routine',
+    '{} for the win!',
+    'Perfect workout fuel with {}',
+    'Unboxing {} supplements',
+    'Quick thoughts on {} nutrition',
+    'Fueling my workouts with {}',
+    '{} keeps me energized',
+    'Amazing results with {}',
+    'Check out this {} product!'
+]
+PRODUCTS = {
+    'MuscleBlaze': ['Whey Protein', 'Creatine', 'Pre-Workout', 'BCAA', 'Mass Gainer'],
+    'HKVitals': ['Multivitamin', 'Biotin', 'Omega-3', 'Vitamin D', 'Iron'],
+    'Gritzo': ['SuperMilk', 'Protein Bars', 'Kids Nutrition', 'Immunity Booster', 'Growth Mix'],
+    'TrueBasics': ['Collagen', 'Probiotics', 'Ashwagandha', 'Turmeric', 'Green Tea'],
+    'NutraBay': ['Protein Powder', 'Fat Burner', 'Testosterone Booster', 'Joint Support', 'Recovery']
+}
+
+# Lognormal (mean, sigma) of follower counts per platform
+FOLLOWER_LOGNORMAL = {
+    'Instagram': (13.5, 1.2),  # Higher for Instagram
+    'YouTube': (12.8, 1.3),
+    'TikTok': (13.2, 1.4),
+}
+DEFAULT_FOLLOWER_LOGNORMAL = (12.5, 1.1)
+MIN_FOLLOWERS = 10000
+MAX_FOLLOWERS = 10000000
+
+# Per-post payout tiers as (follower threshold, low rate, high rate), checked top-down
+POST_RATE_TIERS = [
+    (2000000, 80000, 150000),
+    (1000000, 40000, 80000),
+    (500000, 15000, 40000),
+    (0, 5000, 15000),
+]
+
+START_DATE = np.datetime64('2023-08-01')
+END_DATE = np.datetime64('2023-12-31')
+
+# Share of influencers that are eligible for conversions (1500 of the default 2000)
+CONVERTING_SHARE = 0.75
+
+
+def _lookup(values):
+    """Object array for fancy-indexing string tables"""
+    return np.array(values, dtype=object)
+
+
+def _random_dates(rng, size):
+    """Uniform random dates between START_DATE and END_DATE inclusive"""
+    days = rng.integers(0, (END_DATE - START_DATE).astype(int) + 1, size)
+    return (START_DATE + days).astype('datetime64[ns]')
+
+
+def generate_influencers(n, rng):
+    """Generate realistic influencer data"""
+    gender_idx = rng.integers(0, len(GENDERS), n)
+    first_idx = rng.integers(0, len(FIRST_NAMES_MALE), n)
+    last_idx = rng.integers(0, len(LAST_NAMES), n)
+    platform_idx = rng.integers(0, len(PLATFORMS), n)
+    category_idx = rng.integers(0, len(CATEGORIES), n)
+
+    # Every (gender, first, last) combination is precomputed so names are a single gather
+    first_names = FIRST_NAMES_MALE + FIRST_NAMES_FEMALE
+    names = _lookup([f"{first} {last}" for first in first_names for last in LAST_NAMES])
+    name_idx = (gender_idx * len(FIRST_NAMES_MALE) + first_idx) * len(LAST_NAMES) + last_idx
+
+    # Follower counts correlate with platform
+    params = np.array([FOLLOWER_LOGNORMAL.get(p, DEFAULT_FOLLOWER_LOGNORMAL) for p in PLATFORMS])
+    follower_count = rng.lognormal(params[platform_idx, 0], params[platform_idx, 1]).astype(np.int64)
+    follower_count = np.clip(follower_count, MIN_FOLLOWERS, MAX_FOLLOWERS)  # Reasonable bounds
+
+    return pd.DataFrame({
+        'id': np.arange(1, n + 1, dtype=np.int64),
+        'name': names[name_idx],
+        'category': _lookup(CATEGORIES)[category_idx],
+        'gender': _lookup(GENDERS)[gender_idx],
+        'follower_count': follower_count,
+        'platform': _lookup(PLATFORMS)[platform_idx]
+    })
+
+
+def generate_posts(influencers_df, rng, posts_per_influencer_range=(1, 5)):
+    """Generate posts data"""
+    low, high = posts_per_influencer_range
+    num_posts = rng.integers(low, high + 1, len(influencers_df))
+    owner = np.repeat(np.arange(len(influencers_df)), num_posts)
+    n = len(owner)
+
+    brand_idx = rng.integers(0, len(BRANDS), n)
+    caption_idx = rng.integers(0, len(CAPTIONS), n)
+    captions = _lookup([caption.format(brand) for caption in CAPTIONS for brand in BRANDS])
+
+    # Realistic engagement based on follower count
+    followers = influencers_df['follower_count'].to_numpy(dtype=np.float64)[owner]
+    base_reach = np.minimum(followers * rng.uniform(0.1, 0.8, n), followers)
+    reach = (base_reach * rng.uniform(0.5, 1.5, n)).astype(np.int64)
+
+    engagement_rate = rng.uniform(0.01, 0.15, n)  # 1-15% engagement
+    total_engagement = (reach * engagement_rate).astype(np.int64)
+    likes = (total_engagement * rng.uniform(0.7, 0.9, n)).astype(np.int64)
+    comments = total_engagement - likes
+
+    post_id = np.arange(1, n + 1, dtype=np.int64)
+    platform_code, platforms = pd.factorize(influencers_df['platform'])
+    platform_code = platform_code[owner]
+    url_prefix = _lookup([f'http://{p.lower()}.com/p' for p in platforms])[platform_code]
+    url = list(map(str.__add__, url_prefix, map(str, post_id.tolist())))
+
+    return pd.DataFrame({
+        'post_id': post_id,
+        'influencer_id': influencers_df['id'].to_numpy()[owner],
+        'platform': _lookup(platforms)[platform_code],
+        'date': _random_dates(rng, n),
+        'url': url,
+        'caption': captions[caption_idx * len(BRANDS) + brand_idx],
+        'reach': reach,
+        'likes': likes,
+        'comments': comments
+    })
+
+
+# --- LOOKUP INDEXES ---
+# Built once per dataset with hash-based groupby/set_index so the generators
+# resolve per-row influencer attributes with a single O(rows) reindex.
+def build_follower_index(influencers_df):
+    """Follower count indexed by influencer id"""
+    return influencers_df.set_index('id')['follower_count']
+
+
+def build_mean_reach_index(posts_df):
+    """Mean post reach indexed by influencer id"""
+    return posts_df.groupby('influencer_id')['reach'].mean()
+
+
+def build_order_sum_index(tracking_df):
+    """Total tracked orders indexed by influencer id"""
+    return tracking_df.groupby('influencer_id')['orders'].sum()
+
+
+def _average_order_value_bounds(products):
+    """Revenue per order varies by product type"""
+    is_protein = np.array(['Protein' in p or 'Mass Gainer' in p for p in products])
+    is_vitamin = np.array(['Vitamin' in p or 'Biotin' in p for p in products])
+    low = np.select([is_protein, is_vitamin], [1500, 500], 800)
+    high = np.select([is_protein, is_vitamin], [4000, 1500], 2500)
+    return low, high
+
+
+def generate_tracking(influencers_df, posts_df, rng, converting_share=CONVERTING_SHARE,
+                      follower_index=None, mean_reach_index=None):
+    """Generate tracking/conversion data"""
+    if follower_index is None:
+        follower_index = build_follower_index(influencers_df)
+    if mean_reach_index is None:
+        mean_reach_index = build_mean_reach_index(posts_df)
+
+    # Subset of influencers eligible for conversions, 70% of which actually convert
+    ids = influencers_df['id'].to_numpy()
+    eligible = rng.choice(ids, size=min(len(ids), int(round(len(ids) * converting_share))), replace=False)
+    converting = eligible[rng.random(len(eligible)) < 0.7]
+    influencer_id = np.repeat(converting, rng.integers(1, 4, len(converting)))
+    n = len(influencer_id)
+
+    brand_idx = rng.integers(0, len(BRANDS), n)
+    product_idx = rng.integers(0, len(PRODUCTS[BRANDS[0]]), n)
+    campaign_idx = rng.integers(0, len(CAMPAIGNS), n)
+    product_names = [f"{brand} {product}" for brand in BRANDS for product in PRODUCTS[brand]]
+    product_code = brand_idx * len(PRODUCTS[BRANDS[0]]) + product_idx
+
+    # Base conversion rate based on follower count (smaller influencers often have better conversion)
+    follower_count = follower_index.reindex(influencer_id).to_numpy(dtype=np.float64)
+    base_conversion_rate = np.maximum(0.001, 0.01 - (follower_count / 10000000) * 0.005)
+    actual_conversion_rate = base_conversion_rate * rng.uniform(0.5, 2.0, n)
+
+    # Estimate reach from posts, falling back to 30% of followers
+    avg_reach = mean_reach_index.reindex(influencer_id).to_numpy(dtype=np.float64)
+    avg_reach = np.where(np.isnan(avg_reach), follower_count * 0.3, avg_reach)
+
+    orders = np.maximum(1, (avg_reach * actual_conversion_rate).astype(np.int64))
+    aov_low, aov_high = _average_order_value_bounds(product_names)
+    avg_order_value = rng.integers(aov_low[product_code], aov_high[product_code] + 1)
+
+    return pd.DataFrame({
+        'tracking_id': np.arange(1, n + 1, dtype=np.int64),
+        'source': 'influencer',
+        'campaign': _lookup(CAMPAIGNS)[campaign_idx],
+        'influencer_id': influencer_id,
+        'product': _lookup(product_names)[product_code],
+        'brand': _lookup(BRANDS)[brand_idx],
+        'date': _random_dates(rng, n),
+        'orders': orders,
+        'revenue': orders * avg_order_value
+    })
+
+
+def generate_payouts(influencers_df, tracking_df, rng, order_sum_index=None):
+    """Generate payout data"""
+    if order_sum_index is None:
+        order_sum_index = build_order_sum_index(tracking_df)
+
+    # Not all influencers will have payouts
+    paid = influencers_df[rng.random(len(influencers_df)) < 0.75]
+    n = len(paid)
+    is_post = rng.random(n) < 0.5
+
+    # Fixed rate per post based on follower count
+    follower_count = paid['follower_count'].to_numpy()
+    tier = np.select([follower_count > threshold for threshold, _, _ in POST_RATE_TIERS],
+                     np.arange(len(POST_RATE_TIERS)), len(POST_RATE_TIERS) - 1)
+    tier_low = np.array([low for _, low, _ in POST_RATE_TIERS])
+    tier_high = np.array([high for _, _, high in POST_RATE_TIERS])
+    post_rate = rng.integers(tier_low[tier], tier_high[tier] + 1)
+    num_posts = rng.integers(1, 4, n)  # Estimate number of posts (simplified)
+
+    # Per order commission on the influencer's actual orders
+    order_rate = rng.integers(50, 201, n)
+    orders = order_sum_index.reindex(paid['id'], fill_value=0).to_numpy()
+    fallback_orders = rng.integers(10, 101, n)
+    orders = np.where(orders == 0, fallback_orders, orders)
+
+    rate = np.where(is_post, post_rate, order_rate)
+    return pd.DataFrame({
+        'payout_id': np.arange(1, n + 1, dtype=np.int64),
+        'influencer_id': paid['id'].to_numpy(),
+        'basis': np.where(is_post, 'post', 'order').astype(object),
+        'rate': rate,
+        'orders': np.where(is_post, np.nan, orders),
+        'total_payout': np.where(is_post, post_rate * num_posts, order_rate * orders)
+    })
+
+
+def generate_dataset(n_influencers=2000, seed=42, posts_per_influencer_range=(1, 5)):
+    """Generate influencers, posts, tracking and payouts from one seeded generator"""
+    rng = np.random.default_rng(seed)
+    influencers_df = generate_influencers(n_influencers, rng)
+    posts_df = generate_posts(influencers_df, rng, posts_per_influencer_range)
+    tracking_df = generate_tracking(influencers_df, posts_df, rng)
+    payouts_df = generate_payouts(influencers_df, tracking_df, rng)
+    return influencers_df, posts_df, tracking_df, payouts_df
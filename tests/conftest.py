@@ -0,0 +1,14 @@
+import os
+import sys
+
+# The modules live at the repository root, next to app.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from engine import load_dataset
+
+
+@pytest.fixture(scope='session')
+def tables():
+    return load_dataset(None, 2000)
@@ -0,0 +1,153 @@
+"""Budget allocation must be the sorted greedy optimum without group caps and respect every constraint."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from allocation import CANDIDATE_COLUMNS, allocate_budget
+from pipeline import FilterPipeline
+from test_append import FILTER_SETS
+
+PLATFORMS = ['Instagram', 'YouTube', 'Twitter']
+CATEGORIES = ['Fitness', 'Food', 'Tech', 'Travel']
+
+
+def random_candidates(n, seed, tied=False):
+    rng = np.random.default_rng(seed)
+    roas = rng.integers(1, 4, n).astype(np.float64) if tied else rng.uniform(0.5, 50, n)
+    candidates = pd.DataFrame({
+        'id': np.arange(1, n + 1),
+        'name': [f'influencer {i}' for i in range(n)],
+        'platform': rng.choice(PLATFORMS, n),
+        'category': rng.choice(CATEGORIES, n),
+        'basis': rng.choice(['post', 'order'], n),
+        'follower_count': rng.integers(1000, 1000000, n),
+        'total_payout': rng.uniform(100, 5000, n),
+        'roas': roas,
+        'cpm': rng.uniform(1, 100, n),
+        'conversion_rate': rng.uniform(0, 5, n),
+    })[CANDIDATE_COLUMNS]
+    # Best ROAS first, as candidate_frame orders them
+    return candidates.iloc[np.argsort(-roas, kind='stable')].reset_index(drop=True)
+
+
+def reference_spend(candidates, budget, max_influencers=None, min_influencers=0, max_scale=1.0):
+    """Spend per candidate from booking one at a time in ROAS order until the budget or the count runs out"""
+    spend = np.zeros(len(candidates))
+    remaining, booked = float(budget), 0
+    for i, (payout, roas) in enumerate(zip(candidates['total_payout'], candidates['roas'])):
+        if remaining <= 0 or (max_influencers is not None and booked >= max_influencers):
+            break
+        cap = payout * max_scale
+        if min_influencers > 0:
+            cap = min(cap, budget / min_influencers)
+        if cap > 0 and roas > 0:
+            spend[i] = min(cap, remaining)
+            remaining -= spend[i]
+            booked += 1
+    return spend
+
+
+def brute_force_revenue(candidates, budget):
+    """Best expected revenue over every subset booked in full plus at most one more booked in part
+
+    A fractional knapsack optimum books at most one item in part, so this is
+    the exact optimum.
+    """
+    payout, roas = candidates['total_payout'].to_numpy(), candidates['roas'].to_numpy()
+    best = 0.0
+    for mask in range(1 << len(candidates)):
+        chosen = (mask >> np.arange(len(candidates))) & 1 == 1
+        left = budget - payout[chosen].sum()
+        if left < 0:
+            continue
+        partial = np.minimum(payout[~chosen], left) * roas[~chosen]
+        best = max(best, (payout[chosen] * roas[chosen]).sum() + partial.max(initial=0.0))
+    return best
+
+
+def plan_spend(plan, candidates):
+    return plan.set_index('id')['spend'].reindex(candidates['id'], fill_value=0.0).to_numpy()
+
+
+@pytest.mark.parametrize('seed', range(6))
+@pytest.mark.parametrize('max_influencers', [None, 0, 1, 3])
+def test_matches_sorted_greedy_without_group_caps(seed, max_influencers):
+    candidates = random_candidates(12, seed, tied=seed % 2 == 1)
+    budget = candidates['total_payout'].sum() * 0.4
+    plan, summary = allocate_budget(candidates, budget, max_influencers=max_influencers)
+    expected = reference_spend(candidates, budget, max_influencers)
+    np.testing.assert_allclose(plan_spend(plan, candidates), expected, rtol=1e-9, atol=1e-6)
+    assert summary['expected_revenue'] == pytest.approx((expected * candidates['roas']).sum(), rel=1e-9)
+
+
+@pytest.mark.parametrize('seed', range(4))
+def test_min_influencers_spread_matches_sorted_greedy(seed):
+    candidates = random_candidates(12, seed)
+    budget = candidates['total_payout'].sum() * 0.3
+    plan, summary = allocate_budget(candidates, budget, min_influencers=8, max_scale=2.0)
+    expected = reference_spend(candidates, budget, min_influencers=8, max_scale=2.0)
+    np.testing.assert_allclose(plan_spend(plan, candidates), expected, rtol=1e-9, atol=1e-6)
+    assert summary['min_shortfall'] == max(8 - len(plan), 0)
+
+
+@pytest.mark.parametrize('seed', range(4))
+def test_greedy_is_optimal_without_group_caps(seed):
+    candidates = random_candidates(8, seed)
+    for share in [0.2, 0.5, 0.9]:
+        budget = candidates['total_payout'].sum() * share
+        _, summary = allocate_budget(candidates, budget)
+        assert summary['expected_revenue'] >= brute_force_revenue(candidates, budget) * (1 - 1e-9)
+
+
+@pytest.mark.parametrize('seed', range(8))
+def test_constraints_are_respected(seed):
+    rng = np.random.default_rng(100 + seed)
+    candidates = random_candidates(60, seed)
+    budget = candidates['total_payout'].sum() * rng.uniform(0.1, 0.8)
+    platform_caps = {platform: rng.uniform(0.1, 0.6) for platform in PLATFORMS[:2]}
+    category_caps = rng.uniform(0.2, 0.5)
+    max_influencers, min_influencers, max_scale = int(rng.integers(5, 40)), int(rng.integers(0, 20)), 1.5
+    plan, summary = allocate_budget(candidates, budget, platform_caps, category_caps, min_influencers,
+                                    max_influencers, max_scale)
+    tol = 1e-6 * budget
+    assert summary['spend'] <= budget + tol
+    assert len(plan) == summary['influencers'] <= max_influencers
+    assert (plan['spend'] > 0).all()
+    assert (plan['weight'] <= max_scale + 1e-9).all()
+    if min_influencers:
+        assert (plan['spend'] <= budget / min_influencers + tol).all()
+    for platform, spend in plan.groupby('platform')['spend'].sum().items():
+        assert spend <= platform_caps.get(platform, np.inf) * budget + tol
+    assert (plan.groupby('category')['spend'].sum() <= category_caps * budget + tol).all()
+    assert plan['roas'].is_monotonic_decreasing
+
+
+def test_count_limit_reached_by_a_partial_booking_is_binding():
+    candidates = random_candidates(3, 0)
+    candidates['total_payout'] = 10.0
+    candidates['platform'] = ['Instagram', 'Instagram', 'YouTube']
+    # Instagram's cap admits the first candidate and half of the second, which uses up the count
+    plan, summary = allocate_budget(candidates, 100, platform_caps={'Instagram': 0.15}, max_influencers=2)
+    assert plan['spend'].tolist() == pytest.approx([10, 5])
+    assert summary['binding'] == ['max_influencers', 'platform_cap']
+
+
+def test_zero_count_limit_is_binding():
+    plan, summary = allocate_budget(random_candidates(5, 0), 1000, max_influencers=0)
+    assert plan.empty
+    assert summary['binding'] == ['max_influencers']
+
+
+def test_budget_binds_when_it_runs_out_first():
+    candidates = random_candidates(5, 0)
+    _, summary = allocate_budget(candidates, candidates['total_payout'].sum() / 2)
+    assert summary['binding'] == ['budget']
+
+
+def test_pipeline_plan_respects_its_constraints(tables):
+    pipeline = FilterPipeline(*tables)
+    budget = 2000000
+    plan, summary = pipeline.allocate(budget, *FILTER_SETS[0], platform_caps=0.4, max_influencers=50)
+    assert 0 < summary['spend'] <= budget * (1 + 1e-9)
+    assert len(plan) <= 50
+    assert (plan.groupby('platform')['spend'].sum() <= 0.4 * budget * (1 + 1e-9)).all()
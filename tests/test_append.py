@@ -0,0 +1,76 @@
+"""Incremental appends must match a full process_data recompute over the appended tables."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from pipeline import POST_BATCH_COLUMNS, TRACKING_BATCH_COLUMNS, FilterPipeline, process_data
+
+FILTER_SETS = [
+    ('All', 'All', 'All', 'All', None, 0, 10000000),
+    ('MuscleBlaze', 'All', 'All', 'All', None, 0, 10000000),
+    ('All', 'Instagram', 'All', 'Fitness', None, 0, 10000000),
+    ('All', 'All', 'All', 'All', (pd.Timestamp('2023-09-01'), pd.Timestamp('2023-11-30')), 0, 10000000),
+    ('All', 'All', 'All', 'All', None, 50000, 2000000),
+]
+
+
+def tracking_batch(tables, n, seed, revenue_dtype):
+    rng = np.random.default_rng(seed)
+    batch = tables[2].sample(n, random_state=seed)[TRACKING_BATCH_COLUMNS].reset_index(drop=True)
+    batch['orders'] = rng.integers(1, 5, n)
+    batch['revenue'] = (batch['orders'] * rng.integers(300, 3000, n)).astype(revenue_dtype)
+    return batch
+
+
+def posts_batch(tables, n, seed):
+    batch = tables[1].sample(n, random_state=seed)[POST_BATCH_COLUMNS].reset_index(drop=True)
+    batch['post_id'] = tables[1]['post_id'].max() + 1 + np.arange(n)
+    return batch
+
+
+def assert_matches_recompute(pipeline, tables):
+    # Order-based payouts grow with appended orders, so the pipeline's payouts are the reference's
+    for filters in FILTER_SETS:
+        expected = process_data(tables[0], pipeline.posts_df, pipeline.tracking_data_df, pipeline.payouts_df,
+                                *filters).reset_index(drop=True)
+        pd.testing.assert_frame_equal(pipeline.process(*filters), expected, check_dtype=False, rtol=1e-9)
+
+
+def primed_pipeline(tables):
+    pipeline = FilterPipeline(*tables)
+    for filters in FILTER_SETS:
+        pipeline.process(*filters)
+    return pipeline
+
+
+@pytest.mark.parametrize('revenue_dtype', ['int64', 'float64'])
+def test_append_matches_recompute(tables, revenue_dtype):
+    pipeline = primed_pipeline(tables)
+    pipeline.append(tracking_batch(tables, 500, 1, revenue_dtype), posts_batch(tables, 300, 2))
+    pipeline.append(tracking_batch(tables, 200, 3, revenue_dtype))
+    assert pipeline.version == 2
+    assert_matches_recompute(pipeline, tables)
+
+
+def test_decimal_revenue_on_float_table(tables):
+    float_tables = (tables[0], tables[1], tables[2].astype({'revenue': 'float64'}), tables[3])
+    pipeline = primed_pipeline(float_tables)
+    batch = tracking_batch(float_tables, 300, 4, 'float64')
+    batch['revenue'] += 0.45
+    pipeline.append(batch)
+    assert_matches_recompute(pipeline, float_tables)
+
+
+def test_rejected_batch_leaves_pipeline_unchanged(tables):
+    pipeline = primed_pipeline(tables)
+    before = {filters: pipeline.process(*filters).copy() for filters in FILTER_SETS}
+    tracking_rows = len(pipeline.tracking_data_df)
+    batch = tracking_batch(tables, 10, 5, 'float64')
+    batch.loc[0, 'revenue'] = 123.45
+
+    with pytest.raises(ValueError, match='whole numbers'):
+        pipeline.append(batch)
+    assert pipeline.version == 0
+    assert len(pipeline.tracking_data_df) == tracking_rows
+    for filters, df in before.items():
+        pd.testing.assert_frame_equal(pipeline.process(*filters), df)
@@ -0,0 +1,63 @@
+"""Every query backend must return the process_data frame, before and after appends."""
+import gc
+import importlib.util
+from multiprocessing import shared_memory
+
+import pandas as pd
+import pytest
+
+import parallel
+from pipeline import FilterPipeline, process_data
+from sqlbackend import create_backend
+from test_append import FILTER_SETS, posts_batch, tracking_batch
+
+
+@pytest.fixture(params=[
+    pytest.param('duckdb', marks=pytest.mark.skipif(importlib.util.find_spec('duckdb') is None,
+                                                    reason='duckdb is not installed')),
+    'parallel',
+])
+def backend_pipeline(request, tables):
+    backend = create_backend(request.param, tables, workers=2)
+    yield FilterPipeline(*tables, backend=backend)
+    backend.close()
+
+
+def assert_matches_pandas(pipeline):
+    for filters in FILTER_SETS:
+        expected = process_data(pipeline.influencers_df, pipeline.posts_df, pipeline.tracking_data_df,
+                                pipeline.payouts_df, *filters).reset_index(drop=True)
+        pd.testing.assert_frame_equal(pipeline.process(*filters).reset_index(drop=True), expected,
+                                      check_dtype=False, rtol=1e-9)
+
+
+def test_backend_matches_pandas(backend_pipeline):
+    assert_matches_pandas(backend_pipeline)
+
+
+def test_backend_matches_pandas_after_append(backend_pipeline, tables):
+    assert_matches_pandas(backend_pipeline)
+    backend_pipeline.append(tracking_batch(tables, 500, 1, 'int64'), posts_batch(tables, 300, 2))
+    assert_matches_pandas(backend_pipeline)
+
+
+def attached_blocks(_):
+    return set(parallel._attached)
+
+
+def test_workers_unmap_replaced_blocks(tables):
+    with create_backend('parallel', tables, workers=1) as backend:
+        pipeline = FilterPipeline(*tables, backend=backend)
+        pipeline.process(*FILTER_SETS[0])
+        pipeline.append(tracking_batch(tables, 500, 1, 'int64'), posts_batch(tables, 300, 2))
+        pipeline.process(*FILTER_SETS[0])
+        assert backend.pool.submit(attached_blocks, None).result() <= backend._live
+
+
+def test_discarded_executor_frees_its_blocks(tables):
+    backend = create_backend('parallel', tables, workers=1)
+    name = backend.tables['posts'].block_names()[0]
+    del backend
+    gc.collect()
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=name)
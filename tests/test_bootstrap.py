@@ -0,0 +1,103 @@
+"""Bootstrap ROAS intervals: seeded, centred on the summed ratios, and NaN only where there is no spend."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from bootstrap import SUBSET_ROWS, roas_intervals
+
+BASELINE = 3.0
+
+
+def roster(n, seed):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'platform': rng.choice(['Instagram', 'YouTube', 'Twitter'], n),
+        'category': rng.choice(['Fitness', 'Food', 'Tech'], n),
+        'total_revenue': rng.lognormal(8, 1.5, n),
+        'total_payout': rng.uniform(100, 5000, n),
+    })
+
+
+def summed_ratios(df):
+    """(dimension, value) -> (ROAS from summed revenue and payout, influencers), 'overall' included"""
+    expected = {('overall', 'All'): (df['total_revenue'].sum() / df['total_payout'].sum(), len(df))}
+    for dim in ['platform', 'category']:
+        for value, group in df.groupby(dim):
+            expected[(dim, value)] = (group['total_revenue'].sum() / group['total_payout'].sum(), len(group))
+    return expected
+
+
+def bootstrap_interval(df, replicates, seed, confidence=0.95):
+    """Overall ROAS interval from resampling whole rows one replicate at a time"""
+    rng = np.random.default_rng(seed)
+    revenue, spend = df['total_revenue'].to_numpy(), df['total_payout'].to_numpy()
+    roas = []
+    for _ in range(replicates):
+        rows = rng.integers(0, len(df), len(df))
+        roas.append(revenue[rows].sum() / spend[rows].sum())
+    alpha = (1 - confidence) / 2
+    return np.quantile(roas, [alpha, 1 - alpha])
+
+
+@pytest.mark.parametrize('n', [500, SUBSET_ROWS * 5])
+def test_same_seed_same_intervals(n):
+    df = roster(n, 1)
+    first = roas_intervals(df, BASELINE, replicates=300, seed=4)
+    pd.testing.assert_frame_equal(first, roas_intervals(df, BASELINE, replicates=300, seed=4))
+    assert not first['low'].equals(roas_intervals(df, BASELINE, replicates=300, seed=5)['low'])
+
+
+@pytest.mark.parametrize('n', [500, SUBSET_ROWS * 5])
+def test_point_estimates_are_summed_ratios(n):
+    df = roster(n, 2)
+    intervals = roas_intervals(df, BASELINE, replicates=200)
+    assert intervals[['dimension', 'value']].iloc[:2].values.tolist() == [['overall', 'All'], ['incremental', 'All']]
+    overall, incremental = intervals.iloc[0], intervals.iloc[1]
+    assert incremental['roas'] == pytest.approx(overall['roas'] - BASELINE)
+    assert incremental['low'] == pytest.approx(overall['low'] - BASELINE)
+    assert incremental['high'] == pytest.approx(overall['high'] - BASELINE)
+    rows = intervals.drop(index=1)
+    actual = {(dim, value): (roas, count) for dim, value, roas, count
+              in zip(rows['dimension'], rows['value'], rows['roas'], rows['influencers'])}
+    expected = summed_ratios(df)
+    assert actual.keys() == expected.keys()
+    for key, (roas, count) in expected.items():
+        assert actual[key][0] == pytest.approx(roas, rel=1e-12)
+        assert actual[key][1] == count
+
+
+@pytest.mark.parametrize('n', [500, SUBSET_ROWS * 5])
+def test_intervals_contain_the_point_estimate(n):
+    intervals = roas_intervals(roster(n, 3), BASELINE, replicates=500)
+    assert (intervals['low'] < intervals['roas']).all()
+    assert (intervals['roas'] < intervals['high']).all()
+    assert intervals['share_above_baseline'].between(0, 1).all()
+
+
+def test_little_bootstraps_match_the_full_bootstrap():
+    df = roster(SUBSET_ROWS * 5, 4)
+    overall = roas_intervals(df, BASELINE, replicates=1000).iloc[0]
+    low, high = bootstrap_interval(df, 1000, seed=9)
+    assert overall['high'] - overall['low'] == pytest.approx(high - low, rel=0.25)
+    assert overall['low'] == pytest.approx(low, rel=0.05)
+    assert overall['high'] == pytest.approx(high, rel=0.05)
+
+
+def test_empty_frame_has_no_intervals():
+    intervals = roas_intervals(roster(0, 5), BASELINE, replicates=100)
+    assert intervals['dimension'].tolist() == ['overall', 'incremental']
+    assert intervals['roas'].tolist() == [0.0, -BASELINE]
+    assert intervals[['low', 'high', 'share_above_baseline']].isna().all().all()
+    assert (intervals['influencers'] == 0).all()
+
+
+def test_segment_without_spend_has_no_interval():
+    df = roster(600, 6)
+    df.loc[df['platform'] == 'Twitter', 'total_payout'] = 0.0
+    intervals = roas_intervals(df, BASELINE, replicates=300).set_index(['dimension', 'value'])
+    twitter = intervals.loc[('platform', 'Twitter')]
+    assert twitter['roas'] == 0.0
+    assert np.isnan(twitter['low']) and np.isnan(twitter['high']) and np.isnan(twitter['share_above_baseline'])
+    # Every other segment still has spend in every replicate
+    others = intervals.drop(index=[('platform', 'Twitter')])
+    assert others[['low', 'high', 'share_above_baseline']].notna().all().all()
@@ -0,0 +1,53 @@
+"""Appended runs of a DateSortedFrame must query and merge like one re-sorted frame."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from dateindex import DateSortedFrame, date_mask, sort_by_date
+
+
+def events(n, seed):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'date': pd.Timestamp('2023-01-01') + pd.to_timedelta(rng.integers(0, 365, n), unit='D'),
+        'brand': rng.choice(['A', 'B', 'C'], n),
+        'value': rng.integers(0, 1000, n),
+    })
+
+
+@pytest.fixture
+def appended():
+    parts = [events(5000, 0)] + [events(n, seed) for seed, n in enumerate([50, 50, 200, 10, 3000, 80], 1)]
+    frame = DateSortedFrame(parts[0], categorical=['brand'])
+    for part in parts[1:]:
+        frame.append(part)
+    return frame, sort_by_date(pd.concat(parts, ignore_index=True))
+
+
+def test_runs_are_merged_logarithmically(appended):
+    frame, expected = appended
+    assert len(frame) == len(expected)
+    assert len(frame._runs) < 7
+
+
+@pytest.mark.parametrize('date_range, brand', [
+    (None, 'All'),
+    ((pd.Timestamp('2023-03-01'), pd.Timestamp('2023-05-31')), 'All'),
+    ((pd.Timestamp('2023-03-01'), pd.Timestamp('2023-05-31')), 'B'),
+])
+def test_between_matches_full_frame(appended, date_range, brand):
+    frame, expected = appended
+    expected = expected[date_mask(expected, date_range)]
+    if brand != 'All':
+        expected = expected[expected['brand'] == brand]
+    actual = frame.between(date_range, brand=brand)
+    pd.testing.assert_frame_equal(actual.sort_values(['date', 'brand', 'value'], ignore_index=True),
+                                  expected.sort_values(['date', 'brand', 'value'], ignore_index=True))
+
+
+def test_frame_merges_runs_in_stable_date_order(appended):
+    frame, expected = appended
+    assert frame.bounds() == (expected['date'].min(), expected['date'].max())
+    assert frame.values('brand') == ['A', 'B', 'C']
+    pd.testing.assert_frame_equal(frame.frame, expected)
+    assert len(frame._runs) == 1
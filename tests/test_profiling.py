@@ -0,0 +1,35 @@
+"""Tracers time spans per session and share one process-wide tracemalloc session."""
+import threading
+import tracemalloc
+
+from profiling import Tracer, chrome_trace, span
+
+
+def test_wall_time_tracer_leaves_tracemalloc_off():
+    with Tracer('rerun').activate() as tracer, span('stage'):
+        assert not tracemalloc.is_tracing()
+    assert [s['name'] for s in tracer.spans] == ['stage']
+    assert tracer.spans[0]['peak_kb'] is None
+    assert chrome_trace([tracer.to_dict()])['traceEvents'][1]['args'] == {}
+
+
+def test_memory_tracing_outlives_the_tracer_that_started_it():
+    first, second = Tracer('first', memory=True), Tracer('second', memory=True)
+    ready, stopped = threading.Event(), threading.Event()
+
+    def other_session():
+        with second.activate():
+            ready.set()
+            stopped.wait()
+            with span('stage'):
+                assert tracemalloc.is_tracing()
+
+    thread = threading.Thread(target=other_session)
+    first.start()
+    thread.start()
+    ready.wait()
+    first.stop()
+    stopped.set()
+    thread.join()
+    assert second.spans[0]['peak_kb'] is not None
+    assert not tracemalloc.is_tracing()
@@ -0,0 +1,63 @@
+"""Top-K positions must match nlargest/nsmallest(keep='first') on every path: partition, cached order and pages."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from ranking import Ranking, top_k_positions
+
+
+def ranked(series, k, ascending):
+    """Positions of nlargest/nsmallest(k, keep='first') over a series with a positional index"""
+    picked = series.nsmallest(k, keep='first') if ascending else series.nlargest(k, keep='first')
+    return picked.index.to_numpy()
+
+
+def tied_frame(n, seed):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        # Few distinct values, so most ranks are ties
+        'roas': rng.integers(0, 6, n).astype(np.float64),
+        'orders': rng.integers(0, 4, n),
+        'reach': rng.uniform(0, 1000, n),
+    })
+
+
+@pytest.mark.parametrize('ascending', [False, True])
+@pytest.mark.parametrize('k', [0, 1, 7, 50, 80])
+def test_top_k_positions_match_nlargest(k, ascending):
+    for seed in range(5):
+        values = tied_frame(50, seed)['roas']
+        np.testing.assert_array_equal(top_k_positions(values.to_numpy(), k, ascending), ranked(values, k, ascending))
+
+
+def test_top_k_positions_of_nothing():
+    assert len(top_k_positions(np.array([]), 5)) == 0
+    assert len(top_k_positions(np.arange(5.0), -1)) == 0
+
+
+MIN_VALUES = [None, {'orders': 2}, {'orders': 1, 'reach': 300.0}, {'orders': None}, {'orders': 10}]
+
+
+@pytest.mark.parametrize('ascending', [False, True])
+@pytest.mark.parametrize('min_values', MIN_VALUES)
+def test_positions_match_nlargest_on_every_path(min_values, ascending):
+    df = tied_frame(200, 7)
+    keep = np.ones(len(df), dtype=bool)
+    for col, value in (min_values or {}).items():
+        if value is not None:
+            keep &= df[col].to_numpy() >= value
+    candidates = df['roas'][keep]
+    full = ranked(candidates, len(candidates), ascending)
+
+    ranking = Ranking(df)
+    assert ranking.count(min_values) == keep.sum()
+    for k in [0, 10, 500]:
+        # Partition path: no cached order yet
+        np.testing.assert_array_equal(Ranking(df).positions('roas', k, ascending, min_values=min_values), full[:k])
+    # Pages come from the cached stable order, and the first page then reads it too
+    for offset in [0, 10, 25, 190, 400]:
+        page = ranking.positions('roas', 10, ascending, offset=offset, min_values=min_values)
+        np.testing.assert_array_equal(page, full[offset:offset + 10])
+    np.testing.assert_array_equal(ranking.positions('roas', 10, ascending, min_values=min_values), full[:10])
+    pd.testing.assert_frame_equal(ranking.top('roas', 10, ascending, offset=10, min_values=min_values),
+                                  df.iloc[full[10:20]])
@@ -0,0 +1,60 @@
+"""Batch scenario KPIs must equal compute_kpis over process() for every combination, 'All' rollups included."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from engine import BASELINE_ROAS, compute_kpis
+from pipeline import FilterPipeline
+from scenarios import SCENARIO_DIMENSIONS
+from test_append import posts_batch, tracking_batch
+
+KPI_COLUMNS = ['total_spend', 'total_revenue', 'total_orders', 'overall_roas', 'incremental_roas']
+ROSTER_FILTERS = [
+    (None, 0, 10000000),
+    ((pd.Timestamp('2023-09-01'), pd.Timestamp('2023-11-30')), 0, 10000000),
+    (None, 50000, 2000000),
+]
+
+
+def assert_matches_process(pipeline, scenarios, date_range, min_followers, max_followers):
+    for row in scenarios.itertuples(index=False):
+        brand, campaign, platform, category = (getattr(row, dim) for dim in SCENARIO_DIMENSIONS)
+        expected = compute_kpis(pipeline.process(brand, platform, campaign, category, date_range, min_followers,
+                                                 max_followers), BASELINE_ROAS)
+        for col in KPI_COLUMNS:
+            assert getattr(row, col) == pytest.approx(expected[col], rel=1e-9, abs=1e-6), (row, col)
+
+
+@pytest.mark.parametrize('date_range, min_followers, max_followers', ROSTER_FILTERS)
+def test_scenarios_match_process(tables, date_range, min_followers, max_followers):
+    pipeline = FilterPipeline(*tables)
+    scenarios = pipeline.scenarios(date_range, min_followers, max_followers, BASELINE_ROAS)
+    # Every combination of 'All' and the known values, evaluated here for a sample that always has the
+    # full rollup and rows with each number of 'All' dimensions
+    all_count = (scenarios[SCENARIO_DIMENSIONS] == 'All').sum(axis=1)
+    sample = pd.concat([scenarios[all_count == count].sample(min(8, (all_count == count).sum()), random_state=count)
+                        for count in range(len(SCENARIO_DIMENSIONS) + 1)])
+    assert len(sample) == 8 * len(SCENARIO_DIMENSIONS) + 1
+    assert_matches_process(pipeline, sample, date_range, min_followers, max_followers)
+
+
+def test_listed_combinations_keep_their_order(tables):
+    pipeline = FilterPipeline(*tables)
+    brand = pipeline.dimension_values('brand')[0]
+    platform = pipeline.dimension_values('platform')[-1]
+    combinations = [('All', 'All', 'All', 'All'), (brand, 'All', platform, 'All'), ('No such brand', 'All', 'All', 'All')]
+    scenarios = pipeline.scenarios(None, 0, 10000000, BASELINE_ROAS, combinations)
+    assert list(scenarios[SCENARIO_DIMENSIONS].itertuples(index=False, name=None)) == combinations
+    assert_matches_process(pipeline, scenarios.iloc[:2], None, 0, 10000000)
+    # An unknown brand matches no tracking rows, but the spend of its roster is still counted
+    assert scenarios['total_revenue'].iloc[2] == 0
+    assert scenarios['total_spend'].iloc[2] == scenarios['total_spend'].iloc[0]
+
+
+def test_scenarios_match_process_after_append(tables):
+    pipeline = FilterPipeline(*tables)
+    pipeline.append(tracking_batch(tables, 500, 1, 'int64'), posts_batch(tables, 300, 2))
+    scenarios = pipeline.scenarios(None, 0, 10000000, BASELINE_ROAS)
+    rng = np.random.default_rng(0)
+    assert_matches_process(pipeline, scenarios.iloc[np.sort(rng.choice(len(scenarios), 20, replace=False))],
+                           None, 0, 10000000)
@@ -0,0 +1,98 @@
+"""Stores are rebuilt when their source changes and are only ever seen complete."""
+import os
+import threading
+
+from engine import build_pipeline, load_dataset
+from ingest import write_tables
+from pipeline import FilterPipeline
+from resultcache import DiskCache
+from store import open_store, read_manifest
+from synthetic import generate_dataset
+
+
+def store_influencers(store_dir, **kwargs):
+    return len(build_pipeline(store_dir=str(store_dir), **kwargs).influencers_df)
+
+
+def test_store_rebuilds_when_influencer_count_changes(tmp_path):
+    store_dir = tmp_path / 'store'
+    assert store_influencers(store_dir, n_influencers=300) == 300
+    created = read_manifest(store_dir)['created']
+    assert store_influencers(store_dir, n_influencers=300) == 300
+    assert read_manifest(store_dir)['created'] == created
+    assert store_influencers(store_dir, n_influencers=500) == 500
+
+
+def test_store_rebuilds_when_data_files_change(tmp_path):
+    data_dir, store_dir = tmp_path / 'data', tmp_path / 'store'
+    write_tables(generate_dataset(300), str(data_dir))
+    assert store_influencers(store_dir, data_dir=str(data_dir)) == 300
+    write_tables(generate_dataset(400), str(data_dir))
+    assert store_influencers(store_dir, data_dir=str(data_dir)) == 400
+
+
+def test_concurrent_builds_publish_one_complete_store(tmp_path):
+    store_dir = tmp_path / 'store'
+    errors = []
+
+    def build():
+        try:
+            assert store_influencers(store_dir, n_influencers=300, load=load_dataset) == 300
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=build) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    # Losing builders clean up their private build directories
+    assert os.listdir(tmp_path) == ['store']
+
+
+def test_reader_waits_out_a_publish(tmp_path):
+    store_dir = tmp_path / 'store'
+    build_pipeline(store_dir=str(store_dir), n_influencers=300)
+    # The store is moved aside as a rebuild does, and only renamed back after the reader started
+    os.rename(store_dir, tmp_path / 'aside')
+    publish = threading.Timer(0.1, os.rename, [tmp_path / 'aside', store_dir])
+    publish.start()
+    try:
+        assert len(open_store(str(store_dir)).tables[0]) == 300
+    finally:
+        publish.join()
+
+
+def test_store_cache_misses_when_data_files_change(tmp_path):
+    data_dir, store_dir, cache_dir = tmp_path / 'data', tmp_path / 'store', str(tmp_path / 'cache')
+    filters = ('All', 'All', 'All', 'All', None, 0, 10000000)
+    write_tables(generate_dataset(300), str(data_dir))
+    first = build_pipeline(data_dir=str(data_dir), store_dir=str(store_dir), cache_dir=cache_dir)
+    assert len(first.process(*filters)) == 300
+    write_tables(generate_dataset(400), str(data_dir))
+    second = build_pipeline(data_dir=str(data_dir), store_dir=str(store_dir), cache_dir=cache_dir)
+    assert len(second.process(*filters)) == 400
+
+
+def test_disk_cache_counts_a_rewritten_key_once(tmp_path, tables):
+    cache = DiskCache(str(tmp_path))
+    for _ in range(3):
+        cache.put(('key',), tables[0])
+    assert cache.stats()['bytes'] == sum(entry.stat().st_size for entry in tmp_path.iterdir())
+
+
+def test_backend_results_are_persisted_apart(tmp_path, tables):
+    filters = ('All', 'All', 'All', 'All', None, 0, 10000000)
+    disk = DiskCache(str(tmp_path))
+    full = FilterPipeline(*tables, disk=disk, disk_key='k').process(*filters)
+
+    class EmptyBackend:
+        def register(self, *frames):
+            pass
+
+        def process(self, *filters):
+            return full.iloc[:0]
+
+    backed = FilterPipeline(*tables, disk=disk, disk_key='k', backend=EmptyBackend())
+    assert len(full) > 0 and len(backed.process(*filters)) == 0
@@ -0,0 +1,112 @@
+"""Revenue series from prefix sums must match a pandas groupby/resample over the filtered tracking rows."""
+import pandas as pd
+import pytest
+
+from pipeline import FilterPipeline, select_influencers
+from test_append import tracking_batch
+
+RULES = {'D': 'D', 'W': 'W-MON', 'M': 'MS'}
+FILTERS = [
+    ('All', 'All', 'All', 'All', 0, 10000000),
+    ('MuscleBlaze', 'Instagram', 'All', 'All', 0, 10000000),
+    ('All', 'All', 'DiwaliSale23', 'Fitness', 0, 10000000),
+    # Follower ranges cut across segments and take the roster_curve path
+    ('All', 'YouTube', 'All', 'All', 100000, 2000000),
+]
+WINDOWS = [
+    None,
+    # Starts and ends mid-week and mid-month
+    (pd.Timestamp('2023-09-13'), pd.Timestamp('2023-11-08')),
+    # Starts before the first tracked day
+    (pd.Timestamp('2023-06-01'), pd.Timestamp('2023-08-20')),
+    (pd.Timestamp('2023-10-05'), pd.Timestamp('2023-10-05')),
+]
+OUT_OF_RANGE = [
+    (pd.Timestamp('2022-01-01'), pd.Timestamp('2022-03-01')),
+    (pd.Timestamp('2024-06-01'), pd.Timestamp('2024-07-01')),
+    (pd.Timestamp('2023-10-10'), pd.Timestamp('2023-10-01')),
+]
+
+
+def reference_series(pipeline, brand, platform, campaign, category, min_followers, max_followers, date_range, freq,
+                     rolling):
+    tracking = pipeline.tracking_data_df
+    roster = select_influencers(pipeline.influencers_df, platform, category, min_followers, max_followers)
+    rows = tracking[tracking['influencer_id'].isin(roster['id'])]
+    if brand != 'All':
+        rows = rows[rows['brand'] == brand]
+    if campaign != 'All':
+        rows = rows[rows['campaign'] == campaign]
+    # Every day of the loaded data inside the window, tracked or not
+    days = pd.date_range(tracking['date'].min(), tracking['date'].max())
+    if date_range is not None:
+        days = days[(days >= date_range[0]) & (days <= date_range[1])]
+    daily = rows.groupby('date')[['revenue', 'orders']].sum().reindex(days, fill_value=0)
+    binned = daily.resample(RULES[freq], closed='left', label='left').sum()
+    return pd.DataFrame({
+        'date': binned.index,
+        'revenue': binned['revenue'].astype(float).to_numpy(),
+        'orders': binned['orders'].to_numpy(),
+        'rolling_revenue': binned['revenue'].astype(float).rolling(rolling, min_periods=1).mean().to_numpy(),
+        'cumulative_revenue': binned['revenue'].astype(float).cumsum().to_numpy(),
+    })
+
+
+def assert_matches_reference(pipeline, filters, date_range, freq, rolling=7):
+    actual = pipeline.revenue_series(*filters[:4], date_range, *filters[4:], freq=freq, rolling=rolling)
+    expected = reference_series(pipeline, *filters, date_range, freq, rolling)
+    pd.testing.assert_frame_equal(actual.reset_index(drop=True), expected, check_dtype=False, check_freq=False,
+                                  rtol=1e-9)
+
+
+@pytest.fixture(scope='module')
+def pipeline(tables):
+    return FilterPipeline(*tables)
+
+
+@pytest.mark.parametrize('freq', ['D', 'W', 'M'])
+@pytest.mark.parametrize('filters', FILTERS)
+@pytest.mark.parametrize('date_range', WINDOWS)
+def test_series_match_resample(pipeline, filters, date_range, freq):
+    assert_matches_reference(pipeline, filters, date_range, freq)
+
+
+@pytest.mark.parametrize('rolling', [1, 3, 30])
+def test_rolling_window_lengths(pipeline, rolling):
+    assert_matches_reference(pipeline, FILTERS[1], WINDOWS[1], 'D', rolling)
+
+
+@pytest.mark.parametrize('freq', ['D', 'W', 'M'])
+@pytest.mark.parametrize('date_range', OUT_OF_RANGE)
+def test_window_outside_the_data_is_empty(pipeline, date_range, freq):
+    series = pipeline.revenue_series(*FILTERS[0][:4], date_range, *FILTERS[0][4:], freq=freq)
+    assert series.empty
+    assert list(series.columns) == ['date', 'revenue', 'orders', 'rolling_revenue', 'cumulative_revenue']
+
+
+def test_unknown_frequency_is_rejected(pipeline):
+    with pytest.raises(ValueError):
+        pipeline.revenue_series(*FILTERS[0][:4], None, *FILTERS[0][4:], freq='Q')
+
+
+def test_append_in_place_and_with_new_segments(tables):
+    pipeline = FilterPipeline(*tables)
+    for filters in FILTERS:
+        pipeline.revenue_series(*filters[:4], None, *filters[4:])
+    series = pipeline.timeseries
+
+    # Known segments and days: folded into the existing series
+    pipeline.append(tracking_batch(tables, 300, 1, 'int64'))
+    assert pipeline.timeseries is series
+    for filters in FILTERS:
+        assert_matches_reference(pipeline, filters, None, 'W')
+
+    # A new brand and days past the end: the series is rebuilt
+    batch = tracking_batch(tables, 200, 2, 'int64').astype({'brand': object})
+    batch.loc[:99, 'brand'] = 'NewBrand'
+    batch.loc[100:, 'date'] = pd.Timestamp('2024-01-15')
+    pipeline.append(batch)
+    assert pipeline.timeseries is not series
+    for filters in FILTERS + [('NewBrand', 'All', 'All', 'All', 0, 10000000)]:
+        for freq in ['D', 'M']:
+            assert_matches_reference(pipeline, filters, None, freq)
@@ -0,0 +1,179 @@
+"""Prefix-sum time series of revenue and orders for the revenue trend.
+
+``TimeSeries`` keeps, for every (brand, campaign, platform, category) segment
+present in the tracking cube, cumulative revenue and order arrays over a dense
+day axis. A filter state sums the curves of its segments once into a
+``Curve``; any date window, daily/weekly/monthly bins, rolling average or
+cumulative curve is then two lookups into that curve per point, with no
+regrouping of rows. Follower-range filters, which do not align with segments,
+build the same ``Curve`` from the cube rows of the selected roster with one
+``bincount``.
+"""
+import numpy as np
+import pandas as pd
+
+from dateindex import date_range_key, day_numbers
+
+SEGMENT_DIMENSIONS = ['brand', 'campaign', 'platform', 'category']
+ROSTER_DIMENSIONS = ['platform', 'category']
+# Resampling frequencies: daily, weekly (bins start on Monday) and monthly (bins start on the 1st)
+FREQUENCIES = {'D': 'Daily', 'W': 'Weekly', 'M': 'Monthly'}
+
+
+def bin_starts(days, freq):
+    """Day number of the first day of the bin each day number falls in"""
+    if freq == 'D':
+        return days
+    if freq == 'W':
+        # Day 0 (1970-01-01) is a Thursday, so Mondays are the days with (day + 3) % 7 == 0
+        return days - (days + 3) % 7
+    if freq == 'M':
+        return days.astype('datetime64[D]').astype('datetime64[M]').astype('datetime64[D]').astype(np.int64)
+    raise ValueError(f"Unsupported frequency '{freq}', expected one of {list(FREQUENCIES)}")
+
+
+def cumulative(daily):
+    """Prefix sums along the last axis with a leading zero, so sum(daily[..., a:b]) == c[..., b] - c[..., a]"""
+    result = np.zeros(daily.shape[:-1] + (daily.shape[-1] + 1,), dtype=daily.dtype)
+    np.cumsum(daily, axis=-1, out=result[..., 1:])
+    return result
+
+
+class Curve:
+    """Cumulative revenue and orders over consecutive days starting at first_day (a day number)"""
+
+    def __init__(self, first_day, revenue, orders):
+        self.first_day = first_day
+        self.revenue = revenue
+        self.orders = orders
+
+    @property
+    def n_days(self):
+        return len(self.revenue) - 1
+
+    def window(self, date_range=None):
+        """Offsets [start, stop) of the days inside an inclusive date range, clipped to the curve"""
+        date_key = date_range_key(date_range)
+        if date_key is None:
+            return 0, self.n_days
+        start_day, end_day = day_numbers([date_key[0], date_key[1]]) - self.first_day
+        return int(np.clip(start_day, 0, self.n_days)), int(np.clip(end_day + 1, 0, self.n_days))
+
+    def totals(self, date_range=None):
+        """Revenue and orders inside the date range"""
+        start, stop = self.window(date_range)
+        if stop <= start:
+            return 0.0, 0
+        return float(self.revenue[stop] - self.revenue[start]), int(self.orders[stop] - self.orders[start])
+
+    def resample(self, date_range=None, freq='D', rolling=7):
+        """Revenue and orders per bin inside the date range, with the rolling mean and running total of revenue
+
+        ``rolling_revenue`` averages revenue over the last ``rolling`` bins
+        (fewer at the start of the window); ``cumulative_revenue`` is the
+        revenue from the start of the window to the end of each bin.
+        """
+        start, stop = self.window(date_range)
+        if stop <= start:
+            return pd.DataFrame({'date': pd.Series(dtype='datetime64[ns]'), 'revenue': 0.0, 'orders': 0,
+                                 'rolling_revenue': 0.0, 'cumulative_revenue': 0.0}).iloc[:0]
+        labels = bin_starts(np.arange(self.first_day + start, self.first_day + stop), freq)
+        first = np.flatnonzero(np.r_[True, labels[1:] != labels[:-1]])
+        edges = np.r_[first, len(labels)] + start
+
+        revenue_at = self.revenue[edges]
+        bins = np.arange(1, len(edges))
+        lows = np.maximum(bins - rolling, 0)
+        return pd.DataFrame({
+            'date': pd.to_datetime(labels[first], unit='D'),
+            'revenue': np.diff(revenue_at),
+            'orders': np.diff(self.orders[edges]),
+            'rolling_revenue': (revenue_at[bins] - revenue_at[lows]) / (bins - lows),
+            'cumulative_revenue': revenue_at[1:] - revenue_at[0],
+        })
+
+
+class TimeSeries:
+    """Per-day cumulative revenue and orders per (brand, campaign, platform, category) segment
+
+    Built from the tracking cube and the roster; a segment's platform and
+    category are those of the influencer each cube row belongs to.
+    """
+
+    def __init__(self, tracking_cube, influencers_df):
+        self._roster_ids = pd.Index(influencers_df['id'])
+        # Integer codes per dimension value; roster dimensions are coded per influencer once
+        self._values = {}
+        self._roster_codes = {}
+        for dim in ROSTER_DIMENSIONS:
+            self._roster_codes[dim], self._values[dim] = pd.factorize(influencers_df[dim])
+        tracking_cube = self._rostered(tracking_cube)
+        for dim in ['brand', 'campaign']:
+            self._values[dim] = pd.Index(pd.unique(tracking_cube[dim]))
+        self._shape = tuple(len(self._values[dim]) for dim in SEGMENT_DIMENSIONS)
+
+        days = day_numbers(tracking_cube['date'])
+        self.first_day = int(days.min()) if len(days) else 0
+        self.n_days = int(days.max()) - self.first_day + 1 if len(days) else 0
+
+        self._segment_keys, codes = np.unique(self._segment_key(tracking_cube), return_inverse=True)
+        self.segments = pd.DataFrame({
+            dim: np.asarray(self._values[dim], dtype=object)[dim_codes]
+            for dim, dim_codes in zip(SEGMENT_DIMENSIONS, np.unravel_index(self._segment_keys, self._shape))
+        })
+        self.revenue, self.orders = self._daily_sums(codes, len(self._segment_keys), days, tracking_cube)
+
+    def _rostered(self, rows):
+        """Rows of influencers in the roster"""
+        known = self._roster_ids.get_indexer(rows['influencer_id']) >= 0
+        return rows if known.all() else rows[known]
+
+    def _segment_key(self, rows):
+        """Flat segment key per row, or -1 where a brand or campaign is not in the series"""
+        roster_rows = self._roster_ids.get_indexer(rows['influencer_id'])
+        codes = [self._values[dim].get_indexer(rows[dim]) for dim in ['brand', 'campaign']]
+        codes += [self._roster_codes[dim].take(roster_rows) for dim in ROSTER_DIMENSIONS]
+        known = (codes[0] >= 0) & (codes[1] >= 0)
+        return np.where(known, np.ravel_multi_index([np.maximum(c, 0) for c in codes], self._shape), -1)
+
+    def _daily_sums(self, codes, n_segments, days, rows):
+        """Cumulative revenue and orders per segment over the day axis, from one bincount each"""
+        cells = codes * self.n_days + (days - self.first_day)
+        size = n_segments * self.n_days
+        revenue = np.bincount(cells, weights=rows['revenue'].to_numpy(np.float64), minlength=size)
+        orders = np.bincount(cells, weights=rows['orders'].to_numpy(np.float64), minlength=size)
+        return (cumulative(revenue.reshape(n_segments, self.n_days)),
+                cumulative(orders.astype(np.int64).reshape(n_segments, self.n_days)))
+
+    def append(self, rows):
+        """Add new tracking or cube rows in place; False when they bring new segments or days and need a rebuild"""
+        rows = self._rostered(rows)
+        if not len(rows):
+            return True
+        days = day_numbers(rows['date'])
+        keys = self._segment_key(rows)
+        codes = np.minimum(np.searchsorted(self._segment_keys, keys), len(self._segment_keys) - 1)
+        new_segments = (self._segment_keys[codes] != keys).any()
+        if new_segments or days.min() < self.first_day or days.max() >= self.first_day + self.n_days:
+            return False
+        touched, codes = np.unique(codes, return_inverse=True)
+        revenue, orders = self._daily_sums(codes, len(touched), days, rows)
+        self.revenue[touched] += revenue
+        self.orders[touched] += orders
+        return True
+
+    def curve(self, brand='All', platform='All', campaign='All', category='All'):
+        """Summed curve of the segments matching the categorical filters"""
+        mask = np.ones(len(self.segments), dtype=bool)
+        for dim, value in zip(['brand', 'platform', 'campaign', 'category'], [brand, platform, campaign, category]):
+            if value != 'All':
+                mask &= self.segments[dim].to_numpy() == value
+        return Curve(self.first_day, self.revenue[mask].sum(axis=0), self.orders[mask].sum(axis=0))
+
+    def roster_curve(self, cube_rows, roster_ids):
+        """Curve of the cube rows (already filtered by brand/campaign) belonging to the given influencers"""
+        cube_rows = cube_rows[pd.Index(roster_ids).get_indexer(cube_rows['influencer_id']) >= 0]
+        offsets = day_numbers(cube_rows['date']) - self.first_day
+        revenue = np.bincount(offsets, weights=cube_rows['revenue'].to_numpy(np.float64), minlength=self.n_days)
+        orders = np.bincount(offsets, weights=cube_rows['orders'].to_numpy(np.float64), minlength=self.n_days)
+        return Curve(self.first_day, cumulative(revenue), cumulative(orders.astype(np.int64)))